@@ -1,17 +1,20 @@
 import os
-from typing import List
+import time
+from typing import Any
 
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from flask import request
+from cors_origins import parse_allowed_origins
+from questionnaire import questionnaire_schema
+from stage_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from stage_metrics import REQUEST_SECONDS, REQUESTS_TOTAL, STAGE_SECONDS
 from runner_adapter import predict as adapter_predict
-
-
-def parse_allowed_origins(env_value: str | None) -> List[str]:
-	if not env_value:
-		return []
-	parts = [part.strip() for part in env_value.split(",")]
-	return [p for p in parts if p]
+from runner_adapter import predict_batch as adapter_predict_batch
+from runner_adapter import result_status as adapter_result_status
+from runner_adapter import cache_stats as adapter_cache_stats
+from runner_adapter import metrics as adapter_metrics
+from wire_codec import UnsupportedMediaType, compress_body, decode_request, encode_body, encode_response, response_headers
 
 
 app = Flask(__name__)
@@ -22,7 +25,6 @@ allowed_origins = parse_allowed_origins(os.environ.get("ALLOWED_ORIGINS"))
 cors_resources = {r"/*": {"origins": allowed_origins or ["*"]}}
 CORS(app, resources=cors_resources)
 
-
 @app.get("/health")
 def health() -> tuple[dict, int]:
 	return {"status": "ok"}, 200
@@ -33,15 +35,90 @@ def hello() -> dict:
 	return {"message": "Hello from Render!"}
 
 
+def parse_json(mode: str) -> Any:
+	"""Request body as JSON or MessagePack (None if empty or invalid); raises UnsupportedMediaType."""
+	started = time.perf_counter()
+	payload = decode_request(request.get_data(cache=False), request.content_type)
+	STAGE_SECONDS.observe(time.perf_counter() - started, "json_parse", mode)
+	return payload
+
+
+def respond(body: Any, status: int = 200) -> Response:
+	"""Response in the format and compression the request asked for (see wire_codec)."""
+	data, headers = encode_response(body, request.headers.get("Accept"), request.headers.get("Accept-Encoding"))
+	return Response(data, status=status, headers=headers)
+
+
+def finish(endpoint: str, mode: str, started: float, body: dict, status: int) -> Response:
+	"""Serialize (and compress) the response body and record its timing and status code."""
+	serializing = time.perf_counter()
+	data, content_type = encode_body(body, request.headers.get("Accept"))
+	compressing = time.perf_counter()
+	data, encoding = compress_body(data, request.headers.get("Accept-Encoding"))
+	response = Response(data, status=status, headers=response_headers(content_type, encoding))
+	finished = time.perf_counter()
+	STAGE_SECONDS.observe(compressing - serializing, "serialization", mode)
+	if encoding is not None:
+		STAGE_SECONDS.observe(finished - compressing, "compression", mode)
+	REQUEST_SECONDS.observe(finished - started, endpoint)
+	REQUESTS_TOTAL.inc(endpoint, status)
+	return response
+
+
+def unsupported(exc: UnsupportedMediaType) -> tuple[dict, int]:
+	return {"error": "Unsupported media type", "details": str(exc)}, 415
+
+
 @app.post("/api/recommend")
-def recommend() -> tuple[dict, int]:
+def recommend() -> Response:
+	started = time.perf_counter()
 	try:
-		payload = request.get_json(silent=True) or {}
+		payload = parse_json("single") or {}
 		result = adapter_predict(payload)
-		status = 200 if not isinstance(result, dict) or "error" not in result else 501
-		return (result if isinstance(result, dict) else {"result": result}, status)
+		status = adapter_result_status(result)
+		body = result if isinstance(result, dict) else {"result": result}
+	except UnsupportedMediaType as exc:
+		body, status = unsupported(exc)
 	except Exception as exc:
-		return ({"error": "Unhandled exception", "details": str(exc)}, 500)
+		body, status = {"error": "Unhandled exception", "details": str(exc)}, 500
+	return finish("/api/recommend", "single", started, body, status)
+
+
+@app.post("/api/recommend/batch")
+def recommend_batch() -> Response:
+	started = time.perf_counter()
+	try:
+		payload = parse_json("batch")
+		items = payload.get("items") if isinstance(payload, dict) else payload
+		if not isinstance(items, list):
+			body, status = {"error": "Expected a JSON array of questionnaires (or {\"items\": [...]})"}, 400
+		else:
+			results = adapter_predict_batch(items)
+			if isinstance(results, dict):
+				body, status = results, 501 if "error" in results else 200
+			else:
+				body, status = {"results": results, "count": len(results)}, 200
+	except UnsupportedMediaType as exc:
+		body, status = unsupported(exc)
+	except Exception as exc:
+		body, status = {"error": "Unhandled exception", "details": str(exc)}, 500
+	return finish("/api/recommend/batch", "batch", started, body, status)
+
+
+@app.get("/api/cache/stats")
+def cache_stats() -> Response:
+	return respond(adapter_cache_stats())
+
+
+@app.get("/api/questionnaire/schema")
+def schema() -> Response:
+	# Short IDs and question order for the compact payload formats (see feature_encoder)
+	return respond(questionnaire_schema())
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+	return Response(adapter_metrics(), content_type=METRICS_CONTENT_TYPE)
 
 
 if __name__ == "__main__":
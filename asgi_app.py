@@ -0,0 +1,270 @@
+# asgi_app.py - ASGI entry point with the same routes as app.py
+#
+# The event loop only parses and writes HTTP; inference runs on a fixed pool of
+# workers behind a bounded queue, so thousands of open connections share a few
+# inference slots.
+#
+# Run with: uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+#
+# ICT_INFERENCE_EXECUTOR  "thread" (default) or "process"
+# ICT_INFERENCE_WORKERS   inference slots (default: CPU count)
+# ICT_INFERENCE_QUEUE     requests allowed to wait or run at once (default: 32 per slot);
+#                         beyond that the server answers 503 with Retry-After
+# ICT_MAX_BODY_BYTES      largest accepted request body (default 5 MB)
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from cors_origins import parse_allowed_origins
+from questionnaire import questionnaire_schema
+from stage_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from stage_metrics import REQUEST_SECONDS, REQUESTS_TOTAL, STAGE_SECONDS
+from wire_codec import (
+	JSON_TYPE, MSGPACK_TYPES, UnsupportedMediaType, compress_body, decode_request, encode_body, media_type, response_headers
+)
+from runner_adapter import cache_stats as adapter_cache_stats
+from runner_adapter import metrics as adapter_metrics
+from runner_adapter import predict as adapter_predict
+from runner_adapter import predict_batch as adapter_predict_batch
+from runner_adapter import result_status as adapter_result_status
+from runner_adapter import warmup as adapter_warmup
+
+MAX_BODY_BYTES = int(os.environ.get("ICT_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+
+# Endpoints recorded in stage_metrics, with the mode label of their stages (as app.finish does for Flask)
+TIMED_ENDPOINTS = {"/api/recommend": "single", "/api/recommend/batch": "batch"}
+
+
+class QueueFull(Exception):
+	pass
+
+
+class InferenceExecutor:
+	"""Runs blocking inference calls on a sized pool with a bounded number of waiting requests."""
+
+	def __init__(self, kind: str = "thread", workers: int | None = None, queue_limit: int | None = None):
+		self.kind = kind
+		self.workers = workers or os.cpu_count() or 1
+		self.queue_limit = queue_limit or self.workers * 32
+		self.in_flight = 0
+		self.rejected = 0
+		if kind == "process":
+			# Each worker process loads the model once, before taking requests
+			self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=adapter_warmup)
+		else:
+			self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+	async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+		if self.in_flight >= self.queue_limit:
+			self.rejected += 1
+			raise QueueFull()
+		self.in_flight += 1
+		try:
+			return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+		finally:
+			self.in_flight -= 1
+
+	def shutdown(self) -> None:
+		self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def executor_from_env() -> InferenceExecutor:
+	workers = os.environ.get("ICT_INFERENCE_WORKERS")
+	queue_limit = os.environ.get("ICT_INFERENCE_QUEUE")
+	return InferenceExecutor(
+		kind=os.environ.get("ICT_INFERENCE_EXECUTOR", "thread"),
+		workers=int(workers) if workers else None,
+		queue_limit=int(queue_limit) if queue_limit else None,
+	)
+
+
+allowed_origins = parse_allowed_origins(os.environ.get("ALLOWED_ORIGINS"))
+executor: InferenceExecutor | None = None
+
+
+def _get_executor() -> InferenceExecutor:
+	global executor
+	if executor is None:
+		executor = executor_from_env()
+	return executor
+
+
+def _cors_headers(scope: dict) -> list[tuple[bytes, bytes]]:
+	origin = None
+	for name, value in scope.get("headers", []):
+		if name == b"origin":
+			origin = value.decode("latin-1")
+			break
+	if origin is None:
+		return []
+	if not allowed_origins:
+		return [(b"access-control-allow-origin", b"*")]
+	if origin in allowed_origins:
+		return [(b"access-control-allow-origin", origin.encode("latin-1")), (b"vary", b"Origin")]
+	return []
+
+
+def _header(scope: dict, name: bytes) -> str | None:
+	for key, value in scope.get("headers", []):
+		if key == name:
+			return value.decode("latin-1")
+	return None
+
+
+async def _send_json(
+	send: Callable, scope: dict, body: Any, status: int, extra_headers: list | None = None, timing: tuple | None = None
+) -> None:
+	"""JSON (or MessagePack when Accept asks for it), compressed when large and the client accepts it.
+
+	timing is (endpoint, mode, started) for a TIMED_ENDPOINTS request: serialization,
+	compression, the request time and its status code are then recorded, as in app.finish.
+	"""
+	serializing = time.perf_counter()
+	data, content_type = encode_body(body, _header(scope, b"accept"))
+	compressing = time.perf_counter()
+	data, encoding = compress_body(data, _header(scope, b"accept-encoding"))
+	finished = time.perf_counter()
+	headers = [(name.lower().encode(), value.encode()) for name, value in response_headers(content_type, encoding).items()]
+	headers.append((b"content-length", str(len(data)).encode()))
+	headers += _cors_headers(scope) + (extra_headers or [])
+	if timing is not None:
+		endpoint, mode, started = timing
+		STAGE_SECONDS.observe(compressing - serializing, "serialization", mode)
+		if encoding is not None:
+			STAGE_SECONDS.observe(finished - compressing, "compression", mode)
+		REQUEST_SECONDS.observe(finished - started, endpoint)
+		REQUESTS_TOTAL.inc(endpoint, status)
+	await send({"type": "http.response.start", "status": status, "headers": headers})
+	await send({"type": "http.response.body", "body": data})
+
+
+async def _read_body(receive: Callable) -> bytes | None:
+	"""Whole request body, or None if it is larger than MAX_BODY_BYTES."""
+	chunks = []
+	size = 0
+	while True:
+		message = await receive()
+		if message["type"] == "http.disconnect":
+			return b""
+		chunk = message.get("body", b"")
+		size += len(chunk)
+		if size > MAX_BODY_BYTES:
+			return None
+		chunks.append(chunk)
+		if not message.get("more_body", False):
+			return b"".join(chunks)
+
+
+def _parse_json(body: bytes, content_type: str | None) -> Any:
+	# Any body that is not MessagePack is read as JSON, whatever its Content-Type says
+	return decode_request(body, content_type if media_type(content_type) in MSGPACK_TYPES else JSON_TYPE)
+
+
+async def health(payload: Any) -> tuple[dict, int]:
+	return {"status": "ok"}, 200
+
+
+async def hello(payload: Any) -> tuple[dict, int]:
+	return {"message": "Hello from Render!"}, 200
+
+
+async def recommend(payload: Any) -> tuple[dict, int]:
+	result = await _get_executor().run(adapter_predict, payload or {})
+	status = adapter_result_status(result)
+	return (result if isinstance(result, dict) else {"result": result}, status)
+
+
+async def recommend_batch(payload: Any) -> tuple[dict, int]:
+	items = payload.get("items") if isinstance(payload, dict) else payload
+	if not isinstance(items, list):
+		return ({"error": "Expected a JSON array of questionnaires (or {\"items\": [...]})"}, 400)
+	results = await _get_executor().run(adapter_predict_batch, items)
+	if isinstance(results, dict):
+		return (results, 501 if "error" in results else 200)
+	return ({"results": results, "count": len(results)}, 200)
+
+
+async def cache_stats(payload: Any) -> tuple[dict, int]:
+	return adapter_cache_stats(), 200
+
+
+async def schema(payload: Any) -> tuple[dict, int]:
+	return questionnaire_schema(), 200
+
+
+ROUTES = {
+	("GET", "/health"): health,
+	("GET", "/api/hello"): hello,
+	("POST", "/api/recommend"): recommend,
+	("POST", "/api/recommend/batch"): recommend_batch,
+	("GET", "/api/cache/stats"): cache_stats,
+	("GET", "/api/questionnaire/schema"): schema,
+}
+
+
+async def _lifespan(receive: Callable, send: Callable) -> None:
+	while True:
+		message = await receive()
+		if message["type"] == "lifespan.startup":
+			_get_executor()
+			await send({"type": "lifespan.startup.complete"})
+		elif message["type"] == "lifespan.shutdown":
+			if executor is not None:
+				executor.shutdown()
+			await send({"type": "lifespan.shutdown.complete"})
+			return
+
+
+async def app(scope: dict, receive: Callable, send: Callable) -> None:
+	if scope["type"] == "lifespan":
+		await _lifespan(receive, send)
+		return
+	if scope["type"] != "http":
+		return
+
+	method = scope["method"]
+	path = scope["path"].rstrip("/") or "/"
+	if method == "OPTIONS":
+		headers = [
+			(b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+			(b"access-control-allow-headers", b"Content-Type"),
+		]
+		await _send_json(send, scope, {}, 200, headers)
+		return
+
+	if method == "GET" and path == "/metrics":
+		data = adapter_metrics().encode("utf-8")
+		headers = [(b"content-type", METRICS_CONTENT_TYPE.encode()), (b"content-length", str(len(data)).encode())]
+		await send({"type": "http.response.start", "status": 200, "headers": headers})
+		await send({"type": "http.response.body", "body": data})
+		return
+
+	handler = ROUTES.get((method, path))
+	if handler is None:
+		allowed = any(route_path == path for _, route_path in ROUTES)
+		await _send_json(send, scope, {"error": "Method not allowed" if allowed else "Not found"}, 405 if allowed else 404)
+		return
+
+	mode = TIMED_ENDPOINTS.get(path)
+	timing = (path, mode, time.perf_counter()) if mode else None
+	body = await _read_body(receive) if method == "POST" else b""
+	if body is None:
+		await _send_json(send, scope, {"error": "Request body too large"}, 413, timing=timing)
+		return
+
+	try:
+		parsing = time.perf_counter()
+		payload = _parse_json(body, _header(scope, b"content-type"))
+		if mode:
+			STAGE_SECONDS.observe(time.perf_counter() - parsing, "json_parse", mode)
+		result, status = await handler(payload)
+	except UnsupportedMediaType as exc:
+		result, status = {"error": "Unsupported media type", "details": str(exc)}, 415
+	except QueueFull:
+		await _send_json(send, scope, {"error": "Server busy, try again shortly"}, 503, [(b"retry-after", b"1")], timing)
+		return
+	except Exception as exc:
+		result, status = {"error": "Unhandled exception", "details": str(exc)}, 500
+	await _send_json(send, scope, result, status, timing=timing)
@@ -0,0 +1,83 @@
+# payloads.py - Reproducible questionnaire payloads for benchmarks, built from get_questionnaire_questions()
+#
+#   full       every question answered with a Likert string, plus identity fields
+#   partial    a random 30-90% of the questions answered
+#   malformed  answers that are empty, non-numeric, out of range, fractional,
+#              numbers instead of strings, lists, plus unknown keys
+#
+# Each payload leans towards one section (creative, analytical or networking)
+# so the recommendations cover every track. fmt picks the wire format:
+# 'legacy' (full question text keys), 'ids' (short IDs) or 'array' (ordered
+# ratings with the schema version), see feature_encoder.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KINDS = ('full', 'partial', 'malformed')
+FORMATS = ('legacy', 'ids', 'array')
+LIKERT_STRINGS = ('1', '2', '3', '4', '5')
+DEFAULT_MIX = (0.7, 0.2, 0.1)
+MALFORMED_ANSWERS = ('', 'abc', '7', '0', '4.5', ' 3 ', None, 4, 2.0, ['5'], {'value': 3}, True, 'NaN')
+
+
+def _identity(n):
+    return {
+        'Timestamp': f'2025/01/{n % 28 + 1:02d} 10:{n % 60:02d}:00',
+        'Email Address': f'bench{n}@example.com',
+        'Full Name': f'Bench Student {n}',
+        'Age': str(17 + n % 5),
+        'Gender': ('Male', 'Female', 'Prefer not to say')[n % 3],
+        'Strand': ('STEM', 'ICT', 'ABM', 'HUMSS', 'GAS')[n % 5]
+    }
+
+
+def to_format(payload, fmt, schema):
+    """The legacy payload rewritten with short IDs ('ids') or as an ordered ratings array ('array')"""
+    if fmt == 'legacy':
+        return payload
+    questions = schema['questions']
+    if fmt == 'ids':
+        ids = {question['text']: question['id'] for question in questions}
+        return {ids.get(key, key): value for key, value in payload.items()}
+    texts = {question['text'] for question in questions}
+    compact = {key: value for key, value in payload.items() if key not in texts}
+    compact['schema'] = schema['version']
+    # Clients of the array format send Likert answers as JSON integers; anything else is kept as is
+    answers = [payload.get(question['text']) for question in questions]
+    compact['ratings'] = [int(value) if value in LIKERT_STRINGS else value for value in answers]
+    return compact
+
+
+def make_payloads(n, seed=0, mix=DEFAULT_MIX, kind=None, fmt='legacy'):
+    """n payload dicts; kind forces one kind, otherwise kinds are drawn with the mix probabilities"""
+    from questionnaire import get_questionnaire_questions, questionnaire_schema
+
+    _, creative, analytical, networking = get_questionnaire_questions()
+    sections = (creative, analytical, networking)
+    rng = np.random.default_rng(seed)
+    kinds = [kind] * n if kind else rng.choice(KINDS, size=n, p=mix).tolist()
+
+    payloads = []
+    for index, payload_kind in enumerate(kinds):
+        favourite = int(rng.integers(len(sections)))
+        payload = _identity(index)
+        for section_index, questions in enumerate(sections):
+            low, high = (3, 5) if section_index == favourite else (1, 4)
+            answers = rng.integers(low, high, size=len(questions), endpoint=True)
+            keep = np.ones(len(questions), dtype=bool)
+            if payload_kind == 'partial':
+                keep = rng.random(len(questions)) < rng.uniform(0.3, 0.9)
+            for question, answer, kept in zip(questions, answers.tolist(), keep.tolist()):
+                if kept:
+                    payload[question] = str(answer)
+        if payload_kind == 'malformed':
+            questions = [q for section in sections for q in section]
+            for position in rng.choice(len(questions), size=20, replace=False).tolist():
+                payload[questions[position]] = MALFORMED_ANSWERS[int(rng.integers(len(MALFORMED_ANSWERS)))]
+            payload['Unexpected field'] = 'ignored'
+            payload.pop('Timestamp', None)
+        payloads.append(to_format(payload, fmt, questionnaire_schema()))
+    return payloads
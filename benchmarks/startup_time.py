@@ -0,0 +1,81 @@
+# startup_time.py - Cold-start time of a serving worker, from a fresh interpreter
+#
+# For each entry module and model path, a new Python process reports:
+#   import_s            importing the entry module (app / asgi_app), which loads the model
+#   first_predict_s     the first /api/recommend-equivalent call
+#   heavy_modules       which of pandas / sklearn ended up imported
+#
+# Usage:
+#   python benchmarks/startup_time.py --model rf_ict_model.pkl --model rf_ict_model.artifact --payload payload.json
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'sklearn', 'lightgbm')
+
+
+def measure(entry, payload_path):
+    """Runs inside the fresh interpreter; MODEL_PATH is already set"""
+    sys.path.insert(0, ROOT)
+    start = time.perf_counter()
+    __import__(entry)
+    imported = time.perf_counter()
+
+    import runner_adapter
+
+    payload = {}
+    if payload_path:
+        with open(payload_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    runner_adapter.predict(payload)
+    predicted = time.perf_counter()
+    return {
+        'import_s': round(imported - start, 4),
+        'first_predict_s': round(predicted - imported, 4),
+        'total_s': round(predicted - start, 4),
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure worker cold-start time per entry module and model file')
+    parser.add_argument('--entry', action='append', help='entry module to import (default: app and asgi_app)')
+    parser.add_argument('--model', action='append', help='model pickle or artifact directory (repeatable)')
+    parser.add_argument('--payload', help='questionnaire JSON used for the first prediction')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per combination; the fastest is reported')
+    parser.add_argument('--output', help='write the JSON report here as well')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.payload)))
+        return 0
+
+    report = {'runs': []}
+    for model in args.model or ['rf_ict_model.pkl']:
+        for entry in args.entry or ['app', 'asgi_app']:
+            env = dict(os.environ, MODEL_PATH=os.path.abspath(model))
+            command = [sys.executable, os.path.abspath(__file__), '--measure', entry]
+            if args.payload:
+                command += ['--payload', os.path.abspath(args.payload)]
+            samples = []
+            for _ in range(args.repeat):
+                output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+            best = min(samples, key=lambda sample: sample['total_s'])
+            report['runs'].append(dict(best, entry=entry, model=model))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
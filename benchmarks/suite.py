@@ -0,0 +1,367 @@
+# suite.py - Benchmark suite: inference stages, HTTP serving and training, written as JSON
+#
+# stages     rule scorer, feature assembly and predict_proba (as served, compiled
+#            engine and sklearn) for batch sizes 1..10k, per batch and per row
+# crossover  compiled engine vs sklearn predict_proba from 16 to 2048 rows: the
+#            smallest batch where sklearn is faster, next to the configured
+#            ICT_TREE_ENGINE_MAX_ROWS (batches above it are served by sklearn)
+# http       /api/recommend through the Flask test client (sequential), and
+#            through a local threaded server under concurrent clients:
+#            requests/s and p50/p95/p99 latency
+# codec      request decoding and response encoding per JSON codec (stdlib,
+#            orjson) and MessagePack, plus gzip/br time and size of a batch response
+# training   synthetic generation, labeling, feature preparation and
+#            cross-validation + final fit, as bsit_recommendation runs them
+#
+# Payloads come from benchmarks/payloads.py (full, partial and malformed mix),
+# in the wire format given by --format (legacy, ids or array).
+# --baseline compares against an earlier JSON report and lists every metric
+# that got worse by more than --tolerance.
+#
+# Usage:
+#   python benchmarks/suite.py --model rf_ict_model.pkl --output bench.json
+#   python benchmarks/suite.py --model rf_ict_model.pkl --baseline bench.json --skip training
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SECTIONS = ('stages', 'crossover', 'codec', 'http', 'training')
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+CROSSOVER_SIZES = (16, 32, 64, 128, 192, 256, 384, 512, 768, 1024, 2048)
+
+
+def timed(func, min_seconds=0.2, max_runs=1000):
+    """Best wall-clock seconds of func() over repeated runs (at least one, at most max_runs)"""
+    best = float('inf')
+    deadline = time.perf_counter() + min_seconds
+    for _ in range(max_runs):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+        if time.perf_counter() > deadline:
+            break
+    return best
+
+
+def percentiles(samples):
+    import numpy as np
+
+    ms = np.asarray(samples) * 1000.0
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3)
+    }
+
+
+def bench_stages(payloads, batch_sizes=BATCH_SIZES):
+    import numpy as np
+
+    import bsit_runner
+
+    predictor = bsit_runner.get_predictor()
+    read = predictor.encoder.read
+    results = []
+    for batch in batch_sizes:
+        items = (payloads * (batch // len(payloads) + 1))[:batch]
+        X = predictor.encoder.encode_batch(items)
+        totals = [read(item)[1:] for item in items]
+        sums, counts = np.asarray([t[0] for t in totals]), np.asarray([t[1] for t in totals])
+        stages = {
+            # feature row and rule section totals, read in one pass over the answers
+            'feature_assembly': timed(lambda: [read(item) for item in items]),
+            'rule_scorer': timed(lambda: bsit_runner.rule_based_predict_batch(sums, counts)),
+            'predict_proba': timed(lambda: predictor.predict_proba(X))
+        }
+        if predictor.compiled_proba is not None and predictor.model is not None:
+            stages['predict_proba_compiled'] = timed(lambda: predictor.compiled_proba(X), max_runs=20 if batch < 1000 else 3)
+        if predictor.model is not None:
+            stages['predict_proba_sklearn'] = timed(lambda: predictor.model.predict_proba(X), max_runs=20 if batch < 1000 else 3)
+        results.append({
+            'batch': batch,
+            **{f'{name}_ms': round(seconds * 1000.0, 4) for name, seconds in stages.items()},
+            **{f'{name}_us_per_row': round(seconds / batch * 1e6, 3) for name, seconds in stages.items()}
+        })
+    return results
+
+
+def bench_crossover(sizes=CROSSOVER_SIZES):
+    """Compiled engine vs sklearn per batch size, and the smallest size where sklearn wins (None: it never does)"""
+    import numpy as np
+
+    import bsit_runner
+
+    predictor = bsit_runner.get_predictor()
+    if predictor.compiled_proba is None or predictor.model is None:
+        return {'skipped': 'needs a pickled model with the tree engine enabled'}
+    rng = np.random.default_rng(0)
+    rows, crossover = [], None
+    for batch in sizes:
+        X = rng.integers(1, 6, size=(batch, predictor.encoder.n_features)).astype(np.float32)
+        compiled = timed(lambda: predictor.compiled_proba(X), max_runs=20)
+        sklearn = timed(lambda: predictor.model.predict_proba(X), max_runs=20)
+        if crossover is None and sklearn < compiled:
+            crossover = batch
+        rows.append({'batch': batch, 'compiled_ms': round(compiled * 1000.0, 4), 'sklearn_ms': round(sklearn * 1000.0, 4)})
+    return {'sizes': rows, 'crossover_rows': crossover, 'max_rows': bsit_runner.TREE_ENGINE_MAX_ROWS}
+
+
+def bench_codecs(payloads, batch=100):
+    """Decode/encode microseconds per request and response for every codec installed, and compression of a batch"""
+    import wire_codec
+
+    import bsit_runner
+
+    items = (payloads * (batch // len(payloads) + 1))[:batch]
+    single = bsit_runner.predict(items[0])
+    batch_body = {'results': bsit_runner.get_predictor().predict_batch(items), 'count': batch}
+    codecs = {'json': wire_codec.JsonCodec('json')}
+    if wire_codec.JSON.name == 'orjson':
+        codecs['orjson'] = wire_codec.JSON
+    if wire_codec.MSGPACK is not None:
+        codecs['msgpack'] = wire_codec.MSGPACK
+
+    report = {'available': wire_codec.available(), 'codecs': {}, 'compression': {}}
+    for name, codec in codecs.items():
+        requests = [codec.dumps(item) for item in items]
+        response = codec.dumps(batch_body)
+        report['codecs'][name] = {
+            'decode_request_us': round(timed(lambda: [codec.loads(raw) for raw in requests]) / batch * 1e6, 2),
+            'encode_result_us': round(timed(lambda: codec.dumps(single)) * 1e6, 2),
+            f'encode_batch_{batch}_us': round(timed(lambda: codec.dumps(batch_body)) * 1e6, 2),
+            'request_bytes': round(sum(len(raw) for raw in requests) / batch),
+            f'batch_{batch}_bytes': len(response)
+        }
+    data = wire_codec.JSON.dumps(batch_body)
+    for encoding in wire_codec.supported_encodings():
+        report['compression'][encoding] = {
+            f'batch_{batch}_us': round(timed(lambda: wire_codec.compress(data, encoding)) * 1e6, 2),
+            f'batch_{batch}_bytes': len(wire_codec.compress(data, encoding)),
+            'ratio': round(len(data) / len(wire_codec.compress(data, encoding)), 2)
+        }
+    return report
+
+
+def bench_test_client(payloads, requests):
+    from app import app
+
+    client = app.test_client()
+    latencies = []
+    statuses = {}
+    started = time.perf_counter()
+    for index in range(requests):
+        sent = time.perf_counter()
+        response = client.post('/api/recommend', json=payloads[index % len(payloads)])
+        latencies.append(time.perf_counter() - sent)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    return {'requests': requests, 'rps': round(requests / elapsed, 1), **percentiles(latencies),
+            'mean_request_bytes': round(sum(len(json.dumps(p)) for p in payloads) / len(payloads)),
+            'statuses': {str(k): v for k, v in sorted(statuses.items())}}
+
+
+def bench_concurrent(payloads, requests, clients):
+    """Threaded local WSGI server on an ephemeral port, hit by `clients` threads over HTTP"""
+    import http.client
+
+    from werkzeug.serving import make_server
+
+    from app import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    bodies = [json.dumps(payload).encode('utf-8') for payload in payloads]
+    latencies = []
+    errors = []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            sent = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('POST', '/api/recommend', body=bodies[index % len(bodies)],
+                                   headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status != 200:
+                    errors.append(response.status)
+            except OSError as e:
+                errors.append(type(e).__name__)
+            with lock:
+                latencies.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    return {'requests': requests, 'clients': clients, 'rps': round(requests / elapsed, 1),
+            **percentiles(latencies), 'errors': len(errors)}
+
+
+def bench_training(scale, jobs, seed=42):
+    import contextlib
+    import io
+
+    import bsit_recommendation
+
+    stages = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        df = bsit_recommendation.generate_synthetic_responses(seed=seed, scale=scale)
+        stages['generate_s'] = time.perf_counter() - started
+        unlabeled = df.drop(columns=['Recommended_Track'])
+        started = time.perf_counter()
+        bsit_recommendation.label_responses(unlabeled)
+        stages['auto_label_s'] = time.perf_counter() - started
+        started = time.perf_counter()
+        X, y, _ = bsit_recommendation.prepare_training_data(bsit_recommendation.label_responses(df))
+        stages['prepare_s'] = time.perf_counter() - started
+        started = time.perf_counter()
+        scores, _ = bsit_recommendation.cross_validate_and_fit(bsit_recommendation.build_ensemble(), X, y, n_jobs=jobs)
+        stages['cv_and_fit_s'] = time.perf_counter() - started
+    return {
+        'rows': len(X), 'synthetic_scale': scale, 'jobs': jobs,
+        **{name: round(seconds, 3) for name, seconds in stages.items()},
+        'total_s': round(sum(stages.values()), 3),
+        'cv_accuracy': round(float(scores.mean()), 4)
+    }
+
+
+def environment():
+    import numpy
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(), 'numpy': numpy.__version__, 'sklearn': sklearn.__version__,
+        'cpus': os.cpu_count(), 'platform': platform.platform(), 'commit': commit
+    }
+
+
+# Metrics where a larger number is better; every other *_ms / *_us_per_row / *_s metric is a time
+HIGHER_IS_BETTER = ('rps', 'cv_accuracy')
+
+
+def _metrics(report, prefix=''):
+    """Flatten a report into {path: number}; list entries are keyed by their batch size"""
+    found = {}
+    if isinstance(report, dict):
+        for key, value in report.items():
+            if key not in ('environment', 'config'):
+                found.update(_metrics(value, f'{prefix}{key}.'))
+    elif isinstance(report, list):
+        for item in report:
+            label = f"batch_{item['batch']}" if isinstance(item, dict) and 'batch' in item else str(report.index(item))
+            found.update(_metrics(item, f'{prefix}{label}.'))
+    elif isinstance(report, (int, float)) and not isinstance(report, bool):
+        found[prefix[:-1]] = float(report)
+    return found
+
+
+def compare(report, baseline, tolerance):
+    """Metrics that moved by more than tolerance (as a fraction) relative to the baseline report"""
+    current, previous = _metrics(report), _metrics(baseline)
+    changes = []
+    for name in sorted(current.keys() & previous.keys()):
+        leaf = name.rsplit('.', 1)[-1]
+        timing = leaf.endswith(('_ms', '_us_per_row', '_s'))
+        if not (timing or leaf in HIGHER_IS_BETTER) or previous[name] == 0:
+            continue
+        ratio = current[name] / previous[name]
+        worse = ratio < 1 - tolerance if leaf in HIGHER_IS_BETTER else ratio > 1 + tolerance
+        better = ratio > 1 + tolerance if leaf in HIGHER_IS_BETTER else ratio < 1 - tolerance
+        if worse or better:
+            changes.append({'metric': name, 'baseline': previous[name], 'current': current[name],
+                            'ratio': round(ratio, 3), 'verdict': 'regression' if worse else 'improvement'})
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark inference, serving and training; write JSON')
+    parser.add_argument('--model', help='model pickle or artifact directory (sets MODEL_PATH)')
+    parser.add_argument('--skip', action='append', choices=SECTIONS, default=[], help='section to leave out (repeatable)')
+    parser.add_argument('--payloads', type=int, default=500, help='distinct payloads generated (default 500)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=('legacy', 'ids', 'array'), default='legacy', help='payload wire format (default legacy)')
+    parser.add_argument('--batch', type=int, action='append', help='batch sizes for the stage benchmarks (default 1..10000)')
+    parser.add_argument('--requests', type=int, default=2000, help='HTTP requests per run (default 2000)')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients for the local server run (default 8)')
+    parser.add_argument('--cache', action='store_true', help='keep the result cache on (off by default so every request is scored)')
+    parser.add_argument('--train-scale', type=int, default=1, help='synthetic scale for the training benchmark')
+    parser.add_argument('--train-jobs', type=int, default=-1, help='cores for the training benchmark')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', help='earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='relative change reported by --baseline (default 0.10)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 when --baseline finds a regression')
+    args = parser.parse_args(argv)
+
+    # Before the serving modules are imported: they read these at import time
+    if args.model:
+        os.environ['MODEL_PATH'] = os.path.abspath(args.model)
+    os.environ.setdefault('ICT_LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('ICT_MODEL_RELOAD_INTERVAL', '0')
+    if not args.cache:
+        os.environ['ICT_CACHE_SIZE'] = '0'
+
+    from payloads import make_payloads
+
+    payloads = make_payloads(args.payloads, seed=args.seed, fmt=args.format)
+    report = {
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+    }
+    if 'stages' not in args.skip:
+        report['stages'] = bench_stages(payloads, args.batch or BATCH_SIZES)
+    if 'crossover' not in args.skip:
+        report['crossover'] = bench_crossover()
+    if 'codec' not in args.skip:
+        report['codec'] = bench_codecs(payloads)
+    if 'http' not in args.skip:
+        report['http'] = {
+            'test_client': bench_test_client(payloads, args.requests),
+            'concurrent': bench_concurrent(payloads, args.requests, args.clients)
+        }
+    if 'training' not in args.skip:
+        report['training'] = bench_training(args.train_scale, args.train_jobs)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f), args.tolerance)
+        if args.fail_on_regression and any(c['verdict'] == 'regression' for c in report['comparison']):
+            status = 1
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
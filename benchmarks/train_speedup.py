@@ -0,0 +1,86 @@
+# train_speedup.py - Wall-clock of cross-validation + final fit, serial baseline vs parallel
+#
+# baseline   cross_val_score(ensemble, X, y, cv=5) then ensemble.fit(X, y), as training used to run
+# jobs=N     bsit_recommendation.cross_validate_and_fit with N cores
+#
+# Every run trains on the same seeded synthetic data and must produce the same
+# fold scores and predictions as the baseline.
+#
+# Usage:
+#   python benchmarks/train_speedup.py --jobs 2 --jobs -1 --synthetic-scale 2
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_data(seed, scale):
+    import bsit_recommendation
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = bsit_recommendation.generate_synthetic_responses(seed=seed, scale=scale)
+        df = bsit_recommendation.label_responses(df)
+        return bsit_recommendation.prepare_training_data(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare serial and parallel training wall-clock time')
+    parser.add_argument('--jobs', type=int, action='append', help='core counts to try (repeatable; default -1)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--synthetic-scale', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here as well')
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    from sklearn.model_selection import cross_val_score
+
+    import bsit_recommendation
+
+    X, y, _ = load_data(args.seed, args.synthetic_scale)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ensemble = bsit_recommendation.build_ensemble()
+
+    started = time.perf_counter()
+    baseline_scores = cross_val_score(ensemble, X, y, cv=5, scoring='accuracy')
+    baseline_model = ensemble.fit(X, y)
+    baseline_seconds = time.perf_counter() - started
+    baseline_proba = baseline_model.predict_proba(X)
+
+    report = {
+        'rows': len(X),
+        'features': X.shape[1],
+        'cores_available': bsit_recommendation.resolve_jobs(-1),
+        'baseline_s': round(baseline_seconds, 2),
+        'runs': []
+    }
+    for n_jobs in args.jobs or [-1]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            scores, model = bsit_recommendation.cross_validate_and_fit(
+                bsit_recommendation.build_ensemble(), X, y, cv=5, n_jobs=n_jobs
+            )
+            seconds = time.perf_counter() - started
+        report['runs'].append({
+            'jobs': n_jobs,
+            'cores_used': bsit_recommendation.resolve_jobs(n_jobs),
+            'seconds': round(seconds, 2),
+            'speedup': round(baseline_seconds / seconds, 2),
+            'same_scores': bool(np.array_equal(scores, baseline_scores)),
+            'max_proba_diff': float(np.abs(model.predict_proba(X) - baseline_proba).max())
+        })
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# worker_rss.py - Per-worker memory of the pickled model vs the memory-mapped artifact
+#
+# Forks N worker processes the way gunicorn does and reports what each one
+# holds once the model is loaded and has served a prediction:
+#   rss      resident pages, including pages shared with other processes
+#   pss      proportional share (shared pages divided by the number of sharers)
+#   private  pages only this worker has (what each extra worker really costs)
+#
+# Modes: pickle / artifact load in every worker; *-preload load once in the
+# parent before forking (gunicorn --preload).
+#
+# Usage (Linux):
+#   python benchmarks/worker_rss.py --pickle rf_ict_model.pkl --artifact rf_ict_model.artifact --workers 2
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def read_memory():
+    """RSS/PSS/private memory of this process in MB, from /proc/self/smaps_rollup"""
+    fields = {}
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+    return {
+        'rss': fields.get('Rss', 0.0),
+        'pss': fields.get('Pss', 0.0),
+        'private': fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0)
+    }
+
+
+def _worker(model_path, preloaded, barrier, results):
+    import numpy as np
+    import bsit_runner
+
+    before = read_memory()
+    predictor = preloaded if preloaded is not None else bsit_runner.ICTPredictor(model_path)
+    row = np.full((1, predictor.encoder.n_features), 3, dtype=np.float32)
+    predictor.infer(row)
+    # Measure while every worker is alive, so shared pages are split between them
+    barrier.wait()
+    after = read_memory()
+    results.put({'before_load': before, 'after_load': after})
+    barrier.wait()
+
+
+def measure(mode, model_path, workers):
+    import bsit_runner
+
+    bsit_runner.logger.setLevel('WARNING')
+    context = multiprocessing.get_context('fork')
+    preloaded = bsit_runner.ICTPredictor(model_path) if mode.endswith('-preload') else None
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(model_path, preloaded, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    def mean(stage, key):
+        return round(sum(sample[stage][key] for sample in samples) / len(samples), 2)
+
+    return {
+        'mode': mode,
+        'workers': workers,
+        'rss_mb': mean('after_load', 'rss'),
+        'pss_mb': mean('after_load', 'pss'),
+        'private_mb': mean('after_load', 'private'),
+        'private_growth_mb': round(mean('after_load', 'private') - mean('before_load', 'private'), 2)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare per-worker memory of the pickled model and the mmap artifact')
+    parser.add_argument('--pickle', default='rf_ict_model.pkl', help='pickled model (rf_ict_model.pkl)')
+    parser.add_argument('--artifact', help='artifact directory from model_store.py export')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--output', help='write the JSON report here as well')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        path = args.artifact if args.mode.startswith('artifact') else args.pickle
+        print(json.dumps(measure(args.mode, path, args.workers)))
+        return 0
+
+    modes = ['pickle', 'pickle-preload']
+    if args.artifact:
+        modes += ['artifact', 'artifact-preload']
+
+    # Each mode runs in a fresh interpreter so imports from one run do not leak into the next
+    report = {'workers': args.workers, 'runs': []}
+    for mode in modes:
+        command = [sys.executable, os.path.abspath(__file__), '--mode', mode, '--workers', str(args.workers),
+                   '--pickle', args.pickle] + (['--artifact', args.artifact] if args.artifact else [])
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        report['runs'].append(json.loads(output.strip().splitlines()[-1]))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
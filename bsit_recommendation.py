@@ -1,816 +1,720 @@
 # bsit_recommendation.py - Updated training script with new questionnaire structure
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from sklearn.experimental import enable_hist_gradient_boosting  # noqa: F401
-from sklearn.ensemble import HistGradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+#
+# Training only runs through the CLI (python bsit_recommendation.py); importing
+# this module has no side effects and does not import pandas or sklearn.
+import argparse
+import contextlib
+import hashlib
+import io
+import math
 import pickle
 import sys
 import os
-import random
+import tempfile
+import time
+import warnings
+from collections import namedtuple
 
-print("=== ICT Track Recommendation Training (Updated) ===")
+import numpy as np
+
+import data_source
+from questionnaire import get_questionnaire_questions
+from rule_engine import recommend_tracks, rule_rating, section_means_from_totals, section_masks
 
 # Your Google Sheets CSV URL
-sheet_csv_url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSCSq4GGdY8eTuPvDyYgig4hkEkqT7GaqkAvx6qrHmDdI3XE41Wt1zHhh3o-T_lusX7nR5e3syBelTC/pub?output=csv"
+SHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSCSq4GGdY8eTuPvDyYgig4hkEkqT7GaqkAvx6qrHmDdI3XE41Wt1zHhh3o-T_lusX7nR5e3syBelTC/pub?output=csv"
 
-# Try to load from Google Sheets first
-try:
-    df = pd.read_csv(sheet_csv_url)
-    print(f"✓ Loaded {len(df)} responses from Google Sheets")
-    print(f"✓ Columns: {list(df.columns)}")
-    # Always add synthetic data to ensure we have all track types
-    add_synthetic = True
-except Exception as e:
-    print(f"✗ Could not load Google Sheets: {e}")
-    df = pd.DataFrame()
-    add_synthetic = True
-
-# Define the new questionnaire structure
-def get_questionnaire_questions():
-    """Returns the complete questionnaire structure"""
-    
-    # Section 1: Basic Information
-    section1 = ['Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']
-    
-    # Section 2: Creative/Design Questions (100 questions)
-    section2 = [
-        "I enjoy designing posters, logos, or other visual materials.",
-        "I like editing photos or enhancing images.",
-        "I enjoy creating and editing videos.",
-        "I am passionate about animation and motion graphics.",
-        "I like experimenting with colors, shapes, and layouts.",
-        "I am interested in web design and interface aesthetics.",
-        "I enjoy storytelling through digital media.",
-        "I like creating digital content for social media.",
-        "I often notice design flaws in websites or apps.",
-        "I have an eye for visual balance and composition.",
-        "I like drawing, sketching, or illustrating.",
-        "I enjoy using creative software to make designs.",
-        "I pay attention to typography and fonts in designs.",
-        "I like collaborating with others on creative projects.",
-        "I prefer hands-on creative tasks over theoretical work.",
-        "I get excited learning about new design trends.",
-        "I find satisfaction when my creative work is appreciated.",
-        "I like expressing myself through digital art.",
-        "I am detail-oriented when it comes to visuals.",
-        "I often imagine new design ideas in my head.",
-        "I am comfortable using Adobe Photoshop or similar tools.",
-        "I want to improve my video editing skills.",
-        "I know how to use Canva, Figma, or similar tools.",
-        "I enjoy experimenting with visual effects.",
-        "I want to create my own brand or creative portfolio someday.",
-        "I can combine sound, video, and graphics creatively.",
-        "I enjoy learning software like Premiere Pro or After Effects.",
-        "I can visualize how a scene should look in a video.",
-        "I understand basic concepts of color theory.",
-        "I can work well under creative pressure.",
-        "I enjoy designing layouts for websites or magazines.",
-        "I am curious about how 3D design works.",
-        "I prefer creative work over coding.",
-        "I enjoy photo manipulation projects.",
-        "I am patient when editing long creative projects.",
-        "I get inspired by digital art online.",
-        "I like learning how advertisements are designed.",
-        "I can create a cohesive design theme.",
-        "I value originality in creative works.",
-        "I pay attention to small details when creating media.",
-        "I like presenting creative ideas visually.",
-        "I enjoy using editing software for videos or photos.",
-        "I am open to feedback on my creative output.",
-        "I can adjust designs based on audience preference.",
-        "I often explore creative communities or forums.",
-        "I am inspired by popular designers or digital artists.",
-        "I can mix creativity with functionality in designs.",
-        "I prefer creating content over analyzing data.",
-        "I am fascinated by digital marketing visuals.",
-        "I often design invitations, posters, or presentations.",
-        "I like making multimedia presentations engaging.",
-        "I can work with music and video synchronization.",
-        "I have experience with editing software or apps.",
-        "I enjoy creating infographics.",
-        "I like turning concepts into visuals.",
-        "I am excited by technological advancements in design.",
-        "I can think creatively even with limited resources.",
-        "I enjoy transforming simple ideas into digital art.",
-        "I'm confident showing my creative work to others.",
-        "I learn new creative tools quickly.",
-        "I prefer colorful designs over minimal ones.",
-        "I am familiar with basic UI/UX design.",
-        "I like learning about animation principles.",
-        "I am interested in film and visual storytelling.",
-        "I pay attention to trends in graphic design.",
-        "I enjoy brainstorming creative ideas.",
-        "I am patient during repetitive creative tasks.",
-        "I am resourceful when working on creative projects.",
-        "I like organizing digital assets for design projects.",
-        "I can adapt to different design styles.",
-        "I understand the importance of branding.",
-        "I can interpret client needs visually.",
-        "I enjoy typography experiments.",
-        "I can work with limited creative direction.",
-        "I like producing multimedia content for campaigns.",
-        "I am proud of my creative accomplishments.",
-        "I enjoy visual storytelling challenges.",
-        "I keep my design files and projects organized.",
-        "I am open to exploring augmented or virtual reality in design.",
-        "I am curious about UI animation.",
-        "I enjoy designing icons and logos.",
-        "I can mix photography and design effectively.",
-        "I want to pursue a creative digital career.",
-        "I find inspiration in art, film, and media.",
-        "I enjoy testing different color combinations.",
-        "I often redesign visuals I see online for fun.",
-        "I am eager to learn new editing software.",
-        "I like teaching others how to design.",
-        "I can imagine scenes vividly before creating them.",
-        "I am attracted to multimedia-based careers.",
-        "I am comfortable working on long creative projects.",
-        "I enjoy designing for specific audiences.",
-        "I think visually rather than verbally.",
-        "I am interested in creative freelancing.",
-        "I enjoy blending sound, motion, and visuals.",
-        "I can describe my ideas visually.",
-        "I often give creative suggestions to others.",
-        "I value aesthetics in everything I do.",
-        "I want to become a multimedia professional.",
-        "I believe creativity defines my personality."
-    ]
-    
-    # Section 3: Data Analytics Questions (100 questions)
-    section3 = [
-        "I enjoy working with numbers and statistics.",
-        "I like solving logical problems.",
-        "I find patterns easily in large amounts of information.",
-        "I enjoy analyzing data to make conclusions.",
-        "I am detail-oriented when working on data.",
-        "I prefer logic over creativity.",
-        "I enjoy solving math-related challenges.",
-        "I like working with spreadsheets or data tools.",
-        "I am curious about how businesses use data to improve.",
-        "I find satisfaction in discovering insights from data.",
-        "I am comfortable using Microsoft Excel or Google Sheets.",
-        "I enjoy organizing data into tables and graphs.",
-        "I like working on step-by-step logical solutions.",
-        "I enjoy learning programming or scripting languages.",
-        "I like exploring patterns and relationships between variables.",
-        "I am interested in learning about artificial intelligence.",
-        "I am curious about machine learning and predictive modeling.",
-        "I like reading about data science applications.",
-        "I can interpret graphs, charts, and data visualizations easily.",
-        "I prefer accuracy and precision in my work.",
-        "I like to test hypotheses and find evidence-based answers.",
-        "I am excited by solving data-driven problems.",
-        "I can focus on detailed tasks for long periods.",
-        "I am curious how companies use big data.",
-        "I like using technology to solve real-world issues.",
-        "I can work independently on analytical tasks.",
-        "I enjoy using logic to make decisions.",
-        "I like automating repetitive tasks using scripts.",
-        "I am familiar with coding basics (Python, SQL, etc.).",
-        "I am patient when solving complex data problems.",
-        "I like visualizing numbers in graphs or dashboards.",
-        "I am curious about how algorithms work.",
-        "I prefer structured data over creative designs.",
-        "I enjoy comparing datasets for trends.",
-        "I am confident with basic math and statistics.",
-        "I like troubleshooting errors in data.",
-        "I prefer data accuracy over speed.",
-        "I enjoy working with logical reasoning puzzles.",
-        "I can explain findings based on facts and data.",
-        "I am open to learning advanced analytics tools.",
-        "I can write simple code to process data.",
-        "I like learning programming-related concepts.",
-        "I am interested in business intelligence.",
-        "I am curious about how Google or YouTube analyze data.",
-        "I want to learn data visualization tools like Tableau or Power BI.",
-        "I enjoy reporting data insights to others.",
-        "I find satisfaction in debugging code or formulas.",
-        "I can analyze trends in sales, traffic, or statistics.",
-        "I am confident in interpreting percentages and averages.",
-        "I like optimizing systems using data.",
-        "I am curious about predictive analytics.",
-        "I want to understand how AI learns from data.",
-        "I am good at comparing multiple results.",
-        "I like breaking down problems logically.",
-        "I am organized when managing data.",
-        "I like verifying if results are accurate.",
-        "I prefer working on research and reports.",
-        "I enjoy challenging math or coding problems.",
-        "I am focused when handling analytical work.",
-        "I enjoy learning about data storage and management.",
-        "I am curious about cybersecurity and data integrity.",
-        "I like tracking progress using numbers.",
-        "I prefer logic-based decisions over emotions.",
-        "I can work comfortably with digital tools.",
-        "I like understanding how technology processes data.",
-        "I am eager to learn machine learning models.",
-        "I am confident explaining graphs to others.",
-        "I enjoy accuracy and attention to detail.",
-        "I like designing systems that make smart decisions.",
-        "I am excited by the future of AI and analytics.",
-        "I am familiar with CSV or database files.",
-        "I can interpret correlations and trends.",
-        "I enjoy comparing data sets visually.",
-        "I am disciplined when testing code or data.",
-        "I can handle abstract problems analytically.",
-        "I enjoy optimizing performance through metrics.",
-        "I like writing algorithms.",
-        "I can explain complex ideas in simple terms.",
-        "I prefer factual arguments over emotional ones.",
-        "I like coding challenges and logical games.",
-        "I enjoy mathematics and problem-solving.",
-        "I am confident handling large data sets.",
-        "I want to work in tech-related analytics jobs.",
-        "I am interested in business analytics.",
-        "I am eager to learn Python or R.",
-        "I like building data dashboards.",
-        "I am curious about cloud-based data tools.",
-        "I can work well under analytical deadlines.",
-        "I can explain why trends happen in data.",
-        "I prefer practical applications of math.",
-        "I am comfortable using logical formulas.",
-        "I want to specialize in data analytics.",
-        "I am curious about predictive systems.",
-        "I like improving systems using data.",
-        "I can combine logic and creativity effectively.",
-        "I want to pursue a career as a data analyst.",
-        "I enjoy working with structured data.",
-        "I find numbers easier to understand than text.",
-        "I am confident in using data to make decisions.",
-        "I believe analytical thinking defines me."
-    ]
-    
-    # Section 4: Networking Questions (100 questions)
-    section4 = [
-        "I am interested in how computers connect to the internet.",
-        "I enjoy troubleshooting connectivity issues.",
-        "I like understanding how data travels between devices.",
-        "I am curious about how Wi-Fi and routers work.",
-        "I enjoy configuring hardware devices.",
-        "I like solving technical computer problems.",
-        "I am interested in computer architecture.",
-        "I prefer working on technical rather than creative tasks.",
-        "I enjoy assembling or disassembling computers.",
-        "I am fascinated by how servers operate.",
-        "I am curious about cybersecurity and firewalls.",
-        "I like managing hardware and network devices.",
-        "I enjoy configuring IP addresses or LAN connections.",
-        "I like diagnosing network performance problems.",
-        "I prefer working with cables, routers, and switches.",
-        "I am comfortable using terminal or command line tools.",
-        "I enjoy learning about network protocols.",
-        "I am patient when solving technical errors.",
-        "I enjoy working with operating systems and setup.",
-        "I like experimenting with network configurations.",
-        "I am curious about how the internet infrastructure works.",
-        "I am detail-oriented when working with systems.",
-        "I enjoy installing software and system updates.",
-        "I like securing systems from unauthorized access.",
-        "I am comfortable managing computer laboratories.",
-        "I enjoy learning about data transmission.",
-        "I like organizing cables and hardware equipment.",
-        "I am excited about emerging networking technologies.",
-        "I prefer structured systems over creative projects.",
-        "I can handle hands-on hardware tasks.",
-        "I enjoy connecting and testing different devices.",
-        "I am familiar with IP, DNS, or DHCP.",
-        "I like monitoring system performance.",
-        "I can identify and fix technical errors quickly.",
-        "I like updating device firmware or settings.",
-        "I can follow technical documentation well.",
-        "I prefer logical step-by-step tasks.",
-        "I am familiar with basic Linux commands.",
-        "I am curious about cloud networks.",
-        "I like learning about servers and storage systems.",
-        "I am confident configuring basic routers.",
-        "I enjoy experimenting with virtualization tools.",
-        "I like researching solutions for network problems.",
-        "I am patient when testing configurations.",
-        "I am curious about enterprise-level systems.",
-        "I like reading technical manuals.",
-        "I enjoy comparing network performance metrics.",
-        "I can handle repetitive setup tasks efficiently.",
-        "I can document system configurations properly.",
-        "I enjoy upgrading and maintaining networks.",
-        "I am interested in computer maintenance.",
-        "I like checking network cables and devices.",
-        "I am fascinated by how data centers work.",
-        "I like designing efficient network layouts.",
-        "I prefer tasks that require technical precision.",
-        "I enjoy working with system hardware.",
-        "I like observing network speed and connectivity.",
-        "I am excited about learning Cisco or similar tools.",
-        "I can explain how devices communicate in a network.",
-        "I like optimizing network efficiency.",
-        "I am comfortable handling complex setups.",
-        "I can multitask during technical troubleshooting.",
-        "I like testing ping, trace route, and connections.",
-        "I enjoy maintaining local area networks.",
-        "I am curious about IoT devices and communication.",
-        "I like designing secured network topologies.",
-        "I prefer system administration tasks.",
-        "I am patient during testing and installation.",
-        "I like improving system reliability.",
-        "I am confident setting up routers or switches.",
-        "I enjoy observing network data flow.",
-        "I like implementing firewall rules.",
-        "I am excited by innovations in computer networking.",
-        "I am interested in network automation.",
-        "I prefer practical tasks over paperwork.",
-        "I like optimizing network traffic.",
-        "I am curious about virtual private networks (VPNs).",
-        "I enjoy building and maintaining IT infrastructure.",
-        "I can easily identify connection issues.",
-        "I like working in a team for technical projects.",
-        "I prefer configuring systems over designing graphics.",
-        "I am organized with system configurations.",
-        "I like testing devices and connections.",
-        "I am confident setting up local networks.",
-        "I am motivated to learn new networking technologies.",
-        "I enjoy understanding how the cloud works.",
-        "I like maintaining security across systems.",
-        "I am eager to get certified in networking (e.g., CCNA).",
-        "I can visualize network layouts mentally.",
-        "I am comfortable documenting hardware inventory.",
-        "I enjoy managing multiple computers simultaneously.",
-        "I prefer fieldwork over paperwork.",
-        "I am excited about careers in IT and networking.",
-        "I like configuring wireless networks.",
-        "I can follow instructions carefully during setup.",
-        "I want to work as a network administrator someday.",
-        "I enjoy keeping systems secure and running smoothly.",
-        "I am good at troubleshooting system errors.",
-        "I want to specialize in computer networking.",
-        "I believe technical problem-solving defines me."
-    ]
-    
-    return section1, section2, section3, section4
-
-# Add synthetic data to ensure all tracks are represented
-if add_synthetic:
-    print("Adding comprehensive synthetic training data for all tracks...")
-    synthetic_data = []
-    
-    # Helper function to generate random responses
-    def random_gender():
-        return random.choice(['Male', 'Female'])
-    
-    def random_age():
-        return random.randint(17, 22)
-    
-    def random_strand():
-        return random.choice(['STEM', 'ABM', 'HUMSS', 'GAS', 'TVL'])
-    
-    def random_rating():
-        return random.randint(1, 5)
-    
-    # Get questionnaire structure
-    section1, section2, section3, section4 = get_questionnaire_questions()
-    
-    # BSCS Students (Programming-focused) - 50 samples
-    for i in range(50):
-        responses = {
-            'Timestamp': f'2024/01/{i+1:02d} 10:00:00',
-            'Email Address': f'bscs_student_{i+1}@test.com',
-            'Full Name': f'BSCS Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (low scores for BSCS)
-        for question in section2:
-            responses[question] = random.choice([1, 2, 3])  # Low creative interest
-        
-        # Section 3: Data Analytics questions (moderate-high scores for BSCS)
-        for question in section3:
-            responses[question] = random.choice([3, 4, 5])  # Moderate-high analytical interest
-        
-        # Section 4: Networking questions (moderate scores for BSCS)
-        for question in section4:
-            responses[question] = random.choice([2, 3, 4])  # Moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSCS'
-        synthetic_data.append(responses)
-    
-    # BSIT-MULTIMEDIA Students (Creative-focused) - 50 samples
-    for i in range(50):
-        responses = {
-            'Timestamp': f'2024/01/{i+16:02d} 11:00:00',
-            'Email Address': f'bsit_multimedia_{i+1}@test.com',
-            'Full Name': f'BSIT Multimedia Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (high scores for BSIT-MULTIMEDIA)
-        for question in section2:
-            responses[question] = random.choice([4, 5])  # High creative interest
-        
-        # Section 3: Data Analytics questions (low-moderate scores for BSIT-MULTIMEDIA)
-        for question in section3:
-            responses[question] = random.choice([2, 3])  # Low-moderate analytical interest
-        
-        # Section 4: Networking questions (low-moderate scores for BSIT-MULTIMEDIA)
-        for question in section4:
-            responses[question] = random.choice([2, 3])  # Low-moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSIT'
-        synthetic_data.append(responses)
-    
-    # BSIT-DATA ANALYTICS Students - 50 samples
-    for i in range(50):
-        responses = {
-            'Timestamp': f'2024/01/{i+31:02d} 12:00:00',
-            'Email Address': f'bsit_data_{i+1}@test.com',
-            'Full Name': f'BSIT Data Analytics Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (low-moderate scores for BSIT-DATA ANALYTICS)
-        for question in section2:
-            responses[question] = random.choice([2, 3])  # Low-moderate creative interest
-        
-        # Section 3: Data Analytics questions (high scores for BSIT-DATA ANALYTICS)
-        for question in section3:
-            responses[question] = random.choice([4, 5])  # High analytical interest
-        
-        # Section 4: Networking questions (moderate scores for BSIT-DATA ANALYTICS)
-        for question in section4:
-            responses[question] = random.choice([3, 4])  # Moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSIT'
-        synthetic_data.append(responses)
-    
-    # BSCPE Students (Networking-focused) - 50 samples
-    for i in range(50):
-        responses = {
-            'Timestamp': f'2024/01/{i+46:02d} 13:00:00',
-            'Email Address': f'networking_student_{i+1}@test.com',
-            'Full Name': f'Networking Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (low scores for BSCPE)
-        for question in section2:
-            responses[question] = random.choice([1, 2, 3])  # Low creative interest
-        
-        # Section 3: Data Analytics questions (moderate scores for BSCPE)
-        for question in section3:
-            responses[question] = random.choice([2, 3, 4])  # Moderate analytical interest
-        
-        # Section 4: Networking questions (high scores for BSCPE)
-        for question in section4:
-            responses[question] = random.choice([4, 5])  # High networking interest
-        
-        responses['Recommended_Track'] = 'BSCPE'
-        synthetic_data.append(responses)
-    
-    # Add mixed/borderline profiles for better model training (25 samples each)
-    print("Adding mixed profiles for enhanced accuracy...")
-    
+MODEL_OUTPUT = 'rf_ict_model.pkl'
+
+# Incremental training: smallest growth per round, and synthetic rows per class mixed into each batch
+MIN_NEW_TREES = 10
+MIN_NEW_ITERATIONS = 5
+ANCHOR_ROWS_PER_CLASS = 5
+
+# Rating used for unanswered or invalid questions
+NEUTRAL_ANSWER = 3
+
+# Rows labeled per block by auto_recommend_tracks (bounds the float64 rating matrix)
+LABEL_CHUNK_ROWS = 16384
+
+
+def load_responses(source=SHEET_CSV_URL, snapshot_dir=data_source.SNAPSHOT_DIR, offline=False):
+    """Questionnaire responses as a data_source.Responses (frame, digest, origin).
+
+    source is the sheet URL (read through the local snapshot cache), a CSV
+    file or a directory of CSV files. When nothing can be loaded the frame
+    is empty and training continues on synthetic data only.
+    """
+    import pandas as pd
+
+    try:
+        responses = data_source.load(source, snapshot_dir, offline=offline)
+    except Exception as e:
+        print(f"✗ Could not load questionnaire responses: {e}")
+        print("✗ Training on synthetic data only")
+        return data_source.Responses(pd.DataFrame(), None, 'none')
+    print(f"✓ Loaded {len(responses.frame)} responses ({responses.origin}, snapshot {responses.digest[:12]})")
+    print(f"✓ Columns: {list(responses.frame.columns)}")
+    return responses
+
+
+# Synthetic cohorts that make sure every track is represented in training.
+# Ratings are inclusive (low, high) ranges per section; every question in the
+# section is drawn uniformly from that range. Identity columns are formatted
+# from n = 1..rows (timestamp day = first_day + n - 1).
+SyntheticCohort = namedtuple(
+    'SyntheticCohort',
+    'track rows creative analytical networking email name timestamp first_day'
+)
+
+SYNTHETIC_COHORTS = (
+    # BSCS Students (Programming-focused): low creative, moderate-high analytical, moderate networking
+    SyntheticCohort('BSCS', 50, (1, 3), (3, 5), (2, 4), 'bscs_student_{}@test.com', 'BSCS Student {}', '2024/01/{:02d} 10:00:00', 1),
+    # BSIT-MULTIMEDIA Students (Creative-focused): high creative, low-moderate analytical and networking
+    SyntheticCohort('BSIT', 50, (4, 5), (2, 3), (2, 3), 'bsit_multimedia_{}@test.com', 'BSIT Multimedia Student {}', '2024/01/{:02d} 11:00:00', 16),
+    # BSIT-DATA ANALYTICS Students: low-moderate creative, high analytical, moderate networking
+    SyntheticCohort('BSIT', 50, (2, 3), (4, 5), (3, 4), 'bsit_data_{}@test.com', 'BSIT Data Analytics Student {}', '2024/01/{:02d} 12:00:00', 31),
+    # BSCPE Students (Networking-focused): low creative, moderate analytical, high networking
+    SyntheticCohort('BSCPE', 50, (1, 3), (2, 4), (4, 5), 'networking_student_{}@test.com', 'Networking Student {}', '2024/01/{:02d} 13:00:00', 46),
+    # Mixed/borderline profiles for better model training
     # Mixed Creative + Data Analytics (BSIT-DATA ANALYTICS candidates)
-    for i in range(25):
-        responses = {
-            'Timestamp': f'2024/02/{i+1:02d} 15:00:00',
-            'Email Address': f'mixed_data_{i+1}@test.com',
-            'Full Name': f'Mixed Data Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (moderate-high scores)
-        for question in section2:
-            responses[question] = random.choice([3, 4, 5])  # Moderate-high creative interest
-        
-        # Section 3: Data Analytics questions (high scores)
-        for question in section3:
-            responses[question] = random.choice([4, 5])  # High analytical interest
-        
-        # Section 4: Networking questions (low-moderate scores)
-        for question in section4:
-            responses[question] = random.choice([2, 3])  # Low-moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSIT'
-        synthetic_data.append(responses)
-    
+    SyntheticCohort('BSIT', 25, (3, 5), (4, 5), (2, 3), 'mixed_data_{}@test.com', 'Mixed Data Student {}', '2024/02/{:02d} 15:00:00', 1),
     # Mixed Creative + Networking (BSIT-MULTIMEDIA candidates)
-    for i in range(25):
-        responses = {
-            'Timestamp': f'2024/02/{i+26:02d} 16:00:00',
-            'Email Address': f'mixed_creative_{i+1}@test.com',
-            'Full Name': f'Mixed Creative Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (high scores)
-        for question in section2:
-            responses[question] = random.choice([4, 5])  # High creative interest
-        
-        # Section 3: Data Analytics questions (low-moderate scores)
-        for question in section3:
-            responses[question] = random.choice([2, 3])  # Low-moderate analytical interest
-        
-        # Section 4: Networking questions (moderate-high scores)
-        for question in section4:
-            responses[question] = random.choice([3, 4, 5])  # Moderate-high networking interest
-        
-        responses['Recommended_Track'] = 'BSIT'
-        synthetic_data.append(responses)
-    
+    SyntheticCohort('BSIT', 25, (4, 5), (2, 3), (3, 5), 'mixed_creative_{}@test.com', 'Mixed Creative Student {}', '2024/02/{:02d} 16:00:00', 26),
     # Mixed Data + Networking (BSCPE candidates)
-    for i in range(25):
-        responses = {
-            'Timestamp': f'2024/02/{i+51:02d} 17:00:00',
-            'Email Address': f'mixed_networking_{i+1}@test.com',
-            'Full Name': f'Mixed Networking Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (low scores)
-        for question in section2:
-            responses[question] = random.choice([1, 2])  # Low creative interest
-        
-        # Section 3: Data Analytics questions (moderate-high scores)
-        for question in section3:
-            responses[question] = random.choice([3, 4, 5])  # Moderate-high analytical interest
-        
-        # Section 4: Networking questions (high scores)
-        for question in section4:
-            responses[question] = random.choice([4, 5])  # High networking interest
-        
-        responses['Recommended_Track'] = 'BSCPE'
-        synthetic_data.append(responses)
-    
+    SyntheticCohort('BSCPE', 25, (1, 2), (3, 5), (4, 5), 'mixed_networking_{}@test.com', 'Mixed Networking Student {}', '2024/02/{:02d} 17:00:00', 51),
     # Balanced profiles (BSIT-MULTIMEDIA candidates)
-    for i in range(25):
-        responses = {
-            'Timestamp': f'2024/02/{i+76:02d} 18:00:00',
-            'Email Address': f'balanced_multimedia_{i+1}@test.com',
-            'Full Name': f'Balanced Multimedia Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # All sections with moderate scores (balanced profile)
-        for question in section2:
-            responses[question] = random.choice([3, 4])  # Moderate creative interest
-        for question in section3:
-            responses[question] = random.choice([2, 3])  # Low-moderate analytical interest
-        for question in section4:
-            responses[question] = random.choice([2, 3])  # Low-moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSIT'
-        synthetic_data.append(responses)
-    
+    SyntheticCohort('BSIT', 25, (3, 4), (2, 3), (2, 3), 'balanced_multimedia_{}@test.com', 'Balanced Multimedia Student {}', '2024/02/{:02d} 18:00:00', 76),
     # Programming-focused profiles (BSCS candidates)
-    for i in range(25):
-        responses = {
-            'Timestamp': f'2024/02/{i+101:02d} 19:00:00',
-            'Email Address': f'programming_{i+1}@test.com',
-            'Full Name': f'Programming Student {i+1}',
-            'Age': random_age(), 
-            'Gender': random_gender(),
-            'Strand': random_strand()
-        }
-        
-        # Section 2: Creative/Design questions (low scores)
-        for question in section2:
-            responses[question] = random.choice([1, 2, 3])  # Low creative interest
-        
-        # Section 3: Data Analytics questions (high scores)
-        for question in section3:
-            responses[question] = random.choice([4, 5])  # High analytical interest
-        
-        # Section 4: Networking questions (moderate scores)
-        for question in section4:
-            responses[question] = random.choice([3, 4])  # Moderate networking interest
-        
-        responses['Recommended_Track'] = 'BSCS'
-        synthetic_data.append(responses)
-    
-    synthetic_df = pd.DataFrame(synthetic_data)
+    SyntheticCohort('BSCS', 25, (1, 3), (4, 5), (3, 4), 'programming_{}@test.com', 'Programming Student {}', '2024/02/{:02d} 19:00:00', 101),
+)
+
+SYNTHETIC_SEED = 42
+GENDERS = ('Male', 'Female')
+STRANDS = ('STEM', 'ABM', 'HUMSS', 'GAS', 'TVL')
+
+
+def generate_synthetic_responses(cohorts=SYNTHETIC_COHORTS, seed=SYNTHETIC_SEED, scale=1):
+    """Labeled synthetic responses as a DataFrame, reproducible from seed.
+
+    Each cohort's ratings are one (rows, questions) int8 matrix, filled with
+    one rng.integers call per section. scale multiplies every cohort's row
+    count (scale=300 gives ~100k rows).
+    """
+    import pandas as pd
+
+    section1, section2, section3, section4 = get_questionnaire_questions()
+    sections = (section2, section3, section4)
+    questions = [question for section in sections for question in section]
+    edges = np.cumsum([0] + [len(section) for section in sections]).tolist()
+    bounds = list(zip(edges[:-1], edges[1:]))
+    rng = np.random.default_rng(seed)
+
+    frames = []
+    for cohort in cohorts:
+        rows = cohort.rows * scale
+        ratings = np.empty((rows, len(questions)), dtype=np.int8)
+        for (start, stop), (low, high) in zip(bounds, (cohort.creative, cohort.analytical, cohort.networking)):
+            ratings[:, start:stop] = rng.integers(low, high, size=(rows, stop - start), dtype=np.int8, endpoint=True)
+
+        numbers = range(1, rows + 1)
+        timestamp, email, name = cohort.timestamp.format, cohort.email.format, cohort.name.format
+        identity = pd.DataFrame({
+            'Timestamp': [timestamp(cohort.first_day + n - 1) for n in numbers],
+            'Email Address': [email(n) for n in numbers],
+            'Full Name': [name(n) for n in numbers],
+            'Age': rng.integers(17, 22, size=rows, dtype=np.int8, endpoint=True),
+            'Gender': np.asarray(GENDERS, dtype=object)[rng.integers(0, len(GENDERS), size=rows)],
+            'Strand': np.asarray(STRANDS, dtype=object)[rng.integers(0, len(STRANDS), size=rows)]
+        })
+        frame = pd.concat([identity, pd.DataFrame(ratings, columns=questions)], axis=1)
+        frame['Recommended_Track'] = cohort.track
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def add_synthetic_responses(df, seed=SYNTHETIC_SEED, scale=1):
+    """Append labeled synthetic responses so every track is represented"""
+    import pandas as pd
+
+    print("Adding comprehensive synthetic training data for all tracks...")
+    synthetic_df = generate_synthetic_responses(seed=seed, scale=scale)
     df = pd.concat([df, synthetic_df], ignore_index=True)
-    print(f"✓ Added {len(synthetic_data)} synthetic samples")
+    print(f"✓ Added {len(synthetic_df)} synthetic samples")
+    return df
+
 
 # Enhanced rule-based track assignment
 def auto_recommend_track(row):
     """Enhanced rule-based track assignment with new questionnaire structure"""
-    scores = {'BSCS': 0, 'BSIT-DATA ANALYTICS': 0, 'BSIT-MULTIMEDIA': 0, 'BSIT': 0, 'BSCPE': 0}
-    
-    # Helper function to safely get values
-    def safe_get(key_patterns):
-        for pattern in key_patterns:
-            for col_name, value in row.items():
-                if isinstance(col_name, str) and pattern.lower() in col_name.lower():
-                    return str(value).strip()
-        return ''
-    
-    # Helper to check rating responses
-    def get_rating(response):
-        try:
-            return int(response) if response.isdigit() else 0
-        except:
-            return 0
-    
-    # Calculate scores based on sections
-    creative_score = 0
-    analytical_score = 0
-    networking_score = 0
-    
-    # Count creative questions (Section 2)
-    creative_count = 0
-    for col_name, value in row.items():
-        if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['designing', 'editing', 'creating', 'visual', 'graphics', 'animation', 'colors', 'drawing', 'creative']):
-            creative_score += get_rating(str(value))
-            creative_count += 1
-    
-    # Count analytical questions (Section 3)
-    analytical_count = 0
-    for col_name, value in row.items():
-        if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['numbers', 'statistics', 'data', 'analytics', 'patterns', 'logical', 'math', 'programming', 'algorithms']):
-            analytical_score += get_rating(str(value))
-            analytical_count += 1
-    
-    # Count networking questions (Section 4)
-    networking_count = 0
-    for col_name, value in row.items():
-        if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['computers', 'connect', 'internet', 'network', 'hardware', 'routers', 'servers', 'technical', 'cables']):
-            networking_score += get_rating(str(value))
-            networking_count += 1
-    
-    # Normalize scores
-    if creative_count > 0:
-        creative_score = creative_score / creative_count
-    if analytical_count > 0:
-        analytical_score = analytical_score / analytical_count
-    if networking_count > 0:
-        networking_score = networking_score / networking_count
-    
-    # Assign scores to tracks
-    scores['BSIT-MULTIMEDIA'] = creative_score
-    scores['BSIT-DATA ANALYTICS'] = analytical_score
-    scores['BSCPE'] = networking_score
-    
-    # BSCS gets points for high analytical + moderate creative
-    if analytical_score >= 3.5 and creative_score >= 2.5:
-        scores['BSCS'] = (analytical_score + creative_score) / 2
-    else:
-        scores['BSCS'] = analytical_score * 0.8
-    
-    # BSIT gets points if no strong specialization
-    max_specialist_score = max(scores['BSCS'], scores['BSIT-DATA ANALYTICS'], scores['BSIT-MULTIMEDIA'], scores['BSCPE'])
-    if max_specialist_score < 3.5:
-        scores['BSIT'] = 3.0
+    # Section membership per column is compiled once per column set (see rule_engine)
+    masks = section_masks(row.index)
+    ratings = np.fromiter((rule_rating(value) for value in row.values), dtype=np.float64, count=len(row))
+    means = masks.section_means(ratings[np.newaxis, :])
+    return recommend_tracks(means)[0]
+
+
+def rule_ratings(df, columns):
+    """rule_rating of every cell of df[columns], as auto_recommend_track reads it from a df.apply(axis=1) row.
+
+    Integer cells count when non-negative; float and bool cells never do
+    (str(4.0) is not a digit string); any other column is mapped through
+    rule_rating once per distinct value. A frame of numpy numeric columns
+    only hands apply() rows upcast to their common dtype, so that dtype is
+    what decides there.
+    """
+    dtypes = list(df.dtypes)
+    numeric_rows = all(isinstance(dtype, np.dtype) and dtype.kind in 'biuf' for dtype in dtypes)
+    row_kind = np.result_type(*dtypes).kind if numeric_rows and dtypes else None
+
+    ratings = np.zeros((len(df), len(columns)), dtype=np.float64)
+    for index, col in enumerate(columns):
+        column = df[col]
+        kind = row_kind or (column.dtype.kind if isinstance(column.dtype, np.dtype) else 'O')
+        if kind in 'iu':
+            values = column.to_numpy()
+            ratings[:, index] = np.where(values >= 0, values, 0)
+        elif kind not in 'bf':
+            codes, uniques = column.factorize(use_na_sentinel=False)
+            ratings[:, index] = np.fromiter((rule_rating(value) for value in uniques), dtype=np.float64, count=len(uniques))[codes]
+    return ratings
+
+
+def auto_recommend_tracks(df, chunk_rows=LABEL_CHUNK_ROWS):
+    """auto_recommend_track for every row of df at once (same labels, no per-row Python)"""
+    masks = section_masks(df.columns)
+    # Columns outside every section add nothing, so only section questions are rated
+    scored = np.flatnonzero(masks.matrix.any(axis=1))
+    columns = [df.columns[i] for i in scored]
+    matrix = masks.matrix[scored]
+    labels = []
+    for start in range(0, len(df), chunk_rows):
+        ratings = rule_ratings(df.iloc[start:start + chunk_rows], columns)
+        means = section_means_from_totals(ratings @ matrix, np.broadcast_to(masks.counts, (len(ratings), matrix.shape[1])))
+        labels.extend(recommend_tracks(means))
+    return labels
+
+
+def label_responses(df):
+    """Fill in Recommended_Track with the rule-based labeler where it is missing"""
+    # Apply rule-based recommendations if column doesn't exist
+    if 'Recommended_Track' not in df.columns:
+        print("Creating Recommended_Track column...")
+        df['Recommended_Track'] = auto_recommend_tracks(df)
+        print("✓ Auto-labeling completed!")
+
+    # Clean up any NaN values in Recommended_Track
+    df['Recommended_Track'] = df['Recommended_Track'].fillna('BSIT')
+    df = df[df['Recommended_Track'].notna()]
+
+    print("\nTrack distribution:")
+    print(df['Recommended_Track'].value_counts())
+    # Clean up any NaN values and convert to string
+    df['Recommended_Track'] = df['Recommended_Track'].astype(str)
+    df = df[df['Recommended_Track'] != 'nan']  # Remove any NaN rows
+    print(f"Tracks available: {sorted(df['Recommended_Track'].unique())}")
+    return df
+
+
+def label_training_responses(df):
+    """Label questionnaire responses the way every training path does (full and incremental).
+
+    Form responses carry no Recommended_Track. Full training has always
+    appended the labeled synthetic cohorts before labeling, so those rows
+    are filled with 'BSIT' rather than rule-labeled with the full track list
+    (which the model's basic-track encoder would not accept).
+    """
+    if 'Recommended_Track' not in df.columns:
+        df = df.assign(Recommended_Track=None)
+    return label_responses(df)
+
+
+def prepare_training_data(df, le_target=None, feature_names=None):
+    """Numeric feature matrix X, encoded target y and the target LabelEncoder.
+
+    Pass the le_target and feature_names of an existing model to encode new
+    rows the way it was trained (incremental training); otherwise both are
+    derived from df.
+    """
+    import pandas as pd
+    from sklearn.preprocessing import LabelEncoder
+
+    # Data processing
+    print("\nProcessing data for training...")
+
+    # Convert rating columns to one int8 block; unanswered or invalid ratings count as neutral (3)
+    rating_cols = [col for col in df.columns if col not in ['Recommended_Track', 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']]
+    print(f"Converting {len(rating_cols)} rating columns...")
+
+    ratings = df[rating_cols]
+    compact = all(dtype == np.int8 for dtype in ratings.dtypes)
+    ratings = ratings.to_numpy() if compact else data_source.compact_answers(ratings, coerce=True).to_numpy()
+    ratings = np.where(ratings == data_source.MISSING_ANSWER, NEUTRAL_ANSWER, ratings).astype(np.int8)
+
+    # Encode target variable
+    target_col = 'Recommended_Track'
+    # Ensure all values are strings and clean
+    df[target_col] = df[target_col].astype(str).str.strip()
+    keep = (df[target_col] != 'nan').to_numpy()
+    df = df[keep]  # Remove any remaining NaN values
+    if le_target is None:
+        le_target = LabelEncoder()
+        df[target_col] = le_target.fit_transform(df[target_col])
     else:
-        scores['BSIT'] = 2.0
-    
-    # Return track with highest score
-    max_score = max(scores.values())
-    for track, score in scores.items():
-        if score == max_score:
-            return track
-    
-    return 'BSIT'  # Fallback
-
-# Apply rule-based recommendations if column doesn't exist
-if 'Recommended_Track' not in df.columns:
-    print("Creating Recommended_Track column...")
-    df['Recommended_Track'] = df.apply(auto_recommend_track, axis=1)
-    print("✓ Auto-labeling completed!")
-
-# Clean up any NaN values in Recommended_Track
-df['Recommended_Track'] = df['Recommended_Track'].fillna('BSIT')
-df = df[df['Recommended_Track'].notna()]
-
-print("\nTrack distribution:")
-print(df['Recommended_Track'].value_counts())
-# Clean up any NaN values and convert to string
-df['Recommended_Track'] = df['Recommended_Track'].astype(str)
-df = df[df['Recommended_Track'] != 'nan']  # Remove any NaN rows
-print(f"Tracks available: {sorted(df['Recommended_Track'].unique())}")
-
-# Data processing
-print("\nProcessing data for training...")
-
-# Convert rating columns to numeric
-rating_cols = [col for col in df.columns if col not in ['Recommended_Track', 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']]
-print(f"Converting {len(rating_cols)} rating columns...")
-
-for col in rating_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(3)
-
-# Encode target variable
-target_col = 'Recommended_Track'
-le_target = LabelEncoder()
-# Ensure all values are strings and clean
-df[target_col] = df[target_col].astype(str).str.strip()
-df = df[df[target_col] != 'nan']  # Remove any remaining NaN values
-df[target_col] = le_target.fit_transform(df[target_col])
-
-print(f"Target classes: {le_target.classes_}")
-
-# Prepare features for training
-columns_to_drop = [target_col, 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']
-existing_cols_to_drop = [col for col in columns_to_drop if col in df.columns]
-X = df.drop(columns=existing_cols_to_drop)
-
-# Convert any remaining object columns to numeric
-for col in X.columns:
-    if X[col].dtype == 'object':
-        X[col] = pd.to_numeric(X[col], errors='coerce').fillna(0)
-
-y = df[target_col]
-
-print(f"\nTraining features: {len(X.columns)}")
-print(f"Training samples: {len(X)}")
-print(f"Feature columns: {list(X.columns)}")
-
-# Build individual learners
-rf = RandomForestClassifier(
-    n_estimators=300,
-    random_state=42,
-    max_depth=15,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    max_features='sqrt',
-    class_weight='balanced'
-)
+        unknown = sorted(set(df[target_col]) - set(le_target.classes_))
+        if unknown:
+            raise ValueError(f"Tracks the model was not trained on: {unknown}")
+        df[target_col] = le_target.transform(df[target_col])
+
+    print(f"Target classes: {le_target.classes_}")
+
+    # Prepare features for training: int8 ratings (estimators convert to their own float dtype)
+    X = pd.DataFrame(ratings[keep], columns=rating_cols)
+
+    if feature_names is not None:
+        # Same columns, same order as the model; questions missing from df count as neutral (3)
+        X = X.reindex(columns=list(feature_names), fill_value=NEUTRAL_ANSWER).astype(np.int8)
+
+    y = df[target_col].reset_index(drop=True)
+
+    print(f"\nTraining features: {len(X.columns)}")
+    print(f"Training samples: {len(X)}")
+    print(f"Feature columns: {list(X.columns)}")
+    return X, y, le_target
+
+
+def build_ensemble():
+    """Unfitted soft-voting ensemble: RandomForest + scaled LogisticRegression + gradient boosting"""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
 
-# Logistic Regression with scaling for linear Likert features
-lr_pipeline = Pipeline([
-    ('scaler', StandardScaler()),
-    ('lr', LogisticRegression(max_iter=2000, class_weight='balanced', n_jobs=None))
-])
-
-# Try LightGBM if available; otherwise use HistGradientBoosting
-gb_model = None
-try:
-    from lightgbm import LGBMClassifier  # type: ignore
-    gb_model = LGBMClassifier(
-        n_estimators=500,
-        learning_rate=0.05,
-        max_depth=-1,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        random_state=42
+    # Build individual learners
+    rf = RandomForestClassifier(
+        n_estimators=300,
+        random_state=42,
+        max_depth=15,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        max_features='sqrt',
+        class_weight='balanced'
     )
-    print("✓ Using LightGBM for gradient boosting")
-except Exception:
-    gb_model = HistGradientBoostingClassifier(random_state=42)
-    print("✓ LightGBM not available, using HistGradientBoostingClassifier")
-
-# Soft voting ensemble
-ensemble = VotingClassifier(
-    estimators=[('rf', rf), ('lr', lr_pipeline), ('gb', gb_model)],
-    voting='soft',
-    weights=[2, 1, 2]
-)
 
-# Model evaluation
-from sklearn.model_selection import cross_val_score
-print("\n📊 Model Performance (Soft Voting Ensemble):")
-cv_scores = cross_val_score(ensemble, X, y, cv=5, scoring='accuracy')
-print(f"Cross-validation accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
+    # Logistic Regression with scaling for linear Likert features
+    lr_pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('lr', LogisticRegression(max_iter=2000, class_weight='balanced', n_jobs=None))
+    ])
+
+    # Try LightGBM if available; otherwise use HistGradientBoosting
+    gb_model = None
+    try:
+        from lightgbm import LGBMClassifier  # type: ignore
+        gb_model = LGBMClassifier(
+            n_estimators=500,
+            learning_rate=0.05,
+            max_depth=-1,
+            subsample=0.9,
+            colsample_bytree=0.9,
+            random_state=42
+        )
+        print("✓ Using LightGBM for gradient boosting")
+    except Exception:
+        gb_model = HistGradientBoostingClassifier(random_state=42)
+        print("✓ LightGBM not available, using HistGradientBoostingClassifier")
+
+    # Soft voting ensemble
+    ensemble = VotingClassifier(
+        estimators=[('rf', rf), ('lr', lr_pipeline), ('gb', gb_model)],
+        voting='soft',
+        weights=[2, 1, 2]
+    )
+    return ensemble
+
+
+def resolve_jobs(n_jobs):
+    """Cores to train on: n_jobs if positive (capped at the machine's cores), all of them for -1/0/None"""
+    from joblib import cpu_count
+
+    cores = cpu_count()
+    return cores if not n_jobs or n_jobs < 0 else min(n_jobs, cores)
+
 
-# Fit on full data
-ensemble.fit(X, y)
-train_accuracy = ensemble.score(X, y)
-print(f"Training accuracy: {train_accuracy:.3f}")
+def set_member_threads(ensemble, threads):
+    """Set n_jobs on every member that has it (RandomForest, LightGBM); None restores the default.
 
-# Save feature names for compatibility
-feature_names = list(X.columns)
+    Covers the unfitted templates (ensemble.estimators) and, once the
+    ensemble is fitted, the fitted members that get pickled (estimators_,
+    which named_estimators_ shares).
+    """
+    params = {
+        f'{name}__n_jobs': threads
+        for name, estimator in ensemble.estimators
+        if 'n_jobs' in estimator.get_params(deep=False)
+    }
+    ensemble.set_params(**params)
+    for fitted in getattr(ensemble, 'estimators_', ()):
+        if 'n_jobs' in fitted.get_params(deep=False):
+            fitted.set_params(n_jobs=threads)
+    return ensemble
 
-print("✓ Ensemble model trained!")
 
-# Save the model and encoders with feature names (same key names for runner)
-model_data = {
-    'model': ensemble,
-    'target_encoder': le_target,
-    'feature_names': feature_names
-}
+def _fit_and_score(estimator, X, y, train_index, test_index, threads):
+    """Fit one ensemble on the train rows and score it on the test rows (test_index None: fit all rows, no score)"""
+    from threadpoolctl import threadpool_limits
 
-with open('rf_ict_model.pkl', 'wb') as f:
-    pickle.dump(model_data, f)
-print("✓ Model saved as rf_ict_model.pkl")
+    set_member_threads(estimator, threads)
+    # Plain arrays, as bsit_runner serves them (LightGBM also rejects the question texts as feature names)
+    X, y = X.to_numpy(), y.to_numpy()
+    # Caps OpenMP (HistGradientBoosting, LightGBM) and BLAS threads to this job's share of the cores
+    with threadpool_limits(limits=threads):
+        if test_index is None:
+            estimator.fit(X, y)
+            return estimator, None
+        estimator.fit(X[train_index], y[train_index])
+        return estimator, estimator.score(X[test_index], y[test_index])
+
+
+def cross_validate_and_fit(ensemble, X, y, cv=5, n_jobs=-1):
+    """cross_val_score(ensemble, X, y, cv) plus the fit on all rows, run as cv + 1 jobs on a process pool.
+
+    Each job gets cores // pool_size threads for tree building, so folds,
+    members and OpenMP/LightGBM threads together never exceed the cores.
+    With n_jobs=1 everything runs in this process, one fit after another.
+    Returns (fold accuracies, fitted ensemble).
+    """
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.model_selection import check_cv
+
+    cores = resolve_jobs(n_jobs)
+    splits = list(check_cv(cv, y, classifier=True).split(X, y))
+    tasks = splits + [(None, None)]
+    pool_size = min(cores, len(tasks))
+    threads = max(1, cores // pool_size)
+    print(f"Training on {cores} core(s): {pool_size} parallel fit(s) x {threads} thread(s)")
+
+    results = Parallel(n_jobs=pool_size)(
+        delayed(_fit_and_score)(clone(ensemble), X, y, train_index, test_index, threads)
+        for train_index, test_index in tasks
+    )
+    scores = np.array([score for _, score in results[:-1]])
+    # The saved model should not spawn threads of its own when it is served
+    fitted = set_member_threads(results[-1][0], None)
+    return scores, fitted
+
+
+def train(X, y, le_target, output_path=MODEL_OUTPUT, n_jobs=-1, incorporated=(), data_snapshot=None):
+    """Cross-validate, fit on all rows and pickle the ensemble with its encoders.
+
+    incorporated lists the response keys (see response_keys) behind X, so a
+    later incremental run can tell which responses are new (None: not known,
+    and the model cannot be an incremental base); data_snapshot is the digest
+    of the responses CSV, recorded so the run can be repeated.
+    """
+    ensemble = build_ensemble()
+
+    # Model evaluation (folds and the final fit run side by side)
+    print("\n📊 Model Performance (Soft Voting Ensemble):")
+    started = time.perf_counter()
+    cv_scores, ensemble = cross_validate_and_fit(ensemble, X, y, cv=5, n_jobs=n_jobs)
+    print(f"Cross-validation accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
+    print(f"Cross-validation + fit took {time.perf_counter() - started:.1f}s")
+
+    # Fit on full data (done above, as the last job)
+    train_accuracy = ensemble.score(X.to_numpy(), y.to_numpy())
+    print(f"Training accuracy: {train_accuracy:.3f}")
+
+    # Save feature names for compatibility
+    feature_names = list(X.columns)
+
+    print("✓ Ensemble model trained!")
+
+    # Save the model and encoders with feature names (same key names for runner)
+    model_data = {
+        'model': ensemble,
+        'target_encoder': le_target,
+        'feature_names': feature_names,
+        'trained_rows': len(X),
+        'training_round': 0,
+        'data_snapshot': data_snapshot
+    }
+    if incorporated is not None:
+        model_data['incorporated_responses'] = sorted(set(incorporated))
+
+    save_model_data(model_data, output_path)
+    print(f"✓ Model saved as {output_path}")
+
+    print(f"\n🎯 Model can predict: {list(le_target.classes_)}")
+    print("✅ Training complete!")
+
+    print(f"\nFiles created:")
+    print(f"- {output_path} (contains ensemble + encoders + feature names)")
+    print(f"- Use this with your bsit_runner.py script")
+    return ensemble
+
+
+def response_keys(df):
+    """Identity of each response row, Timestamp|Email Address (what incremental training tracks)"""
+    if len(df) == 0:
+        return []
+    columns = [col for col in ('Timestamp', 'Email Address') if col in df.columns]
+    if not columns:
+        raise ValueError('Responses need a Timestamp or Email Address column to be tracked')
+    parts = df[columns].fillna('').astype(str)
+    return ['|'.join(row) for row in parts.itertuples(index=False, name=None)]
+
+
+def save_model_data(model_data, output_path):
+    """Pickle model_data to output_path atomically (temp file in the same directory, then rename)"""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.model-', suffix='.pkl', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(model_data, f)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path
+
+
+def file_version(path):
+    """Content hash of a model file, the same version string bsit_runner reports"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def scaled_increment(current, n_new, n_seen, minimum):
+    """Trees/iterations to add for n_new rows, in proportion to what n_seen rows got (at least minimum)"""
+    return max(minimum, math.ceil(current * n_new / max(n_seen, 1)))
+
+
+def bins_match(gb, X):
+    """True if refitting HistGradientBoosting's bin mapper on X reproduces its current thresholds"""
+    X = np.asarray(X, dtype=np.float64)
+    for column, thresholds in enumerate(gb._bin_mapper.bin_thresholds_):
+        values = np.unique(X[:, column])
+        midpoints = (values[:-1] + values[1:]) / 2
+        if len(midpoints) != len(thresholds) or not np.allclose(midpoints, thresholds):
+            return False
+    return True
+
+
+def anchor_rows(gb, X_new, le_target, feature_names, seed=SYNTHETIC_SEED, per_class=ANCHOR_ROWS_PER_CLASS):
+    """Synthetic rows that go into every incremental batch next to the new responses.
+
+    Warm-started members must see every class again, so each class gets
+    per_class rows. HistGradientBoosting also rebuilds its bin mapper from the
+    batch, so for it rows are added until every feature shows each value the
+    synthetic cohorts use; the thresholds then come out as before.
+    """
+    import pandas as pd
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        X_syn, y_syn, _ = prepare_training_data(generate_synthetic_responses(seed=seed), le_target, feature_names)
+    X_syn, y_syn = X_syn.to_numpy(), y_syn.to_numpy()
+    rng = np.random.default_rng(seed)
+
+    chosen = []
+    for label in range(len(le_target.classes_)):
+        candidates = np.flatnonzero(y_syn == label)
+        chosen.extend(rng.choice(candidates, size=min(per_class, len(candidates)), replace=False).tolist())
+
+    if hasattr(gb, '_bin_mapper'):
+        batch = np.vstack([X_new.to_numpy(), X_syn[chosen]])
+        for column in range(X_syn.shape[1]):
+            for value in np.setdiff1d(X_syn[:, column], batch[:, column]).tolist():
+                row = int(np.flatnonzero(X_syn[:, column] == value)[0])
+                chosen.append(row)
+                batch = np.vstack([batch, X_syn[row]])
+
+    return pd.DataFrame(X_syn[chosen], columns=feature_names), pd.Series(y_syn[chosen])
+
+
+def extend_forest(rf, X, y, n_more, threads=None):
+    """Grow n_more trees on (X, y) next to the existing ones (warm start)"""
+    rf.set_params(warm_start=True, n_estimators=rf.n_estimators + n_more, n_jobs=threads)
+    with warnings.catch_warnings():
+        # 'balanced' weights are computed on this batch only, which is what we want for the new trees
+        warnings.filterwarnings('ignore', message='class_weight presets')
+        rf.fit(X, y)
+    rf.set_params(warm_start=False, n_jobs=None)
+    return rf
+
+
+def continue_boosting(gb, X, y, n_more, threads=None):
+    """Add n_more boosting iterations fitted on (X, y), starting from the existing booster"""
+    if hasattr(gb, 'booster_'):
+        # LightGBM: a new model initialised from the old booster keeps its trees and adds n_more
+        params = dict(gb.get_params(), n_estimators=n_more, n_jobs=threads)
+        continued = type(gb)(**params)
+        continued.fit(X, y, init_model=gb.booster_)
+        continued.set_params(n_jobs=None)
+        return continued
+
+    from threadpoolctl import threadpool_limits
+
+    if not bins_match(gb, X):
+        raise ValueError('Incremental batch would change the gradient boosting bins; run a full training instead')
+    gb.set_params(warm_start=True, max_iter=gb.n_iter_ + n_more, early_stopping=False)
+    with threadpool_limits(limits=threads):
+        gb.fit(X, y)
+    gb.set_params(warm_start=False)
+    return gb
+
+
+def incremental_update(model_data, responses, seed=SYNTHETIC_SEED, n_jobs=-1):
+    """Fold the responses that model_data has not seen into its ensemble.
+
+    Only new rows (plus a few synthetic anchor rows) are trained on: the
+    forest grows extra trees and the booster continues for extra iterations,
+    both in proportion to the new rows; the logistic member is kept as is.
+    Returns the updated model_data, or None when there is nothing new.
+    """
+    import pandas as pd
+
+    if 'incorporated_responses' not in model_data:
+        raise ValueError('Base model does not record its training responses; run a full training first')
+    incorporated = set(model_data['incorporated_responses'])
+    keys = response_keys(responses)
+    is_new = [key not in incorporated for key in keys]
+    if not any(is_new):
+        return None
+
+    new_keys = [key for key, new in zip(keys, is_new) if new]
+    new_rows = label_training_responses(responses[is_new].reset_index(drop=True))
+    ensemble, le_target, feature_names = model_data['model'], model_data['target_encoder'], model_data['feature_names']
+    X_new, y_new, _ = prepare_training_data(new_rows, le_target, feature_names)
+
+    members = dict(ensemble.named_estimators_)
+    rf, gb = members['rf'], members['gb']
+    X_anchor, y_anchor = anchor_rows(gb, X_new, le_target, feature_names, seed)
+    X_batch = pd.concat([X_new, X_anchor], ignore_index=True).to_numpy()
+    y_batch = pd.concat([y_new.reset_index(drop=True), y_anchor], ignore_index=True).to_numpy()
+
+    n_seen = model_data['trained_rows']
+    threads = resolve_jobs(n_jobs)
+    more_trees = scaled_increment(rf.n_estimators, len(X_new), n_seen, MIN_NEW_TREES)
+    more_iterations = scaled_increment(getattr(gb, 'n_iter_', getattr(gb, 'n_estimators', 0)), len(X_new), n_seen, MIN_NEW_ITERATIONS)
+    print(f"Incremental batch: {len(X_new)} new + {len(X_anchor)} anchor rows; "
+          f"+{more_trees} trees, +{more_iterations} boosting iterations")
+
+    extend_forest(rf, X_batch, y_batch, more_trees, threads)
+    continued = continue_boosting(gb, X_batch, y_batch, more_iterations, threads)
+    if continued is not gb:
+        index = [name for name, _ in ensemble.estimators].index('gb')
+        ensemble.estimators_[index] = continued
+        ensemble.named_estimators_['gb'] = continued
+
+    return dict(
+        model_data,
+        model=ensemble,
+        incorporated_responses=sorted(incorporated.union(new_keys)),
+        trained_rows=n_seen + len(X_new),
+        training_round=model_data.get('training_round', 0) + 1
+    )
+
+
+def incremental_train(base_path, responses, output_path, seed=SYNTHETIC_SEED, n_jobs=-1, export_dir=None):
+    """Update the model at base_path with the new responses and save it as a new version"""
+    with open(base_path, 'rb') as f:
+        model_data = pickle.load(f)
+    started = time.perf_counter()
+    updated = incremental_update(model_data, responses, seed=seed, n_jobs=n_jobs)
+    if updated is None:
+        print("✓ No new responses since the last training; model unchanged")
+        return None
+
+    updated['parent_version'] = file_version(base_path)
+    save_model_data(updated, output_path)
+    version = file_version(output_path)
+    print(f"✓ Incremental update took {time.perf_counter() - started:.1f}s")
+    print(f"✓ Model saved as {output_path} (version {version}, round {updated['training_round']}, "
+          f"parent {updated['parent_version']})")
+    if export_dir:
+        from model_store import export_artifact
+
+        export_artifact(updated['model'], updated['target_encoder'], updated['feature_names'], version, export_dir)
+        print(f"✓ Exported artifact {export_dir}")
+    return updated
+
+
+def distill_student(model_path, X, out_dir, seed=SYNTHETIC_SEED, top_k=None, max_depth=None):
+    """Distil the ensemble at model_path into a student artifact at out_dir and print the comparison report.
+
+    Accuracy is measured on a synthetic holdout drawn with seed + 1, which
+    neither the ensemble nor the student was fitted on.
+    """
+    import json
+
+    import distill
+
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        holdout = label_responses(generate_synthetic_responses(seed=seed + 1))
+        X_hold, y_hold, _ = prepare_training_data(holdout, model_data['target_encoder'], model_data['feature_names'])
+    report = distill.distill_to_artifact(
+        model_data, model_path, X, (X_hold, y_hold), out_dir,
+        top_k=top_k or distill.TOP_K, max_depth=max_depth or distill.MAX_DEPTH, seed=seed
+    )
+    print(f"\n✓ Student model saved as {out_dir} (version {report['student_version']})")
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the ICT track recommendation ensemble')
+    parser.add_argument('output', nargs='?', default=MODEL_OUTPUT, help=f'model pickle to write (default {MODEL_OUTPUT})')
+    parser.add_argument('--seed', type=int, default=SYNTHETIC_SEED, help='seed for the synthetic cohorts')
+    parser.add_argument('--synthetic-scale', type=int, default=1, help='multiply every synthetic cohort size by this')
+    parser.add_argument('--jobs', type=int, default=int(os.environ.get('ICT_TRAIN_JOBS', '-1')),
+                        help='cores for cross-validation and fitting (-1: all, 1: serial; env ICT_TRAIN_JOBS)')
+    parser.add_argument('--responses', default=SHEET_CSV_URL,
+                        help='responses CSV: URL, file or directory of CSV files (default: the Google Sheet)')
+    parser.add_argument('--snapshot-dir', default=data_source.SNAPSHOT_DIR,
+                        help='where fetched CSVs are kept by content hash (env ICT_SNAPSHOT_DIR)')
+    parser.add_argument('--offline', action='store_true', help='use the latest local snapshot instead of fetching the URL')
+    parser.add_argument('--incremental', action='store_true',
+                        help='update the base model with responses it has not seen instead of training from scratch')
+    parser.add_argument('--base', default=MODEL_OUTPUT, help='model to update with --incremental')
+    parser.add_argument('--export-artifact', help='also export the updated model as an artifact directory (--incremental)')
+    parser.add_argument('--distill', metavar='DIR',
+                        help='also write a compact student model (section means + top questions) as an artifact, with a report')
+    parser.add_argument('--distill-top-k', type=int, help='questions the student keeps next to the section means (default 12)')
+    parser.add_argument('--distill-depth', type=int, help='depth of the student tree (default 8)')
+    args = parser.parse_args(argv)
+
+    if args.incremental:
+        print("=== ICT Track Recommendation Incremental Training ===")
+        responses = load_responses(args.responses, args.snapshot_dir, args.offline)
+        incremental_train(args.base, responses.frame, args.output, seed=args.seed, n_jobs=args.jobs,
+                          export_dir=args.export_artifact)
+        return 0
+
+    print("=== ICT Track Recommendation Training (Updated) ===")
+    responses = load_responses(args.responses, args.snapshot_dir, args.offline)
+    df = responses.frame
+    try:
+        incorporated = response_keys(df)
+    except ValueError as e:
+        # Only --incremental needs the keys; without them this model just cannot be an incremental base
+        print(f"✗ {e}: the model will not record its training responses, so it cannot be an --incremental base")
+        incorporated = None
+    # Always add synthetic data to ensure we have all track types
+    df = add_synthetic_responses(df, seed=args.seed, scale=args.synthetic_scale)
+    df = label_training_responses(df)
+    X, y, le_target = prepare_training_data(df)
+    train(X, y, le_target, args.output, n_jobs=args.jobs, incorporated=incorporated,
+          data_snapshot=responses.digest)
+    if args.distill:
+        distill_student(args.output, X, args.distill, seed=args.seed, top_k=args.distill_top_k,
+                        max_depth=args.distill_depth)
+    return 0
 
-print(f"\n🎯 Model can predict: {list(le_target.classes_)}")
-print("✅ Training complete!")
 
-print(f"\nFiles created:")
-print(f"- rf_ict_model.pkl (contains ensemble + encoders + feature names)")
-print(f"- Use this with your bsit_runner.py script")
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,308 +1,727 @@
 # bsit_runner.py - Updated to work with new questionnaire structure
-import pandas as pd
+import functools
+import hashlib
+import logging
 import pickle
+import random
 import sys
 import json
 import os
+import threading
+import time
+import warnings
 
-def debug_print(message):
-    """Print debug messages to stderr so they don't interfere with the final output"""
-    print(f"DEBUG: {message}", file=sys.stderr)
+import numpy as np
 
-try:
-    debug_print("=== ICT Track Prediction Started ===")
-    
-    # 1. Load the saved model & encoders
-    try:
-        model_path = 'rf_ict_model.pkl'
-        if not os.path.exists(model_path):
-            # Try different possible locations
-            possible_paths = [
-                os.path.join(os.path.dirname(__file__), 'rf_ict_model.pkl'),
-                os.path.join('C:\\xampp\\htdocs\\Capstone\\', 'rf_ict_model.pkl')
-            ]
-            for path in possible_paths:
-                if os.path.exists(path):
-                    model_path = path
-                    break
-        
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
-            if isinstance(model_data, dict):
-                rf = model_data['model']
-                le_target = model_data['target_encoder']
-                feature_names = model_data['feature_names']
-                debug_print("✓ Loaded new model format")
+from feature_encoder import INVALID_PAYLOAD, FeatureEncoder, PayloadError
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry
+from model_store import is_artifact, load_artifact
+from result_cache import ResultCache
+from stage_metrics import MODEL_LOAD_SECONDS, REGISTRY as METRICS, STAGE_SECONDS
+from tree_engine import UnsupportedModelError, compile_ensemble
+from questionnaire import questionnaire_schema
+from rule_engine import (
+    ANALYTICAL, BASIC_TRACKS, CREATIVE, NETWORKING,
+    score_basic_tracks, section_means_from_totals, section_totals, track_specialization
+)
+
+MODEL_FILENAME = 'rf_ict_model.pkl'
+
+# How a predictor picks the final track: 'hybrid' lets the rules decide and only
+# compares the model's label; 'model' returns the model's label and class
+# probabilities (the rules still give the specialization). See configure().
+DECISIONS = ('hybrid', 'model')
+
+# Largest probability difference accepted between the compiled trees and sklearn
+COMPILED_TOLERANCE = 1e-9
+
+# Largest batch scored by the compiled trees; bigger batches go to sklearn, whose
+# per-tree Cython walk wins there (crossover ~300-500 rows on the bundled model,
+# see the crossover section of benchmarks/suite.py). 0 means no limit.
+TREE_ENGINE_MAX_ROWS = int(os.environ.get('ICT_TREE_ENGINE_MAX_ROWS', '256'))
+
+# The ensemble was fitted on a DataFrame; we feed it plain numpy rows in feature_names order
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# Results cache in front of the predictor; ICT_CACHE_SIZE=0 turns it off
+RESULT_CACHE = ResultCache(
+    maxsize=int(os.environ.get('ICT_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('ICT_CACHE_TTL', '600'))
+)
+
+# Micro-batching of concurrent single predictions; ICT_BATCH_WINDOW_MS=0 (default) turns it off
+BATCH_WINDOW_MS = float(os.environ.get('ICT_BATCH_WINDOW_MS', '0'))
+BATCH_MAX_SIZE = int(os.environ.get('ICT_BATCH_MAX_SIZE', '32'))
+
+# Seconds between checks of the model path for a new version to hot-swap in; 0 turns the watcher off
+MODEL_RELOAD_INTERVAL = float(os.environ.get('ICT_MODEL_RELOAD_INTERVAL', '10'))
+
+# ICT_LOG_LEVEL sets the level of the bsit_runner logger (INFO: one summary line per request).
+# ICT_TRACE_SAMPLE is the fraction of requests (0..1) that also log the full
+# per-field / per-class trace on the bsit_runner.trace logger; 0 (default) never does.
+LOG_LEVEL = os.environ.get('ICT_LOG_LEVEL', 'INFO').upper()
+TRACE_SAMPLE_RATE = float(os.environ.get('ICT_TRACE_SAMPLE', '0'))
+
+logger = logging.getLogger('bsit_runner')
+trace_logger = logging.getLogger('bsit_runner.trace')
+
+FALLBACK_RESULT = {
+    'recommended_track': 'BSIT',
+    'scores': {'BSCS': 0, 'BSIT': 1, 'BSCPE': 0},
+    'track_specialization': 'Data Analytics'
+}
+
+
+def configure_logging(level=LOG_LEVEL, trace_sample_rate=TRACE_SAMPLE_RATE):
+    """Set the logger levels; adds a stderr handler unless the host (gunicorn, uvicorn) configured one.
+
+    Records go to stderr so they don't interfere with the JSON printed by the CLI.
+    """
+    logger.setLevel(level)
+    trace_logger.setLevel(logging.DEBUG if trace_sample_rate > 0 else logging.CRITICAL + 1)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+def should_trace():
+    """Decide whether this request logs the verbose trace (sampled at ICT_TRACE_SAMPLE)"""
+    return TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE and trace_logger.isEnabledFor(logging.DEBUG)
+
+
+configure_logging()
+
+
+def invalid_payload_result(error):
+    """Error entry for a payload that could not be read; the API answers it with 400"""
+    return {'error': INVALID_PAYLOAD, 'details': str(error)}
+
+
+def fallback_result():
+    """Fresh copy of the default recommendation used when prediction fails"""
+    return {
+        'recommended_track': FALLBACK_RESULT['recommended_track'],
+        'scores': dict(FALLBACK_RESULT['scores']),
+        'track_specialization': FALLBACK_RESULT['track_specialization']
+    }
+
+
+def resolve_model_path():
+    """Find the model file: MODEL_PATH env var first, then the usual locations"""
+    env_path = os.environ.get('MODEL_PATH')
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    possible_paths = [
+        MODEL_FILENAME,
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), MODEL_FILENAME),
+        os.path.join('C:\\xampp\\htdocs\\Capstone\\', MODEL_FILENAME)
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    return env_path or MODEL_FILENAME
+
+
+def by_batch_size(small, large, max_rows):
+    """predict_proba that calls small(X) for up to max_rows rows and large(X) above (small always when max_rows is 0)"""
+    if max_rows <= 0:
+        return small
+
+    def predict_proba(X):
+        return small(X) if len(X) <= max_rows else large(X)
+
+    return predict_proba
+
+
+def copy_result(result):
+    """Copy of a result dict that callers may modify without touching the cached one"""
+    return {**result, 'scores': dict(result['scores'])}
+
+
+def load_model(model_path):
+    """Load the ensemble, target encoder, feature names and a content-hash version from a pickle file"""
+    with open(model_path, 'rb') as f:
+        raw = f.read()
+    model_version = hashlib.sha256(raw).hexdigest()[:16]
+    model_data = pickle.loads(raw)
+    if isinstance(model_data, dict):
+        rf = model_data['model']
+        le_target = model_data['target_encoder']
+        feature_names = model_data['feature_names']
+        logger.info("Loaded model from %s (version %s)", model_path, model_version)
+    else:
+        # Old format fallback
+        rf, multi_choice_encoders, le_target = model_data
+        feature_names = getattr(rf, 'feature_names_in_', [])
+        logger.info("Loaded old-format model from %s (version %s)", model_path, model_version)
+    return rf, le_target, list(feature_names), model_version
+
+
+def rule_based_predict(data):
+    """Rule-based prediction returning only basic tracks (BSIT, BSCS, BSCPE)"""
+    return rule_based_predict_totals(*section_totals(data))
+
+
+def rule_based_predict_totals(sums, counts, trace=False):
+    """rule_based_predict for a payload already reduced to its section sums and counts"""
+    winner, scores, specialization = rule_based_predict_batch([sums], [counts])[0]
+
+    if trace:
+        creative_score, analytical_score, networking_score = section_means_from_totals(sums, counts).tolist()
+        trace_logger.debug("=== RULE-BASED ANALYSIS ===")
+        trace_logger.debug("Creative score: %.2f (from %d questions)", creative_score, counts[CREATIVE])
+        trace_logger.debug("Analytical score: %.2f (from %d questions)", analytical_score, counts[ANALYTICAL])
+        trace_logger.debug("Networking score: %.2f (from %d questions)", networking_score, counts[NETWORKING])
+        trace_logger.debug("Final rule-based scores: %s", scores)
+        trace_logger.debug("Rule-based winner: %s (score: %.2f), specialization: %s", winner, scores[winner], specialization)
+
+    return winner, scores, specialization  # Return track, scores, and specialization
+
+
+def rule_based_predict_batch(sums, counts):
+    """Rule-based prediction for many payloads at once from their (n, 3) section sums and counts"""
+    means = section_means_from_totals(sums, counts)
+    scores, winners, specializations = score_basic_tracks(means)
+    return [
+        (BASIC_TRACKS[winner], dict(zip(BASIC_TRACKS, row_scores)), specialization)
+        for row_scores, winner, specialization in zip(scores.tolist(), winners.tolist(), specializations)
+    ]
+
+
+class ICTPredictor:
+    """Holds the trained ensemble in memory and serves predictions from it.
+
+    The model, target encoder and feature names are loaded once when the
+    predictor is created; every call to predict() reuses them.
+    """
+
+    def __init__(self, model_path=None, cache=None, decision='hybrid'):
+        if decision not in DECISIONS:
+            raise ValueError(f'decision must be one of {DECISIONS}, got {decision!r}')
+        self.decision = decision
+        self.model_path = model_path or resolve_model_path()
+        try:
+            if is_artifact(self.model_path):
+                self._load_artifact()
             else:
-                # Old format fallback
-                rf, multi_choice_encoders, le_target = model_data
-                feature_names = getattr(rf, 'feature_names_in_', [])
-                debug_print("✓ Loaded old model format")
-        
-        debug_print(f"✓ Available tracks: {le_target.classes_}")
-        debug_print(f"✓ Model expects {len(feature_names)} features")
-    except Exception as e:
-        debug_print(f"✗ Failed to load model: {e}")
-        raise
+                self._load_pickle()
+        except Exception as e:
+            logger.error("Failed to load model from %s: %s", self.model_path, e)
+            raise
+        logger.info("Available tracks: %s; model expects %d features", self.class_names, len(self.feature_names))
 
-    # 2. Load user data from JSON file
-    try:
-        user_file = sys.argv[1]
-        with open(user_file, 'r', encoding='utf-8') as f:
-            user_data = json.load(f)
-        debug_print(f"✓ User data loaded from {user_file}")
-        debug_print(f"✓ Data contains {len(user_data)} fields")
-    except Exception as e:
-        debug_print(f"✗ Failed to load user data: {e}")
-        raise
-
-    # 3. Debug: Show what data we received
-    debug_print("\n=== RECEIVED USER DATA ===")
-    for key, value in user_data.items():
-        debug_print(f"  '{key}': '{value}'")
-
-    # 4. Rule-based prediction for comparison (basic tracks only)
-    def rule_based_predict(data):
-        """Rule-based prediction returning only basic tracks (BSIT, BSCS, BSCPE)"""
-        scores = {'BSCS': 0, 'BSIT': 0, 'BSCPE': 0}
-        
-        # Helper to get rating values
-        def get_rating(value):
-            try:
-                return int(value) if str(value).isdigit() else 0
-            except:
-                return 0
-        
-        # Calculate scores based on sections
-        creative_score = 0
-        analytical_score = 0
-        networking_score = 0
-        creative_count = 0
-        analytical_count = 0
-        networking_count = 0
-        
-        # Count creative questions (Section 2)
-        for col_name, value in data.items():
-            if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['designing', 'editing', 'creating', 'visual', 'graphics', 'animation', 'colors', 'drawing', 'creative']):
-                creative_score += get_rating(value)
-                creative_count += 1
-        
-        # Count analytical questions (Section 3)
-        for col_name, value in data.items():
-            if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['numbers', 'statistics', 'data', 'analytics', 'patterns', 'logical', 'math', 'programming', 'algorithms']):
-                analytical_score += get_rating(value)
-                analytical_count += 1
-        
-        # Count networking questions (Section 4)
-        for col_name, value in data.items():
-            if isinstance(col_name, str) and any(keyword in col_name.lower() for keyword in ['computers', 'connect', 'internet', 'network', 'hardware', 'routers', 'servers', 'technical', 'cables']):
-                networking_score += get_rating(value)
-                networking_count += 1
-        
-        # Normalize scores
-        if creative_count > 0:
-            creative_score = creative_score / creative_count
-        if analytical_count > 0:
-            analytical_score = analytical_score / analytical_count
-        if networking_count > 0:
-            networking_score = networking_score / networking_count
-        
-        debug_print(f"\n=== RULE-BASED ANALYSIS ===")
-        debug_print(f"Creative score: {creative_score:.2f} (from {creative_count} questions)")
-        debug_print(f"Analytical score: {analytical_score:.2f} (from {analytical_count} questions)")
-        debug_print(f"Networking score: {networking_score:.2f} (from {networking_count} questions)")
-        
-        # Determine main track (only basic 3 tracks)
-        # BSCPE: Strong networking preference
-        if networking_score >= 3.5 and networking_score > max(creative_score, analytical_score):
-            scores['BSCPE'] = networking_score
-            scores['BSCS'] = analytical_score * 0.7
-            scores['BSIT'] = max(creative_score, analytical_score) * 0.8
-        
-        # BSCS: Strong analytical preference WITH creative elements (computer science pattern)
-        elif analytical_score >= 4.5 and creative_score >= 3.0 and analytical_score > networking_score:
-            # Pure CS: High analytical + decent creative (programming + design)
-            scores['BSCS'] = analytical_score * 1.1 + (creative_score * 0.4)
-            scores['BSIT'] = max(creative_score, analytical_score) * 0.85
-            scores['BSCPE'] = networking_score * 0.7
-        
-        # BSCS fallback: Very high analytical even without creative
-        elif analytical_score >= 4.8 and analytical_score > max(creative_score, networking_score) * 1.3:
-            scores['BSCS'] = analytical_score * 1.05
-            scores['BSIT'] = max(creative_score, analytical_score) * 0.9
-            scores['BSCPE'] = networking_score * 0.7
-        
-        # BSIT: Everything else (creative focus, mixed preferences, or general)
+        # Cached results are only valid for the model version that produced them;
+        # the cache is tied to this version by activate(), when the predictor goes live
+        self.cache = cache if cache is not None and cache.maxsize > 0 else None
+
+    def activate(self):
+        """Tie the shared result cache to this model version (emptying it); MODEL_REGISTRY calls it at swap time"""
+        if self.cache is not None:
+            self.cache.set_version(self.model_version)
+
+    def _load_pickle(self):
+        self.model, self.le_target, self.feature_names, self.model_version = load_model(self.model_path)
+        self.encoder = FeatureEncoder(self.feature_names)
+        # Track name for each predict_proba column (model.classes_ holds encoded labels)
+        self.class_names = list(self.le_target.inverse_transform(self.model.classes_))
+        self.predict_proba = self._compile_model()
+
+    def _load_artifact(self):
+        """Serve from a memory-mapped artifact directory (see model_store); no sklearn objects are loaded"""
+        artifact = load_artifact(self.model_path)
+        self.model = None
+        self.le_target = None
+        self.feature_names = artifact.feature_names
+        self.model_version = artifact.model_version
+        self.encoder = FeatureEncoder(self.feature_names)
+        self.class_names = artifact.class_names
+        self.predict_proba = self.compiled_proba = artifact.predict_proba
+        logger.info("Loaded memory-mapped artifact %s (version %s)", self.model_path, self.model_version)
+
+    def _compile_model(self):
+        """Use the flattened tree engine when it reproduces the ensemble, else sklearn's predict_proba.
+
+        The compiled engine only takes batches of up to TREE_ENGINE_MAX_ROWS
+        rows; larger ones go to sklearn. self.compiled_proba keeps the
+        compiled function itself (None when it is not used).
+        """
+        self.compiled_proba = None
+        if os.environ.get('ICT_TREE_ENGINE', '1') == '0':
+            return self.model.predict_proba
+        try:
+            compiled = compile_ensemble(self.model)
+            probe = np.random.default_rng(0).integers(1, 6, size=(16, self.encoder.n_features)).astype(np.float32)
+            diff = float(np.abs(compiled.predict_proba(probe) - self.model.predict_proba(probe)).max())
+        except (UnsupportedModelError, AttributeError, ValueError) as e:
+            logger.warning("Tree engine unavailable, using sklearn predict_proba: %s", e)
+            return self.model.predict_proba
+        if diff > COMPILED_TOLERANCE:
+            logger.warning("Tree engine differs from sklearn by %.2e, using sklearn predict_proba", diff)
+            return self.model.predict_proba
+        logger.info("Tree engine enabled (fully compiled: %s, up to %s rows)", compiled.fully_compiled,
+                    TREE_ENGINE_MAX_ROWS or 'any number of')
+        self.compiled_proba = compiled.predict_proba
+        return by_batch_size(compiled.predict_proba, self.model.predict_proba, TREE_ENGINE_MAX_ROWS)
+
+    def warm(self, n_rows=32):
+        """Score random questionnaires once so the first real request does not hit cold code paths or pages"""
+        X = np.random.default_rng(0).integers(1, 6, size=(n_rows, self.encoder.n_features)).astype(np.float32)
+        self.infer(X[:1])
+        self.infer(X)
+
+    def build_features(self, user_data):
+        """Turn one questionnaire payload into a (1, n_features) float32 matrix in feature_names order"""
+        return self.encoder.encode(user_data).reshape(1, -1)
+
+    def read_payload(self, user_data):
+        """(1, n_features) feature matrix, rule section sums and counts for a payload in any accepted format"""
+        row, sums, counts = self.encoder.read(user_data)
+        return row.reshape(1, -1), sums, counts
+
+    def infer(self, X):
+        """Run the model once on a feature matrix.
+
+        Returns (track labels, probability matrix, class names for the
+        probability columns). The label is the argmax of predict_proba, which
+        is exactly what VotingClassifier(voting='soft').predict computes, so
+        the ensemble is only evaluated once (through the compiled tree engine
+        when it is enabled).
+        """
+        proba = self.predict_proba(X)
+        labels = [self.class_names[i] for i in proba.argmax(axis=1).tolist()]
+        return labels, proba, list(self.class_names)
+
+    def cache_key(self, row, sums, counts):
+        """Hash of the canonical answer vector: feature row plus rule section totals.
+
+        Metadata such as Timestamp, Email Address or Full Name never reaches
+        either part, so resubmissions that only differ there share an entry.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model_version.encode())
+        digest.update(self.decision.encode())
+        digest.update(row.tobytes())
+        digest.update(repr((sums, counts)).encode())
+        return digest.digest()
+
+    def predict(self, user_data):
+        """Recommend a track for one questionnaire payload (legacy, short-ID or ratings-array format).
+
+        Raises PayloadError for a payload that cannot be read.
+        """
+        started = time.perf_counter()
+        trace = should_trace()
+        if trace and isinstance(user_data, dict):
+            trace_logger.debug("=== ICT Track Prediction Started (%d fields) ===", len(user_data))
+            for key, value in user_data.items():
+                trace_logger.debug("  %r: %r", key, value)
+
+        # One pass over the answers gives both the feature row and the rule section totals
+        X, sums, counts = self.read_payload(user_data)
+        encoded = time.perf_counter()
+        STAGE_SECONDS.observe(encoded - started, 'feature_assembly', 'single')
+        if self.cache is None:
+            result, source = self._predict_encoded(sums, counts, X, trace), 'model'
         else:
-            scores['BSIT'] = max(creative_score, analytical_score, 3.0)
-            scores['BSCS'] = analytical_score * 0.8
-            scores['BSCPE'] = networking_score * 0.8
-        
-        debug_print(f"  BSIT: General/Creative track = {scores['BSIT']:.2f}")
-        debug_print(f"  BSCS: Analytical+Creative = {scores['BSCS']:.2f}")
-        debug_print(f"  BSCPE: Networking focus = {scores['BSCPE']:.2f}")
-        
-        debug_print(f"Final rule-based scores: {scores}")
-        
-        # Return highest scoring track AND the scores + specialization info
-        max_score = max(scores.values())
-        winner = [k for k, v in scores.items() if v == max_score][0]
-        
-        # Determine specialization for each track
-        specialization = None
-        if winner == 'BSIT':
-            # BSIT can be Multimedia OR Data Analytics based on preferences
-            if creative_score > analytical_score:
-                specialization = 'Multimedia'
-                debug_print(f"BSIT specialization: Multimedia (creative: {creative_score:.2f} > analytical: {analytical_score:.2f})")
+            key = self.cache_key(X[0], sums, counts)
+            computed = []
+
+            def compute():
+                computed.append(True)
+                return self._predict_encoded(sums, counts, X, trace)
+
+            result = copy_result(self.cache.get_or_compute(key, compute))
+            source = 'model' if computed else 'cache'
+
+        finished = time.perf_counter()
+        logger.info(
+            "recommend track=%s specialization=%s source=%s encode_ms=%.2f score_ms=%.2f total_ms=%.2f model=%s",
+            result['recommended_track'], result['track_specialization'], source,
+            (encoded - started) * 1000.0, (finished - encoded) * 1000.0, (finished - started) * 1000.0,
+            self.model_version
+        )
+        return result
+
+    def _predict_encoded(self, sums, counts, X, trace=False):
+        """Rule and ML prediction for one payload given its section totals and feature row"""
+        # Rule-based prediction for comparison (basic tracks only)
+        started = time.perf_counter()
+        rule_result = rule_based_predict_totals(sums, counts, trace)
+        ruled = time.perf_counter()
+        STAGE_SECONDS.observe(ruled - started, 'rule_scoring', 'single')
+
+        # Make ML prediction (label and probabilities from one ensemble evaluation)
+        ml_scores = None
+        try:
+            ml_tracks, ml_proba, class_names = self.infer(X)
+            STAGE_SECONDS.observe(time.perf_counter() - ruled, 'model_inference', 'single')
+            ml_track = ml_tracks[0]
+            if self.decision == 'model':
+                ml_scores = dict(zip(class_names, ml_proba[0].tolist()))
+
+            if trace:
+                trace_logger.debug("=== ML PREDICTION RESULTS ===")
+                for track, prob in sorted(zip(class_names, ml_proba[0].tolist()), key=lambda x: x[1], reverse=True):
+                    trace_logger.debug("  %s: %.3f", track, prob)
+                trace_logger.debug("ML prediction: %s", ml_track)
+
+        except Exception as e:
+            ml_track = rule_result[0]  # Fallback to rule-based
+            logger.warning("ML prediction failed, using rule-based %s: %s", ml_track, e)
+
+        return self._final_result(rule_result, ml_track, trace, ml_scores, section_means_from_totals(sums, counts))
+
+    def predict_batch(self, payloads):
+        """Recommend tracks for many payloads with a single predict_proba call.
+
+        Returns one entry per payload, in order. A payload that cannot be
+        read gets an invalid-payload error dict; one that fails for any other
+        reason gets the fallback result, as predict() gives. Neither fails
+        the whole batch.
+        """
+        started = time.perf_counter()
+        results = [None] * len(payloads)
+        accepted_indexes = []
+        section_sums = []
+        section_counts = []
+        # Rows are filled in place; rejected payloads leave no gap
+        matrix = np.zeros((len(payloads), self.encoder.n_features), dtype=np.float32)
+        for index, user_data in enumerate(payloads):
+            try:
+                _, sums, counts = self.encoder.read(user_data, matrix[len(accepted_indexes)])
+            except PayloadError as e:
+                logger.warning("Batch payload %d rejected: %s", index, e)
+                matrix[len(accepted_indexes)] = 0
+                results[index] = invalid_payload_result(e)
+                continue
+            except Exception:
+                logger.exception("Batch payload %d failed, returning the fallback result", index)
+                matrix[len(accepted_indexes)] = 0
+                results[index] = fallback_result()
+                continue
+            accepted_indexes.append(index)
+            section_sums.append(sums)
+            section_counts.append(counts)
+
+        rejected = len(payloads) - len(accepted_indexes)
+        if not accepted_indexes:
+            self._log_batch(started, len(payloads), 0, rejected)
+            return results
+
+        X = matrix[:len(accepted_indexes)]
+        STAGE_SECONDS.observe(time.perf_counter() - started, 'feature_assembly', 'batch')
+
+        # Serve repeats from the cache; only the misses go through the rules and the model
+        keys = None
+        if self.cache is not None:
+            keys = [self.cache_key(row, sums, counts) for row, sums, counts in zip(X, section_sums, section_counts)]
+            misses = []
+            for position, (index, key) in enumerate(zip(accepted_indexes, keys)):
+                cached = self.cache.get(key)
+                if cached is None:
+                    misses.append(position)
+                else:
+                    results[index] = copy_result(cached)
+            if not misses:
+                self._log_batch(started, len(payloads), 0, rejected)
+                return results
+            accepted_indexes = [accepted_indexes[p] for p in misses]
+            section_sums = [section_sums[p] for p in misses]
+            section_counts = [section_counts[p] for p in misses]
+            keys = [keys[p] for p in misses]
+            X = X[misses]
+
+        # One vectorized rule evaluation for every payload left to score
+        ruling = time.perf_counter()
+        accepted = list(zip(accepted_indexes, rule_based_predict_batch(section_sums, section_counts)))
+        ruled = time.perf_counter()
+        STAGE_SECONDS.observe(ruled - ruling, 'rule_scoring', 'batch')
+
+        # One feature matrix and one model call for every payload left to score
+        ml_scores = [None] * len(accepted)
+        try:
+            ml_tracks, ml_proba, class_names = self.infer(X)
+            STAGE_SECONDS.observe(time.perf_counter() - ruled, 'model_inference', 'batch')
+            if self.decision == 'model':
+                ml_scores = [dict(zip(class_names, row)) for row in ml_proba.tolist()]
+        except Exception as e:
+            logger.warning("ML batch prediction failed, using rule-based tracks: %s", e)
+            ml_tracks = [rule_result[0] for _, rule_result in accepted]  # Fallback to rule-based
+
+        means = section_means_from_totals(section_sums, section_counts) if self.decision == 'model' else [None] * len(accepted)
+        for position, ((index, rule_result), ml_track) in enumerate(zip(accepted, ml_tracks)):
+            results[index] = self._final_result(rule_result, ml_track, False, ml_scores[position], means[position])
+            if keys is not None:
+                self.cache.put(keys[position], copy_result(results[index]))
+        self._log_batch(started, len(payloads), len(accepted), rejected)
+        return results
+
+    def _log_batch(self, started, items, scored, rejected):
+        """One summary line per batch: how many items were scored, cached or rejected"""
+        logger.info(
+            "recommend_batch items=%d scored=%d cached=%d rejected=%d total_ms=%.2f model=%s",
+            items, scored, items - scored - rejected, rejected,
+            (time.perf_counter() - started) * 1000.0, self.model_version
+        )
+
+    def _final_result(self, rule_result, ml_track, trace=False, ml_scores=None, means=None):
+        """Combine the rule-based and ML predictions into the response dict.
+
+        With decision='model' and ml_scores (the model's class probabilities)
+        the model's label is returned; means, the row's section means, give
+        its specialization. Without ml_scores (the model failed) the rules decide.
+        """
+        if ml_scores is not None:
+            return {
+                'recommended_track': ml_track,
+                'scores': ml_scores,
+                'track_specialization': track_specialization(ml_track, means[CREATIVE], means[ANALYTICAL])
+            }
+        rule_prediction, rule_scores, rule_specialization = rule_result
+
+        # Enhanced decision logic: prefer rule-based for basic tracks (ML is biased toward BSCS)
+        final_prediction = rule_prediction  # Use rule-based for basic tracks
+        final_specialization = rule_specialization
+
+        # For basic tracks (BSIT, BSCS, BSCPE), trust rule-based logic since it's clearer
+        if trace:
+            trace_logger.debug("=== FINAL COMPARISON ===")
+            trace_logger.debug("Rule-based: %s", rule_prediction)
+            trace_logger.debug("ML model:   %s", ml_track)
+            if rule_prediction != ml_track:
+                trace_logger.debug("ML disagreed (%s), but rule-based is more reliable for basic tracks", ml_track)
             else:
-                specialization = 'Data Analytics'
-                debug_print(f"BSIT specialization: Data Analytics (analytical: {analytical_score:.2f} >= creative: {creative_score:.2f})")
-        elif winner == 'BSCS':
-            # BSCS always gets Data Analytics specialization
-            specialization = 'Data Analytics'
-            debug_print(f"BSCS specialization: Data Analytics (computer science focus on data)")
-        elif winner == 'BSCPE':
-            # BSCPE always gets Networking specialization
-            specialization = 'Networking'
-            debug_print(f"BSCPE specialization: Networking (computer engineering focus on networks)")
-        
-        debug_print(f"Rule-based winner: {winner} (score: {max_score:.2f})")
-        
-        return winner, scores, specialization  # Return track, scores, and specialization
-    
-    # Run rule-based prediction
-    rule_prediction, rule_scores, track_specialization = rule_based_predict(user_data)
-    
-    # 5. Process data for ML model
-    debug_print(f"\n=== PROCESSING DATA FOR ML MODEL ===")
-    
-    df_user = pd.DataFrame([user_data])
-    
-    # Convert rating columns to numeric
-    rating_cols = [col for col in df_user.columns if col not in ['Recommended_Track', 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']]
-    debug_print(f"Processing {len(rating_cols)} rating columns...")
-    
-    for col in rating_cols:
-        if col in df_user.columns:
-            original = df_user[col].iloc[0] if not df_user[col].empty else 'N/A'
-            df_user[col] = pd.to_numeric(df_user[col], errors='coerce').fillna(3)
-            new_val = df_user[col].iloc[0]
-            debug_print(f"  {col}: '{original}' -> {new_val}")
-    
-    # 6. Remove columns that shouldn't be features
-    columns_to_drop = ['Recommended_Track', 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']
-    existing_cols_to_drop = [col for col in columns_to_drop if col in df_user.columns]
-    if existing_cols_to_drop:
-        df_user = df_user.drop(columns=existing_cols_to_drop)
-        debug_print(f"Dropped columns: {existing_cols_to_drop}")
-
-    # 7. Convert any remaining object columns to numeric
-    for col in df_user.columns:
-        if df_user[col].dtype == 'object':
-            original = df_user[col].iloc[0] if not df_user[col].empty else 'N/A'
-            df_user[col] = pd.to_numeric(df_user[col], errors='coerce').fillna(0)
-            new_val = df_user[col].iloc[0]
-            debug_print(f"Object->numeric {col}: '{original}' -> {new_val}")
-
-    # 8. Ensure we have all features the model expects
-    debug_print(f"Model expects {len(feature_names)} features")
-    debug_print(f"We have {len(df_user.columns)} features")
-    
-    missing_features = []
-    for feature in feature_names:
-        if feature not in df_user.columns:
-            df_user[feature] = 0
-            missing_features.append(feature)
-    
-    if missing_features:
-        debug_print(f"Added {len(missing_features)} missing features with value 0")
-    
-    # Keep only expected features in correct order
-    if len(feature_names) > 0:
-        df_user = df_user[feature_names]
-    debug_print(f"Final feature matrix shape: {df_user.shape}")
-
-    # 9. Make ML prediction
+                trace_logger.debug("Rule-based and ML predictions agree")
+            trace_logger.debug("Final output: %s, specialization: %s", final_prediction, final_specialization)
+
+        # Use rule-based scores since we're using basic tracks
+        return {
+            'recommended_track': final_prediction,
+            'scores': rule_scores,
+            'track_specialization': final_specialization
+        }
+
+
+# Set by configure(): how the served predictor decides, and a model path that overrides resolve_model_path()
+DECISION = 'hybrid'
+_model_path = None
+
+
+def configured_model_path():
+    return _model_path or resolve_model_path()
+
+
+def configure(decision='hybrid', model_path=None):
+    """Choose how predictions are decided and, optionally, pin the model path.
+
+    Called once at startup by runner_adapter for the selected backend,
+    before the first prediction. Raises ValueError for an unknown decision.
+    """
+    global DECISION, _model_path
+    if decision not in DECISIONS:
+        raise ValueError(f'decision must be one of {DECISIONS}, got {decision!r}')
+    DECISION = decision
+    _model_path = model_path
+
+
+def load_predictor(path):
+    """ICTPredictor for the model at path, sharing RESULT_CACHE; the load time goes to ict_model_load_seconds"""
+    started = time.perf_counter()
+    predictor = ICTPredictor(path, cache=RESULT_CACHE, decision=DECISION)
+    MODEL_LOAD_SECONDS.observe(time.perf_counter() - started)
+    return predictor
+
+
+MODEL_REGISTRY = ModelRegistry(
+    load_predictor,
+    configured_model_path,
+    interval=MODEL_RELOAD_INTERVAL,
+    warm=ICTPredictor.warm,
+    activate=ICTPredictor.activate
+)
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_predictor():
+    """Return the live predictor, loading the model on first use; a newer model file is swapped in by MODEL_REGISTRY"""
+    return MODEL_REGISTRY.current()
+
+
+def get_batcher():
+    """Return the process-wide micro-batcher, or None when ICT_BATCH_WINDOW_MS is 0"""
+    global _batcher
+    if _batcher is None and BATCH_WINDOW_MS > 0:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    lambda payloads: get_predictor().predict_batch(payloads),
+                    window_ms=BATCH_WINDOW_MS,
+                    max_batch=BATCH_MAX_SIZE
+                )
+    return _batcher
+
+
+def predict(user_data):
+    """Entry point used by runner_adapter: payload dict in, result dict out"""
     try:
-        ml_pred = rf.predict(df_user)[0]
-        ml_track = le_target.inverse_transform([ml_pred])[0]
-        
-        # Get prediction probabilities for debugging
-        ml_proba = rf.predict_proba(df_user)[0]
-        proba_dict = dict(zip(le_target.classes_, ml_proba))
-        
-        debug_print(f"\n=== ML PREDICTION RESULTS ===")
-        debug_print(f"Prediction probabilities:")
-        for track, prob in sorted(proba_dict.items(), key=lambda x: x[1], reverse=True):
-            debug_print(f"  {track}: {prob:.3f}")
-        debug_print(f"ML prediction: {ml_track}")
-        
-    except Exception as e:
-        debug_print(f"✗ ML prediction failed: {e}")
-        ml_track = rule_prediction  # Fallback to rule-based
-        debug_print(f"Using rule-based fallback: {ml_track}")
-
-    # 10. Compare predictions and choose final result
-    debug_print(f"\n=== FINAL COMPARISON ===")
-    debug_print(f"Rule-based: {rule_prediction}")
-    debug_print(f"ML model:   {ml_track}")
-    if track_specialization:
-        debug_print(f"Track specialization: {track_specialization}")
-    
-    # Enhanced decision logic: prefer rule-based for basic tracks (ML is biased toward BSCS)
-    final_prediction = rule_prediction  # Use rule-based for basic tracks
-    final_specialization = track_specialization
-    
-    # For basic tracks (BSIT, BSCS, BSCPE), trust rule-based logic since it's clearer
-    debug_print(f"Using rule-based prediction for basic tracks: {rule_prediction}")
-    if rule_prediction != ml_track:
-        debug_print(f"ML disagreed ({ml_track}), but rule-based is more reliable for basic tracks")
-    else:
-        debug_print("Rule-based and ML predictions agree")
-    
-    debug_print(f"Final output: {final_prediction}")
-    if final_specialization:
-        debug_print(f"Final specialization: {final_specialization}")
-    debug_print("=== ICT Track Prediction Complete ===")
-
-    # 11. Output JSON with both prediction and scores for PHP
-    # Use rule-based scores since we're using basic tracks
-    result = {
-        'recommended_track': final_prediction,
-        'scores': rule_scores,
-        'track_specialization': final_specialization
+        batcher = get_batcher()
+        if batcher is not None and isinstance(user_data, dict):
+            return batcher.submit(user_data)
+        return get_predictor().predict(user_data)
+    except PayloadError as e:
+        return invalid_payload_result(e)
+    except Exception:
+        logger.exception("Prediction failed, returning the fallback result")
+        return fallback_result()
+
+
+@functools.lru_cache(maxsize=1)
+def rule_encoder():
+    """FeatureEncoder over the questionnaire's own questions, for reading payloads without a model"""
+    return FeatureEncoder([question['text'] for question in questionnaire_schema()['questions']])
+
+
+def rule_result(rule_prediction):
+    winner, scores, specialization = rule_prediction
+    return {'recommended_track': winner, 'scores': scores, 'track_specialization': specialization}
+
+
+def rule_predict(user_data):
+    """Rule-only entry point: no model is loaded; any accepted payload format"""
+    try:
+        _, sums, counts = rule_encoder().read(user_data)
+    except PayloadError as e:
+        return invalid_payload_result(e)
+    return rule_result(rule_based_predict_totals(sums, counts))
+
+
+def rule_predict_batch(payloads):
+    """Rule-only batch entry point: one vectorized rule evaluation for every readable payload"""
+    encoder = rule_encoder()
+    results = [None] * len(payloads)
+    accepted = []
+    section_sums = []
+    section_counts = []
+    for index, user_data in enumerate(payloads):
+        try:
+            _, sums, counts = encoder.read(user_data)
+        except PayloadError as e:
+            results[index] = invalid_payload_result(e)
+            continue
+        accepted.append(index)
+        section_sums.append(sums)
+        section_counts.append(counts)
+    if accepted:
+        for index, prediction in zip(accepted, rule_based_predict_batch(section_sums, section_counts)):
+            results[index] = rule_result(prediction)
+    return results
+
+
+def cache_stats():
+    """Hit/miss counters and size of the result cache, the live model, and micro-batch counters when enabled"""
+    stats = RESULT_CACHE.stats()
+    stats['model'] = MODEL_REGISTRY.stats()
+    if _batcher is not None:
+        stats['micro_batch'] = _batcher.stats()
+    return stats
+
+
+def collect_metrics():
+    """Cache, model and micro-batch counters for /metrics, read from their own stats at scrape time"""
+    cache = RESULT_CACHE.stats()
+    model = MODEL_REGISTRY.stats()
+    families = [
+        ('ict_cache_hits_total', 'counter', 'Result cache hits', [({}, cache['hits'])]),
+        ('ict_cache_misses_total', 'counter', 'Result cache misses', [({}, cache['misses'])]),
+        ('ict_cache_coalesced_total', 'counter', 'Requests that waited on an identical one in flight', [({}, cache['coalesced'])]),
+        ('ict_cache_entries', 'gauge', 'Results currently cached', [({}, cache['size'])]),
+        ('ict_model_reloads_total', 'counter', 'New model versions swapped in', [({}, model['reloads'])]),
+        ('ict_model_load_failures_total', 'counter', 'Model versions that failed to load', [({}, model['failures'])])
+    ]
+    if model['version'] is not None:
+        families.append(('ict_model_info', 'gauge', 'Version of the model being served', [({'version': model['version']}, 1)]))
+    if _batcher is not None:
+        batches = _batcher.stats()
+        families.append(('ict_micro_batches_total', 'counter', 'Micro-batches scored', [({}, batches['batches'])]))
+        families.append(('ict_micro_batch_items_total', 'counter', 'Items scored in micro-batches', [({}, batches['items'])]))
+    return families
+
+
+METRICS.add_collector(collect_metrics)
+
+
+def metrics():
+    """Every metric of this process in Prometheus text format"""
+    return METRICS.render()
+
+
+def predict_batch(payloads):
+    """Batch entry point used by runner_adapter: list of payload dicts in, list of results out"""
+    try:
+        return get_predictor().predict_batch(payloads)
+    except Exception:
+        logger.exception("Batch prediction failed, returning fallback results")
+        return [fallback_result() for _ in payloads]
+
+
+def self_check(predictor, n_rows=200, seed=0):
+    """Check infer() against the model's own predict/predict_proba on random Likert rows.
+
+    Returns a dict with the number of label mismatches and the largest
+    probability difference; labels must all match and probabilities must
+    agree within COMPILED_TOLERANCE (exactly, when the tree engine is off).
+    """
+    if predictor.model is None:
+        raise ValueError('Self-check needs the pickled sklearn model, not an exported artifact')
+    rng = np.random.default_rng(seed)
+    X = rng.integers(1, 6, size=(n_rows, predictor.encoder.n_features)).astype(np.float32)
+    labels, proba, _ = predictor.infer(X)
+    expected_labels = list(predictor.le_target.inverse_transform(predictor.model.predict(X)))
+    expected_proba = predictor.model.predict_proba(X)
+    return {
+        'rows': n_rows,
+        'label_mismatches': sum(a != b for a, b in zip(labels, expected_labels)),
+        'max_proba_diff': float(np.abs(proba - expected_proba).max()) if n_rows else 0.0
     }
-    debug_print(f"Final JSON output: {result}")
+
+
+def main(argv=None):
+    """Command line usage: python bsit_runner.py <user_data.json> | --self-check [rows]"""
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] == '--self-check':
+        report = self_check(get_predictor(), n_rows=int(argv[1]) if len(argv) > 1 else 200)
+        print(json.dumps(report))
+        return 0 if report['label_mismatches'] == 0 and report['max_proba_diff'] <= COMPILED_TOLERANCE else 1
+
+    # Load user data from JSON file
+    try:
+        user_file = argv[0]
+        with open(user_file, 'r', encoding='utf-8') as f:
+            user_data = json.load(f)
+        logger.info("User data loaded from %s", user_file)
+    except FileNotFoundError as e:
+        logger.error("File not found: %s", e)
+        print(json.dumps(fallback_result()))
+        return 0
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON: %s", e)
+        print(json.dumps(fallback_result()))
+        return 0
+    except Exception as e:
+        logger.error("Failed to load user data: %s", e)
+        print(json.dumps(fallback_result()))
+        return 0
+
+    result = predict(user_data)
     print(json.dumps(result))
+    return 0
 
-except FileNotFoundError as e:
-    debug_print(f"✗ File not found: {e}")
-    # Return JSON fallback
-    fallback_result = {
-        'recommended_track': 'BSIT',
-        'scores': {'BSCS': 0, 'BSIT': 1, 'BSCPE': 0},
-        'track_specialization': 'Data Analytics'
-    }
-    print(json.dumps(fallback_result))
-except json.JSONDecodeError as e:
-    debug_print(f"✗ Invalid JSON: {e}")
-    # Return JSON fallback
-    fallback_result = {
-        'recommended_track': 'BSIT',
-        'scores': {'BSCS': 0, 'BSIT': 1, 'BSCPE': 0},
-        'track_specialization': 'Data Analytics'
-    }
-    print(json.dumps(fallback_result))
-except Exception as e:
-    debug_print(f"✗ Unexpected error: {e}")
-    debug_print(f"Error type: {type(e).__name__}")
-    import traceback
-    debug_print(f"Traceback: {traceback.format_exc()}")
-    # Return JSON fallback
-    fallback_result = {
-        'recommended_track': 'BSIT',
-        'scores': {'BSCS': 0, 'BSIT': 1, 'BSCPE': 0},
-        'track_specialization': 'Data Analytics'
-    }
-    print(json.dumps(fallback_result))
\ No newline at end of file
+
+if __name__ == '__main__':
+    sys.exit(main())
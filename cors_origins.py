@@ -0,0 +1,10 @@
+# cors_origins.py - ALLOWED_ORIGINS parsing shared by the Flask and ASGI apps (no framework imports)
+from typing import List
+
+
+def parse_allowed_origins(env_value: str | None) -> List[str]:
+    """Origins from a comma-separated ALLOWED_ORIGINS value; empty means any origin"""
+    if not env_value:
+        return []
+    parts = [part.strip() for part in env_value.split(",")]
+    return [p for p in parts if p]
@@ -0,0 +1,204 @@
+# data_source.py - Questionnaire responses for training: sheet URL, local file/directory, and local snapshots
+#
+# Every CSV fetched from a URL is kept as <snapshot_dir>/<sha256>.csv, and
+# sources.json in the same directory records the latest snapshot per URL
+# (plus ETag / Last-Modified for conditional requests). When the source is
+# unreachable, unchanged or offline=True, the latest snapshot is read instead.
+# A local CSV file, or a directory of CSV files, can stand in for the URL.
+import glob
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+import numpy as np
+
+SNAPSHOT_DIR = os.environ.get('ICT_SNAPSHOT_DIR', 'data_snapshots')
+SOURCES_INDEX = 'sources.json'
+FETCH_TIMEOUT = 30
+CHUNK_ROWS = 50000
+
+# Free-text columns; every other column is a small integer answer (Likert 1..5, Age)
+TEXT_COLUMNS = ('Timestamp', 'Email Address', 'Full Name', 'Gender', 'Strand', 'Recommended_Track')
+
+# Stored for blank, non-numeric, fractional or out-of-range answers; the rule
+# labeler already reads those as 0, and training treats 0 as unanswered
+MISSING_ANSWER = 0
+
+# frame: the responses; digest: sha256 of the CSV bytes (of every file, in name order, for a directory);
+# origin: 'network', 'not-modified', 'snapshot', 'file', 'directory' or 'none'
+Responses = namedtuple('Responses', 'frame digest origin')
+
+
+def is_url(source):
+    return '://' in str(source)
+
+
+def read_responses_csv(source, chunk_rows=CHUNK_ROWS):
+    """Parse a responses CSV (path or bytes) in chunks with explicit compact dtypes.
+
+    Text columns stay strings; every other column becomes int8 with
+    MISSING_ANSWER for anything that is not a whole number in -127..127, so
+    the answers take one byte each in a single block. Answers are parsed
+    straight to float32 by the C parser; only a file with non-numeric text
+    in an answer column is re-read as text and coerced.
+    """
+    import pandas as pd
+
+    def reader(**kwargs):
+        return pd.read_csv(io.BytesIO(source) if isinstance(source, bytes) else source, **kwargs)
+
+    try:
+        columns = list(reader(nrows=0).columns)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+    try:
+        dtype = {col: str if col in TEXT_COLUMNS else np.float32 for col in columns}
+        chunks = [_compact_chunk(chunk) for chunk in reader(dtype=dtype, chunksize=chunk_rows)]
+    except ValueError:
+        chunks = [_compact_chunk(chunk, coerce=True) for chunk in reader(dtype=str, chunksize=chunk_rows)]
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def compact_answers(answers, coerce=False):
+    """Answer columns as one int8 block (MISSING_ANSWER for blank, non-numeric, fractional or out-of-range).
+
+    coerce=True parses text/object columns with one pd.to_numeric call over
+    the flattened block instead of one call per column.
+    """
+    import pandas as pd
+
+    if coerce:
+        flat = pd.to_numeric(pd.Series(answers.to_numpy(dtype=object).ravel()), errors='coerce')
+        values = flat.to_numpy(dtype=np.float32, na_value=np.nan).reshape(answers.shape)
+    else:
+        values = answers.to_numpy(dtype=np.float32, na_value=np.nan)
+    valid = np.isfinite(values) & (values == np.round(values)) & (np.abs(values) <= 127)
+    return pd.DataFrame(np.where(valid, values, MISSING_ANSWER).astype(np.int8), columns=answers.columns, index=answers.index)
+
+
+def _compact_chunk(chunk, coerce=False):
+    import pandas as pd
+
+    answer_cols = [col for col in chunk.columns if col not in TEXT_COLUMNS]
+    if not answer_cols:
+        return chunk
+    small = compact_answers(chunk[answer_cols], coerce=coerce)
+    # Keep the CSV's column order
+    return pd.concat([chunk.drop(columns=answer_cols), small], axis=1)[list(chunk.columns)]
+
+
+def _read_index(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, SOURCES_INDEX), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def snapshot_path(snapshot_dir, digest):
+    return os.path.join(snapshot_dir, f'{digest}.csv')
+
+
+def save_snapshot(snapshot_dir, source, raw, etag=None, last_modified=None):
+    """Store raw CSV bytes under their content hash and make them the latest snapshot of source"""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    digest = hashlib.sha256(raw).hexdigest()
+    path = snapshot_path(snapshot_dir, digest)
+    if not os.path.exists(path):
+        _write_atomic(path, raw)
+    index = _read_index(snapshot_dir)
+    index[source] = {'digest': digest, 'fetched_at': time.time(), 'etag': etag, 'last_modified': last_modified}
+    _write_atomic(os.path.join(snapshot_dir, SOURCES_INDEX), json.dumps(index, indent=1, sort_keys=True).encode('utf-8'))
+    return digest
+
+
+def latest_snapshot(snapshot_dir, source):
+    """(digest, index entry) of the newest snapshot of source, or (None, None)"""
+    entry = _read_index(snapshot_dir).get(source)
+    if entry and os.path.exists(snapshot_path(snapshot_dir, entry['digest'])):
+        return entry['digest'], entry
+    return None, None
+
+
+def fetch(source, entry=None, timeout=FETCH_TIMEOUT):
+    """GET source; returns (raw bytes, etag, last_modified), or None when the server says 304 Not Modified"""
+    request = urllib.request.Request(source)
+    if entry:
+        if entry.get('etag'):
+            request.add_header('If-None-Match', entry['etag'])
+        if entry.get('last_modified'):
+            request.add_header('If-Modified-Since', entry['last_modified'])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers.get('ETag'), response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
+def load(source, snapshot_dir=SNAPSHOT_DIR, offline=False):
+    """Responses from source (URL, CSV file or directory of CSV files) as a Responses tuple.
+
+    URLs go through the snapshot cache: a fetched CSV is stored and parsed,
+    and a 304, a network error or offline=True reads the latest snapshot.
+    Raises LookupError if a URL cannot be fetched and has no snapshot yet.
+    """
+    if not is_url(source):
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, '*.csv')))
+            if not paths:
+                raise LookupError(f'No CSV files in {source}')
+            import pandas as pd
+
+            digest = hashlib.sha256()
+            frames = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                digest.update(raw)
+                frames.append(read_responses_csv(raw))
+            return Responses(pd.concat(frames, ignore_index=True), digest.hexdigest(), 'directory')
+        with open(source, 'rb') as f:
+            raw = f.read()
+        return Responses(read_responses_csv(raw), hashlib.sha256(raw).hexdigest(), 'file')
+
+    digest, entry = latest_snapshot(snapshot_dir, source)
+    error = 'offline mode'
+    if not offline:
+        try:
+            fetched = fetch(source, entry)
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        else:
+            if fetched is None:
+                return Responses(read_responses_csv(snapshot_path(snapshot_dir, digest)), digest, 'not-modified')
+            raw, etag, last_modified = fetched
+            new_digest = save_snapshot(snapshot_dir, source, raw, etag, last_modified)
+            origin = 'network' if new_digest != digest else 'not-modified'
+            return Responses(read_responses_csv(raw), new_digest, origin)
+
+    if digest is None:
+        raise LookupError(f'Could not load {source} ({error}) and there is no local snapshot of it')
+    return Responses(read_responses_csv(snapshot_path(snapshot_dir, digest)), digest, 'snapshot')
@@ -0,0 +1,174 @@
+# distill.py - Compact student model distilled from the trained ensemble, plus an accuracy/latency report
+#
+# The student reads the same 300-column feature row as the ensemble, projects
+# it onto the three section means and the top-k most important questions,
+# and walks one small regression tree fitted to the ensemble's soft labels.
+# It is written as an artifact directory (model_store) that bsit_runner loads
+# like any other, via MODEL_PATH.
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from model_store import export_artifact, write_artifact
+from rule_engine import section_masks
+from tree_engine import CompiledEnsemble, CompiledStudent, compile_ensemble
+
+REPORT_NAME = 'report.json'
+
+# Student defaults: questions kept next to the section means, tree size, and
+# the share of answers nudged by +/-1 in the augmented copy of the training rows
+TOP_K = 12
+MAX_DEPTH = 8
+MIN_SAMPLES_LEAF = 5
+JITTER = 0.15
+
+SECTION_NAMES = ('creative_mean', 'analytical_mean', 'networking_mean')
+
+
+def feature_importances(model):
+    """Mean normalized feature_importances_ over the ensemble members that have them"""
+    members = getattr(model, 'estimators_', [model])
+    found = [np.asarray(m.feature_importances_, dtype=np.float64) for m in members if hasattr(m, 'feature_importances_')]
+    found = [f / f.sum() for f in found if f.sum() > 0]
+    if not found:
+        raise ValueError('No ensemble member exposes feature_importances_ to rank questions by')
+    return np.mean(found, axis=0)
+
+
+def projection_matrix(feature_names, questions):
+    """(n_features, 3 + len(questions)): section means of the row, then the chosen questions as they are"""
+    masks = section_masks(feature_names).matrix
+    counts = masks.sum(axis=0)
+    means = np.divide(masks, counts, out=np.zeros_like(masks), where=counts > 0)
+    picks = np.zeros((len(feature_names), len(questions)), dtype=np.float64)
+    picks[np.asarray(questions, dtype=np.intp), np.arange(len(questions))] = 1.0
+    return np.hstack([means, picks])
+
+
+def jittered(X, rng, share=JITTER):
+    """Copy of the Likert rows with a share of the answers moved one step up or down (kept in 1..5)"""
+    noise = rng.integers(-1, 2, size=X.shape) * (rng.random(X.shape) < share)
+    return np.clip(X + noise, 1, 5).astype(X.dtype)
+
+
+def distill(model, X, feature_names, top_k=TOP_K, max_depth=MAX_DEPTH, min_samples_leaf=MIN_SAMPLES_LEAF, seed=0):
+    """Fit a CompiledStudent to the ensemble's predict_proba on X and a jittered copy of X.
+
+    Returns (student, indexes of the chosen questions).
+    """
+    from sklearn.tree import DecisionTreeRegressor
+
+    X = np.asarray(X, dtype=np.float32)
+    questions = np.argsort(feature_importances(model))[::-1][:top_k]
+    projection = projection_matrix(feature_names, questions)
+
+    rows = np.vstack([X, jittered(X, np.random.default_rng(seed))])
+    soft_labels = compile_ensemble(model).predict_proba(rows)
+    tree = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=min_samples_leaf, random_state=seed)
+    tree.fit(rows.astype(np.float64) @ projection, soft_labels)
+    return CompiledStudent.from_estimator(projection, tree), questions
+
+
+def student_version(student):
+    """Content hash of the student's arrays, like the pickle's file hash for the ensemble"""
+    digest = hashlib.sha256()
+    params, arrays = student.to_arrays()
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def per_row_us(predict_proba, X, batch, min_seconds=0.2):
+    """Best per-row latency in microseconds of predict_proba on `batch` rows, over repeated runs"""
+    rows = np.ascontiguousarray(X[:batch])
+    best = float('inf')
+    deadline = time.perf_counter() + min_seconds
+    while True:
+        started = time.perf_counter()
+        predict_proba(rows)
+        best = min(best, time.perf_counter() - started)
+        if time.perf_counter() > deadline:
+            break
+    return round(best / len(rows) * 1e6, 2)
+
+
+def compare(model, student, X_train, holdout, sizes, batches=(1, 1000)):
+    """Agreement with the ensemble, accuracy, artifact sizes and per-row latency of ensemble vs student.
+
+    holdout is (X, y) with y encoded like the ensemble's classes, rows neither model was fitted on.
+    """
+    X_hold, y_hold = np.asarray(holdout[0], dtype=np.float32), np.asarray(holdout[1])
+    X_train = np.asarray(X_train, dtype=np.float32)
+    teacher = compile_ensemble(model)
+
+    def labels(predict_proba, X):
+        return predict_proba(X).argmax(axis=1)
+
+    report = {
+        'rows': {'train': len(X_train), 'holdout': len(X_hold)},
+        'agreement': {
+            'train': float(np.mean(labels(teacher.predict_proba, X_train) == labels(student.predict_proba, X_train))),
+            'holdout': float(np.mean(labels(teacher.predict_proba, X_hold) == labels(student.predict_proba, X_hold)))
+        },
+        'holdout_accuracy': {
+            'ensemble': float(np.mean(labels(teacher.predict_proba, X_hold) == y_hold)),
+            'student': float(np.mean(labels(student.predict_proba, X_hold) == y_hold))
+        },
+        'size_bytes': sizes,
+        'latency_us_per_row': {}
+    }
+    probe = np.vstack([X_hold] * (max(batches) // max(len(X_hold), 1) + 1))
+    with warnings.catch_warnings():
+        # Fitted on a DataFrame, timed on numpy rows as the runner feeds it
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        for batch in batches:
+            report['latency_us_per_row'][f'batch_{batch}'] = {
+                'ensemble_sklearn': per_row_us(model.predict_proba, probe, batch),
+                'ensemble_compiled': per_row_us(teacher.predict_proba, probe, batch),
+                'student': per_row_us(student.predict_proba, probe, batch)
+            }
+    return report
+
+
+def distill_to_artifact(model_data, model_path, X_train, holdout, out_dir, top_k=TOP_K, max_depth=MAX_DEPTH, seed=0):
+    """Distil the pickled ensemble at model_path into an artifact at out_dir and write out_dir/report.json"""
+    model, le_target, feature_names = model_data['model'], model_data['target_encoder'], model_data['feature_names']
+    class_names = [str(name) for name in le_target.inverse_transform(model.classes_)]
+    student, questions = distill(model, X_train, feature_names, top_k=top_k, max_depth=max_depth, seed=seed)
+    version = student_version(student)
+    write_artifact(CompiledEnsemble([student]), class_names, feature_names, version, out_dir)
+
+    # Size of the full ensemble as an artifact too, for a like-for-like comparison
+    scratch = tempfile.mkdtemp(prefix='.ensemble-', dir=os.path.dirname(os.path.abspath(out_dir)))
+    try:
+        export_artifact(model, le_target, feature_names, 'size-probe', os.path.join(scratch, 'artifact'))
+        ensemble_artifact = artifact_bytes(os.path.join(scratch, 'artifact'))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    sizes = {'ensemble_pickle': artifact_bytes(model_path), 'ensemble_artifact': ensemble_artifact,
+             'student_artifact': artifact_bytes(out_dir)}
+
+    report = compare(model, student, X_train, holdout, sizes)
+    report.update({
+        'student_version': version,
+        'features': {'ensemble': len(feature_names), 'student': 3 + len(questions)},
+        'student_inputs': list(SECTION_NAMES) + [feature_names[i] for i in questions],
+        'tree': {'max_depth': max_depth, 'leaves': int(np.sum(student.trees.left == np.arange(len(student.trees.left))))}
+    })
+    with open(os.path.join(out_dir, REPORT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,191 @@
+# feature_encoder.py - Turns questionnaire payloads into model feature rows without pandas
+#
+# Three payload formats are accepted, in any mix of identity fields:
+#   legacy   {"<full question text>": "4", ...}
+#   ID map   {"c001": 4, "a017": "5", ...}  (short IDs from questionnaire_schema())
+#   array    {"schema": "<version>", "ratings": [4, 5, null, ...]}  (schema question order, null = unanswered)
+import math
+import numbers
+
+import numpy as np
+
+from questionnaire import questionnaire_schema
+from rule_engine import column_sections, rule_rating
+
+# Columns that are collected by the form but never used as model features
+METADATA_COLUMNS = ['Recommended_Track', 'Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']
+
+# Value used for rating answers that cannot be read as a number (same as training)
+DEFAULT_RATING = 3.0
+
+# Likert answers as the form sends them; looked up directly instead of parsed
+_LIKERT_VALUES = {str(i): float(i) for i in range(1, 6)}
+_LIKERT_VALUES.update({i: float(i) for i in range(1, 6)})
+
+
+# Error of the result entry for a payload that cannot be read (answered with 400 by the API)
+INVALID_PAYLOAD = 'Invalid questionnaire payload'
+
+
+class PayloadError(ValueError):
+    """Raised for a payload that cannot be read in any of the accepted formats"""
+
+
+def coerce_rating(value):
+    """Convert one answer the way pd.to_numeric(errors='coerce').fillna(3) does"""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, numbers.Real):
+        try:
+            number = float(value)
+        except OverflowError:  # an int too large for a float
+            return DEFAULT_RATING
+    elif isinstance(value, str):
+        # float() accepts a few spellings pandas does not ("1_000", non-ASCII digits)
+        if not value.isascii() or '_' in value:
+            return DEFAULT_RATING
+        try:
+            number = float(value)
+        except ValueError:
+            return DEFAULT_RATING
+    else:
+        return DEFAULT_RATING
+    return DEFAULT_RATING if math.isnan(number) else number
+
+
+def _likert(value):
+    try:
+        return _LIKERT_VALUES.get(value)
+    except TypeError:  # unhashable answer such as a list
+        return None
+
+
+def _rule_value(value, number):
+    # True and 2.0 hash like 1 and 2 but the rules read them as 0, so only exact str/int take the shortcut
+    return int(number) if number is not None and type(value) in (str, int) else rule_rating(value)
+
+
+class FeatureEncoder:
+    """Maps question text or short ID to a column position in the model's feature vector.
+
+    Built once from feature_names and the questionnaire schema. Answers are
+    written straight into a float32 row: known questions are coerced with
+    coerce_rating, unknown keys and metadata columns are ignored, and
+    unanswered questions stay 0. read() also returns the rule section totals
+    of the same answers, as rule_engine.section_totals gives for the payload
+    with full question texts.
+    """
+
+    def __init__(self, feature_names, schema=None):
+        schema = schema or questionnaire_schema()
+        self.feature_names = list(feature_names)
+        self.column_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.n_features = len(self.feature_names)
+        self.schema_version = schema['version']
+
+        texts = [question['text'] for question in schema['questions']]
+        self.section_index = {name: column_sections(name) for name in self.feature_names}
+        for question in schema['questions']:
+            self.section_index[question['id']] = self.section_index[question['text']] = column_sections(question['text'])
+            if question['text'] in self.column_index:
+                self.column_index[question['id']] = self.column_index[question['text']]
+
+        # Ordered-array format: feature column (-1 when the model has none), sections and 0/1 section row per schema position
+        self.array_columns = np.array([self.column_index.get(text, -1) for text in texts], dtype=np.intp)
+        self.array_section_lists = [column_sections(text) for text in texts]
+        self.array_sections = np.zeros((len(texts), 3), dtype=np.int64)
+        for position, text in enumerate(texts):
+            self.array_sections[position, list(column_sections(text))] = 1
+
+    def encode(self, user_data):
+        """Return a float32 row for one payload dict"""
+        return self.read(user_data)[0]
+
+    def encode_batch(self, payloads):
+        """Stack many payload dicts into one (n_payloads, n_features) float32 matrix"""
+        matrix = np.zeros((len(payloads), self.n_features), dtype=np.float32)
+        for row, user_data in zip(matrix, payloads):
+            self.read(user_data, row)
+        return matrix
+
+    def read(self, user_data, row=None):
+        """(float32 feature row, rule section sums, rule section counts) for one payload in any accepted format.
+
+        row, when given, is a zeroed row to fill in place. Raises PayloadError
+        for a payload that is not an object, or a ratings array that does not
+        match the current schema.
+        """
+        if not isinstance(user_data, dict):
+            raise PayloadError('Each questionnaire must be a JSON object')
+        if row is None:
+            row = np.zeros(self.n_features, dtype=np.float32)
+        ratings = user_data.get('ratings')
+        if isinstance(ratings, list):
+            sums, counts = self._fill_array(user_data.get('schema'), ratings, row)
+        else:
+            sums, counts = self._fill_keys(user_data, row)
+        return row, sums, counts
+
+    def _fill_keys(self, user_data, row):
+        column_index = self.column_index
+        section_index = self.section_index
+        indices = []
+        values = []
+        sums = [0, 0, 0]
+        counts = [0, 0, 0]
+        for key, value in user_data.items():
+            sections = section_index.get(key)
+            if sections is None:
+                # Unknown keys still count for the rules when their text matches a section keyword
+                sections = column_sections(key)
+            number = _likert(value)
+            if sections:
+                rating = _rule_value(value, number)
+                for section in sections:
+                    sums[section] += rating
+                    counts[section] += 1
+            index = column_index.get(key)
+            if index is not None:
+                indices.append(index)
+                values.append(coerce_rating(value) if number is None else number)
+        row[indices] = values
+        return sums, counts
+
+    def _fill_array(self, version, ratings, row):
+        if version != self.schema_version:
+            raise PayloadError(
+                f'ratings must come with "schema": "{self.schema_version}" (got {version!r}); '
+                'fetch /api/questionnaire/schema for the current question order'
+            )
+        if len(ratings) != len(self.array_columns):
+            raise PayloadError(f'Expected {len(self.array_columns)} ratings, got {len(ratings)}')
+        if all(type(value) is int for value in ratings):
+            # Common case, every question answered with a JSON integer: no per-answer Python work
+            try:
+                answers = np.array(ratings, dtype=np.int64)
+            except OverflowError:  # an int beyond int64; read answer by answer below
+                answers = None
+            if answers is not None and ((answers >= 1) & (answers <= 5)).all():
+                known = self.array_columns >= 0
+                row[self.array_columns[known]] = answers[known]
+                return (answers @ self.array_sections).tolist(), self.array_sections.sum(axis=0).tolist()
+        section_lists = self.array_section_lists
+        positions = []
+        values = []
+        # Python ints, as in _fill_keys: a rule value may not fit in int64
+        sums = [0, 0, 0]
+        counts = [0, 0, 0]
+        for position, value in enumerate(ratings):
+            if value is None:
+                continue
+            number = _likert(value)
+            positions.append(position)
+            values.append(coerce_rating(value) if number is None else number)
+            rating = _rule_value(value, number)
+            for section in section_lists[position]:
+                sums[section] += rating
+                counts[section] += 1
+        columns = self.array_columns[positions]
+        known = columns >= 0
+        row[columns[known]] = np.asarray(values, dtype=np.float32)[known]
+        return sums, counts
@@ -0,0 +1,100 @@
+# micro_batcher.py - Groups concurrent single predictions into one batch call
+import os
+import threading
+import time
+from collections import deque
+
+
+class _Slot:
+    """One submitted item waiting for its share of a batch result"""
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Collects items submitted from many threads and scores them together.
+
+    The first item to arrive opens a window of window_ms milliseconds; every
+    item submitted before the window closes (or until max_batch items are
+    waiting) goes into the same score_batch(items) call, which must return
+    one result per item in order. Callers block in submit() until their
+    result is ready, so a request waits at most one window plus one batch.
+    """
+
+    def __init__(self, score_batch, window_ms=3.0, max_batch=32):
+        self.score_batch = score_batch
+        self.window = max(float(window_ms), 0.0) / 1000.0
+        self.max_batch = max(int(max_batch), 1)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def submit(self, item):
+        """Score one item as part of the next batch and return its result"""
+        slot = _Slot(item)
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append(slot)
+            self._cond.notify()
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.value
+
+    def stats(self):
+        with self._cond:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+                'largest_batch': self.largest_batch,
+                'window_ms': self.window * 1000.0,
+                'max_batch': self.max_batch
+            }
+
+    def _ensure_worker(self):
+        # Threads do not survive fork: a worker forked from a preloaded master starts its own
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+
+    def _collect(self):
+        """Block for the first item, then gather more until the window closes or the batch is full"""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.score_batch([slot.item for slot in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f'score_batch returned {len(results)} results for {len(batch)} items')
+                for slot, value in zip(batch, results):
+                    slot.value = value
+            except BaseException as e:
+                for slot in batch:
+                    slot.error = e
+            for slot in batch:
+                slot.done.set()
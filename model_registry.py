@@ -0,0 +1,180 @@
+# model_registry.py - Serves the current model and hot-swaps new versions without a restart
+import gc
+import logging
+import os
+import threading
+import time
+import weakref
+
+logger = logging.getLogger('bsit_runner.registry')
+
+
+def path_signature(path):
+    """What identifies the model at path on disk, or None if it is not there.
+
+    Resolved path (so a switched symlink counts), inode, size and mtime of the
+    pickle, or of manifest.json for an artifact directory. Training and
+    export both write to a temp name and rename, so a new signature means a
+    complete new file.
+    """
+    real = os.path.realpath(path)
+    target = os.path.join(real, 'manifest.json') if os.path.isdir(real) else real
+    try:
+        st = os.stat(target)
+    except OSError:
+        return None
+    return (real, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ModelRegistry:
+    """Holds the live predictor and replaces it when the model on disk changes.
+
+    load(path) builds a predictor and warm(predictor), if given, runs it once
+    so its first real request is not a cold one. activate(predictor), if
+    given, runs when the predictor goes live, inside the swap: state shared
+    between versions (the result cache) must only change there, not while
+    the old model is still serving during the load. A daemon thread checks
+    resolve_path() every interval seconds; when the signature changes it
+    loads and warms the new version on that thread, without holding the
+    lock, and then swaps a single reference under it. The lock and the
+    watcher are re-created in a forked child (gunicorn --preload forks
+    workers from a master whose watcher may be mid-reload). Requests take the reference once, so in-flight ones finish on
+    the old model, whose memory goes away with the last of them. A model
+    that fails to load is logged and skipped; the current one keeps serving.
+    interval <= 0 disables the watcher (check() can still be called).
+    """
+
+    def __init__(self, load, resolve_path, interval=10.0, warm=None, activate=None):
+        self.load = load
+        self.resolve_path = resolve_path
+        self.interval = float(interval)
+        self.warm = warm
+        self.activate = activate
+        self._current = None
+        self._path = None
+        self._signature = None
+        self._failed_signature = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.loaded_at = None
+        if hasattr(os, 'register_at_fork'):
+            after_fork = weakref.WeakMethod(self._after_fork)
+            os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
+    def _after_fork(self):
+        # Only the forking thread survives: a lock held by the parent's watcher would never be released here
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def current(self):
+        """The live predictor; the first call loads it (on the caller's thread) and starts the watcher"""
+        predictor = self._current
+        if predictor is None:
+            with self._lock:
+                if self._current is None:
+                    path = self.resolve_path()
+                    signature = path_signature(path)
+                    self._install(self._build(path), path, signature)
+                predictor = self._current
+        self._ensure_watcher()
+        return predictor
+
+    def check(self):
+        """Swap in the model at resolve_path() if it changed since the last load; True if a new version went live.
+
+        Loading and warming run without the lock, so nothing waits on them;
+        only the compare-and-swap is locked.
+        """
+        path = self.resolve_path()
+        signature = path_signature(path)
+        if signature is None or signature in (self._signature, self._failed_signature):
+            return False
+
+        started = time.perf_counter()
+        try:
+            predictor = self._build(path)
+        except Exception as e:
+            with self._lock:
+                self._failed_signature = signature
+                self.failures += 1
+                self.last_error = f'{type(e).__name__}: {e}'
+            logger.error("Could not load the new model at %s (%s); still serving version %s",
+                         path, self.last_error, self.version)
+            return False
+
+        with self._lock:
+            if signature == self._signature:
+                # Another check() installed this version while we were loading it
+                return False
+            previous = self._current
+            old_version = getattr(previous, 'model_version', None)
+            if old_version is not None and old_version == getattr(predictor, 'model_version', None):
+                # Same content under a new timestamp (e.g. re-copied file): keep the warm one
+                self._signature = signature
+                return False
+            self._install(predictor, path, signature)
+            self.reloads += 1
+
+        logger.info(
+            "Model %s -> %s from %s (loaded and warmed in %.0f ms off the request path)",
+            old_version, predictor.model_version, path, (time.perf_counter() - started) * 1000.0
+        )
+        # Requests still running hold their own reference; drop ours and collect any cycles now
+        del previous
+        gc.collect()
+        return True
+
+    @property
+    def version(self):
+        return getattr(self._current, 'model_version', None)
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'path': self._path,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'interval': self.interval
+        }
+
+    def _build(self, path):
+        predictor = self.load(path)
+        if self.warm is not None:
+            self.warm(predictor)
+        return predictor
+
+    def _install(self, predictor, path, signature):
+        # One reference assignment: a request sees either the old predictor or the new one, never a mix
+        self._current = predictor
+        if self.activate is not None:
+            # After the swap, so results the old model stored during the load are dropped too
+            self.activate(predictor)
+        self._path = path
+        self._signature = signature
+        self._failed_signature = None
+        self.loaded_at = time.time()
+
+    def _ensure_watcher(self):
+        # Threads do not survive fork: a worker forked from a preloaded master starts its own
+        if self.interval <= 0 or (self._pid == os.getpid() and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+                self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Model watcher check failed")
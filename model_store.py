@@ -0,0 +1,166 @@
+# model_store.py - Memory-mappable model artifact (numpy arrays + JSON manifest)
+#
+# Layout of an artifact directory:
+#   manifest.json       format, model version, class names, feature names,
+#                       voting weights and per-member parameters
+#   m<i>.<array>.npy    one file per node/coefficient array of member i
+#
+# np.load(..., mmap_mode='r') maps the arrays instead of copying them, so every
+# gunicorn worker on the host reads the same physical pages from the page cache.
+#
+# The artifact path itself is a symlink to a versioned sibling directory
+# (.<name>.<random>). A new export is written to a new sibling and the link is
+# switched with one rename, so the reload watcher or a starting worker always
+# finds a complete artifact at the path, the old one or the new one.
+#
+# Usage: python model_store.py export rf_ict_model.pkl rf_ict_model.artifact
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from tree_engine import MEMBER_KINDS, CompiledEnsemble, UnsupportedModelError, compile_ensemble
+
+ARTIFACT_FORMAT = 'ict-compiled-ensemble'
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+class ModelArtifact:
+    """A loaded artifact: the compiled ensemble plus the metadata the runner needs"""
+
+    def __init__(self, ensemble, class_names, feature_names, model_version, path=None):
+        self.ensemble = ensemble
+        self.class_names = list(class_names)
+        self.feature_names = list(feature_names)
+        self.model_version = model_version
+        self.path = path
+
+    def predict_proba(self, X):
+        return self.ensemble.predict_proba(X)
+
+
+def is_artifact(path):
+    """True if path is an artifact directory"""
+    return bool(path) and os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def export_artifact(model, le_target, feature_names, model_version, out_dir):
+    """Write a fitted ensemble as an artifact directory (built in a staging dir, then moved into place)"""
+    ensemble = compile_ensemble(model)
+    if not ensemble.fully_compiled:
+        raise UnsupportedModelError('Every ensemble member must be compilable to export an artifact')
+
+    class_names = [str(name) for name in le_target.inverse_transform(model.classes_)]
+    return write_artifact(ensemble, class_names, feature_names, model_version, out_dir)
+
+
+def write_artifact(ensemble, class_names, feature_names, model_version, out_dir):
+    """Write an already compiled ensemble (every member with a KIND) as an artifact directory"""
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': model_version,
+        'class_names': class_names,
+        'feature_names': list(feature_names),
+        'weights': None if ensemble.weights is None else ensemble.weights.tolist(),
+        'members': []
+    }
+
+    out_dir = os.path.abspath(out_dir)
+    staging = tempfile.mkdtemp(prefix=f'.{os.path.basename(out_dir)}.', dir=os.path.dirname(out_dir))
+    try:
+        for index, member in enumerate(ensemble.members):
+            params, arrays = member.to_arrays()
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f'm{index}.{name}.npy'), np.ascontiguousarray(array))
+            manifest['members'].append({'kind': member.KIND, 'params': params, 'arrays': sorted(arrays)})
+        with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        publish(staging, out_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return out_dir
+
+
+def publish(version_dir, out_dir):
+    """Make the finished version_dir (a sibling of out_dir) the artifact at out_dir.
+
+    out_dir becomes a symlink to version_dir, swapped in with os.replace, and
+    the version it pointed to before is removed afterwards (processes that
+    mapped its arrays keep them). A plain directory left at out_dir by an
+    older export is renamed aside first, so out_dir is only missing between
+    two renames, once. Where symlinks are not available (Windows without the
+    privilege) version_dir is renamed to out_dir in the same way.
+    """
+    name = os.path.basename(out_dir)
+    previous = os.path.realpath(out_dir) if os.path.islink(out_dir) else None
+    aside = None
+    if previous is None and os.path.isdir(out_dir):
+        aside = f'{version_dir}.previous'
+        os.rename(out_dir, aside)
+    link = f'{version_dir}.link'
+    try:
+        os.symlink(os.path.basename(version_dir), link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        os.rename(version_dir, out_dir)
+    else:
+        os.replace(link, out_dir)
+    if aside is not None:
+        shutil.rmtree(aside, ignore_errors=True)
+    # Only versions this module wrote next to out_dir are removed, never a target linked by hand
+    current = os.path.realpath(version_dir)
+    ours = previous is not None and os.path.dirname(previous) == os.path.dirname(current) \
+        and os.path.basename(previous).startswith(f'.{name}.')
+    if ours and previous != current:
+        shutil.rmtree(previous, ignore_errors=True)
+    return out_dir
+
+
+def load_artifact(path, mmap=True):
+    """Load an artifact directory; arrays are memory-mapped read-only unless mmap=False"""
+    # Read everything from the version the link points to now, even if a new export switches it meanwhile
+    root = os.path.realpath(path)
+    with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT or manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format in {path}: {manifest.get('format')} v{manifest.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+    members = []
+    for index, spec in enumerate(manifest['members']):
+        arrays = {
+            name: np.load(os.path.join(root, f'm{index}.{name}.npy'), mmap_mode=mmap_mode)
+            for name in spec['arrays']
+        }
+        members.append(MEMBER_KINDS[spec['kind']].from_arrays(spec['params'], arrays))
+
+    return ModelArtifact(
+        CompiledEnsemble(members, manifest['weights']),
+        manifest['class_names'],
+        manifest['feature_names'],
+        manifest['model_version'],
+        path=path
+    )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] != 'export':
+        print("Usage: python model_store.py export <model.pkl> <artifact_dir>", file=sys.stderr)
+        return 2
+
+    from bsit_runner import load_model
+
+    model, le_target, feature_names, model_version = load_model(argv[1])
+    export_artifact(model, le_target, feature_names, model_version, argv[2])
+    print(f"✓ Exported {argv[1]} -> {argv[2]} (version {model_version})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+# questionnaire.py - Question text of the ICT track questionnaire, by section, and the compact payload schema
+import functools
+import hashlib
+
+# Short ID prefix per rating section; IDs are the prefix plus the 1-based position in the section
+# (c001..c100, a001..a100, n001..n100). New questions go at the end of a section so existing IDs keep their meaning.
+SECTION_PREFIXES = (('creative', 'c'), ('analytical', 'a'), ('networking', 'n'))
+
+
+def get_questionnaire_questions():
+    """Returns the complete questionnaire structure"""
+    
+    # Section 1: Basic Information
+    section1 = ['Timestamp', 'Email Address', 'Full Name', 'Age', 'Gender', 'Strand']
+    
+    # Section 2: Creative/Design Questions (100 questions)
+    section2 = [
+        "I enjoy designing posters, logos, or other visual materials.",
+        "I like editing photos or enhancing images.",
+        "I enjoy creating and editing videos.",
+        "I am passionate about animation and motion graphics.",
+        "I like experimenting with colors, shapes, and layouts.",
+        "I am interested in web design and interface aesthetics.",
+        "I enjoy storytelling through digital media.",
+        "I like creating digital content for social media.",
+        "I often notice design flaws in websites or apps.",
+        "I have an eye for visual balance and composition.",
+        "I like drawing, sketching, or illustrating.",
+        "I enjoy using creative software to make designs.",
+        "I pay attention to typography and fonts in designs.",
+        "I like collaborating with others on creative projects.",
+        "I prefer hands-on creative tasks over theoretical work.",
+        "I get excited learning about new design trends.",
+        "I find satisfaction when my creative work is appreciated.",
+        "I like expressing myself through digital art.",
+        "I am detail-oriented when it comes to visuals.",
+        "I often imagine new design ideas in my head.",
+        "I am comfortable using Adobe Photoshop or similar tools.",
+        "I want to improve my video editing skills.",
+        "I know how to use Canva, Figma, or similar tools.",
+        "I enjoy experimenting with visual effects.",
+        "I want to create my own brand or creative portfolio someday.",
+        "I can combine sound, video, and graphics creatively.",
+        "I enjoy learning software like Premiere Pro or After Effects.",
+        "I can visualize how a scene should look in a video.",
+        "I understand basic concepts of color theory.",
+        "I can work well under creative pressure.",
+        "I enjoy designing layouts for websites or magazines.",
+        "I am curious about how 3D design works.",
+        "I prefer creative work over coding.",
+        "I enjoy photo manipulation projects.",
+        "I am patient when editing long creative projects.",
+        "I get inspired by digital art online.",
+        "I like learning how advertisements are designed.",
+        "I can create a cohesive design theme.",
+        "I value originality in creative works.",
+        "I pay attention to small details when creating media.",
+        "I like presenting creative ideas visually.",
+        "I enjoy using editing software for videos or photos.",
+        "I am open to feedback on my creative output.",
+        "I can adjust designs based on audience preference.",
+        "I often explore creative communities or forums.",
+        "I am inspired by popular designers or digital artists.",
+        "I can mix creativity with functionality in designs.",
+        "I prefer creating content over analyzing data.",
+        "I am fascinated by digital marketing visuals.",
+        "I often design invitations, posters, or presentations.",
+        "I like making multimedia presentations engaging.",
+        "I can work with music and video synchronization.",
+        "I have experience with editing software or apps.",
+        "I enjoy creating infographics.",
+        "I like turning concepts into visuals.",
+        "I am excited by technological advancements in design.",
+        "I can think creatively even with limited resources.",
+        "I enjoy transforming simple ideas into digital art.",
+        "I'm confident showing my creative work to others.",
+        "I learn new creative tools quickly.",
+        "I prefer colorful designs over minimal ones.",
+        "I am familiar with basic UI/UX design.",
+        "I like learning about animation principles.",
+        "I am interested in film and visual storytelling.",
+        "I pay attention to trends in graphic design.",
+        "I enjoy brainstorming creative ideas.",
+        "I am patient during repetitive creative tasks.",
+        "I am resourceful when working on creative projects.",
+        "I like organizing digital assets for design projects.",
+        "I can adapt to different design styles.",
+        "I understand the importance of branding.",
+        "I can interpret client needs visually.",
+        "I enjoy typography experiments.",
+        "I can work with limited creative direction.",
+        "I like producing multimedia content for campaigns.",
+        "I am proud of my creative accomplishments.",
+        "I enjoy visual storytelling challenges.",
+        "I keep my design files and projects organized.",
+        "I am open to exploring augmented or virtual reality in design.",
+        "I am curious about UI animation.",
+        "I enjoy designing icons and logos.",
+        "I can mix photography and design effectively.",
+        "I want to pursue a creative digital career.",
+        "I find inspiration in art, film, and media.",
+        "I enjoy testing different color combinations.",
+        "I often redesign visuals I see online for fun.",
+        "I am eager to learn new editing software.",
+        "I like teaching others how to design.",
+        "I can imagine scenes vividly before creating them.",
+        "I am attracted to multimedia-based careers.",
+        "I am comfortable working on long creative projects.",
+        "I enjoy designing for specific audiences.",
+        "I think visually rather than verbally.",
+        "I am interested in creative freelancing.",
+        "I enjoy blending sound, motion, and visuals.",
+        "I can describe my ideas visually.",
+        "I often give creative suggestions to others.",
+        "I value aesthetics in everything I do.",
+        "I want to become a multimedia professional.",
+        "I believe creativity defines my personality."
+    ]
+    
+    # Section 3: Data Analytics Questions (100 questions)
+    section3 = [
+        "I enjoy working with numbers and statistics.",
+        "I like solving logical problems.",
+        "I find patterns easily in large amounts of information.",
+        "I enjoy analyzing data to make conclusions.",
+        "I am detail-oriented when working on data.",
+        "I prefer logic over creativity.",
+        "I enjoy solving math-related challenges.",
+        "I like working with spreadsheets or data tools.",
+        "I am curious about how businesses use data to improve.",
+        "I find satisfaction in discovering insights from data.",
+        "I am comfortable using Microsoft Excel or Google Sheets.",
+        "I enjoy organizing data into tables and graphs.",
+        "I like working on step-by-step logical solutions.",
+        "I enjoy learning programming or scripting languages.",
+        "I like exploring patterns and relationships between variables.",
+        "I am interested in learning about artificial intelligence.",
+        "I am curious about machine learning and predictive modeling.",
+        "I like reading about data science applications.",
+        "I can interpret graphs, charts, and data visualizations easily.",
+        "I prefer accuracy and precision in my work.",
+        "I like to test hypotheses and find evidence-based answers.",
+        "I am excited by solving data-driven problems.",
+        "I can focus on detailed tasks for long periods.",
+        "I am curious how companies use big data.",
+        "I like using technology to solve real-world issues.",
+        "I can work independently on analytical tasks.",
+        "I enjoy using logic to make decisions.",
+        "I like automating repetitive tasks using scripts.",
+        "I am familiar with coding basics (Python, SQL, etc.).",
+        "I am patient when solving complex data problems.",
+        "I like visualizing numbers in graphs or dashboards.",
+        "I am curious about how algorithms work.",
+        "I prefer structured data over creative designs.",
+        "I enjoy comparing datasets for trends.",
+        "I am confident with basic math and statistics.",
+        "I like troubleshooting errors in data.",
+        "I prefer data accuracy over speed.",
+        "I enjoy working with logical reasoning puzzles.",
+        "I can explain findings based on facts and data.",
+        "I am open to learning advanced analytics tools.",
+        "I can write simple code to process data.",
+        "I like learning programming-related concepts.",
+        "I am interested in business intelligence.",
+        "I am curious about how Google or YouTube analyze data.",
+        "I want to learn data visualization tools like Tableau or Power BI.",
+        "I enjoy reporting data insights to others.",
+        "I find satisfaction in debugging code or formulas.",
+        "I can analyze trends in sales, traffic, or statistics.",
+        "I am confident in interpreting percentages and averages.",
+        "I like optimizing systems using data.",
+        "I am curious about predictive analytics.",
+        "I want to understand how AI learns from data.",
+        "I am good at comparing multiple results.",
+        "I like breaking down problems logically.",
+        "I am organized when managing data.",
+        "I like verifying if results are accurate.",
+        "I prefer working on research and reports.",
+        "I enjoy challenging math or coding problems.",
+        "I am focused when handling analytical work.",
+        "I enjoy learning about data storage and management.",
+        "I am curious about cybersecurity and data integrity.",
+        "I like tracking progress using numbers.",
+        "I prefer logic-based decisions over emotions.",
+        "I can work comfortably with digital tools.",
+        "I like understanding how technology processes data.",
+        "I am eager to learn machine learning models.",
+        "I am confident explaining graphs to others.",
+        "I enjoy accuracy and attention to detail.",
+        "I like designing systems that make smart decisions.",
+        "I am excited by the future of AI and analytics.",
+        "I am familiar with CSV or database files.",
+        "I can interpret correlations and trends.",
+        "I enjoy comparing data sets visually.",
+        "I am disciplined when testing code or data.",
+        "I can handle abstract problems analytically.",
+        "I enjoy optimizing performance through metrics.",
+        "I like writing algorithms.",
+        "I can explain complex ideas in simple terms.",
+        "I prefer factual arguments over emotional ones.",
+        "I like coding challenges and logical games.",
+        "I enjoy mathematics and problem-solving.",
+        "I am confident handling large data sets.",
+        "I want to work in tech-related analytics jobs.",
+        "I am interested in business analytics.",
+        "I am eager to learn Python or R.",
+        "I like building data dashboards.",
+        "I am curious about cloud-based data tools.",
+        "I can work well under analytical deadlines.",
+        "I can explain why trends happen in data.",
+        "I prefer practical applications of math.",
+        "I am comfortable using logical formulas.",
+        "I want to specialize in data analytics.",
+        "I am curious about predictive systems.",
+        "I like improving systems using data.",
+        "I can combine logic and creativity effectively.",
+        "I want to pursue a career as a data analyst.",
+        "I enjoy working with structured data.",
+        "I find numbers easier to understand than text.",
+        "I am confident in using data to make decisions.",
+        "I believe analytical thinking defines me."
+    ]
+    
+    # Section 4: Networking Questions (100 questions)
+    section4 = [
+        "I am interested in how computers connect to the internet.",
+        "I enjoy troubleshooting connectivity issues.",
+        "I like understanding how data travels between devices.",
+        "I am curious about how Wi-Fi and routers work.",
+        "I enjoy configuring hardware devices.",
+        "I like solving technical computer problems.",
+        "I am interested in computer architecture.",
+        "I prefer working on technical rather than creative tasks.",
+        "I enjoy assembling or disassembling computers.",
+        "I am fascinated by how servers operate.",
+        "I am curious about cybersecurity and firewalls.",
+        "I like managing hardware and network devices.",
+        "I enjoy configuring IP addresses or LAN connections.",
+        "I like diagnosing network performance problems.",
+        "I prefer working with cables, routers, and switches.",
+        "I am comfortable using terminal or command line tools.",
+        "I enjoy learning about network protocols.",
+        "I am patient when solving technical errors.",
+        "I enjoy working with operating systems and setup.",
+        "I like experimenting with network configurations.",
+        "I am curious about how the internet infrastructure works.",
+        "I am detail-oriented when working with systems.",
+        "I enjoy installing software and system updates.",
+        "I like securing systems from unauthorized access.",
+        "I am comfortable managing computer laboratories.",
+        "I enjoy learning about data transmission.",
+        "I like organizing cables and hardware equipment.",
+        "I am excited about emerging networking technologies.",
+        "I prefer structured systems over creative projects.",
+        "I can handle hands-on hardware tasks.",
+        "I enjoy connecting and testing different devices.",
+        "I am familiar with IP, DNS, or DHCP.",
+        "I like monitoring system performance.",
+        "I can identify and fix technical errors quickly.",
+        "I like updating device firmware or settings.",
+        "I can follow technical documentation well.",
+        "I prefer logical step-by-step tasks.",
+        "I am familiar with basic Linux commands.",
+        "I am curious about cloud networks.",
+        "I like learning about servers and storage systems.",
+        "I am confident configuring basic routers.",
+        "I enjoy experimenting with virtualization tools.",
+        "I like researching solutions for network problems.",
+        "I am patient when testing configurations.",
+        "I am curious about enterprise-level systems.",
+        "I like reading technical manuals.",
+        "I enjoy comparing network performance metrics.",
+        "I can handle repetitive setup tasks efficiently.",
+        "I can document system configurations properly.",
+        "I enjoy upgrading and maintaining networks.",
+        "I am interested in computer maintenance.",
+        "I like checking network cables and devices.",
+        "I am fascinated by how data centers work.",
+        "I like designing efficient network layouts.",
+        "I prefer tasks that require technical precision.",
+        "I enjoy working with system hardware.",
+        "I like observing network speed and connectivity.",
+        "I am excited about learning Cisco or similar tools.",
+        "I can explain how devices communicate in a network.",
+        "I like optimizing network efficiency.",
+        "I am comfortable handling complex setups.",
+        "I can multitask during technical troubleshooting.",
+        "I like testing ping, trace route, and connections.",
+        "I enjoy maintaining local area networks.",
+        "I am curious about IoT devices and communication.",
+        "I like designing secured network topologies.",
+        "I prefer system administration tasks.",
+        "I am patient during testing and installation.",
+        "I like improving system reliability.",
+        "I am confident setting up routers or switches.",
+        "I enjoy observing network data flow.",
+        "I like implementing firewall rules.",
+        "I am excited by innovations in computer networking.",
+        "I am interested in network automation.",
+        "I prefer practical tasks over paperwork.",
+        "I like optimizing network traffic.",
+        "I am curious about virtual private networks (VPNs).",
+        "I enjoy building and maintaining IT infrastructure.",
+        "I can easily identify connection issues.",
+        "I like working in a team for technical projects.",
+        "I prefer configuring systems over designing graphics.",
+        "I am organized with system configurations.",
+        "I like testing devices and connections.",
+        "I am confident setting up local networks.",
+        "I am motivated to learn new networking technologies.",
+        "I enjoy understanding how the cloud works.",
+        "I like maintaining security across systems.",
+        "I am eager to get certified in networking (e.g., CCNA).",
+        "I can visualize network layouts mentally.",
+        "I am comfortable documenting hardware inventory.",
+        "I enjoy managing multiple computers simultaneously.",
+        "I prefer fieldwork over paperwork.",
+        "I am excited about careers in IT and networking.",
+        "I like configuring wireless networks.",
+        "I can follow instructions carefully during setup.",
+        "I want to work as a network administrator someday.",
+        "I enjoy keeping systems secure and running smoothly.",
+        "I am good at troubleshooting system errors.",
+        "I want to specialize in computer networking.",
+        "I believe technical problem-solving defines me."
+    ]
+    
+    return section1, section2, section3, section4
+
+
+@functools.lru_cache(maxsize=1)
+def questionnaire_schema():
+    """Versioned schema of the rating questions, as served at /api/questionnaire/schema.
+
+    'questions' lists every rating question in a fixed order with its short
+    ID; an ordered ratings array follows that order. 'version' is a hash of
+    the IDs and texts, so any change to the questions gives a new version.
+    """
+    identity, *sections = get_questionnaire_questions()
+    questions = []
+    for (section, prefix), texts in zip(SECTION_PREFIXES, sections):
+        questions.extend({'id': f'{prefix}{position:03d}', 'section': section, 'text': text}
+                         for position, text in enumerate(texts, start=1))
+    digest = hashlib.sha256('\n'.join(f"{q['id']}\t{q['text']}" for q in questions).encode('utf-8'))
+    return {'version': f'q1-{digest.hexdigest()[:12]}', 'identity_fields': list(identity), 'questions': questions}
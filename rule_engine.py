@@ -0,0 +1,155 @@
+# rule_engine.py - Precompiled, vectorized rule-based track scoring
+import functools
+
+import numpy as np
+
+# Keywords that place a question in a section (matched against the lowercased question text)
+CREATIVE_KEYWORDS = ['designing', 'editing', 'creating', 'visual', 'graphics', 'animation', 'colors', 'drawing', 'creative']
+ANALYTICAL_KEYWORDS = ['numbers', 'statistics', 'data', 'analytics', 'patterns', 'logical', 'math', 'programming', 'algorithms']
+NETWORKING_KEYWORDS = ['computers', 'connect', 'internet', 'network', 'hardware', 'routers', 'servers', 'technical', 'cables']
+SECTION_KEYWORDS = (CREATIVE_KEYWORDS, ANALYTICAL_KEYWORDS, NETWORKING_KEYWORDS)
+
+# Column order of every section array below: creative, analytical, networking
+CREATIVE, ANALYTICAL, NETWORKING = 0, 1, 2
+
+# Track order used for score arrays; ties go to the first track, as in the dict-based rules
+BASIC_TRACKS = ('BSCS', 'BSIT', 'BSCPE')
+ALL_TRACKS = ('BSCS', 'BSIT-DATA ANALYTICS', 'BSIT-MULTIMEDIA', 'BSIT', 'BSCPE')
+
+
+@functools.lru_cache(maxsize=8192)
+def column_sections(col_name):
+    """Sections a question belongs to, as a tuple of section indexes (cached per column name)"""
+    if not isinstance(col_name, str):
+        return ()
+    lowered = col_name.lower()
+    return tuple(
+        section for section, keywords in enumerate(SECTION_KEYWORDS)
+        if any(keyword in lowered for keyword in keywords)
+    )
+
+
+def rule_rating(value):
+    """Rating as the rules read it: plain digit strings/ints count, anything else is 0"""
+    try:
+        return int(value) if str(value).isdigit() else 0
+    except:
+        return 0
+
+
+class SectionMasks:
+    """Section membership of a fixed column list, compiled into a (n_columns, 3) 0/1 matrix"""
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.matrix = np.zeros((len(self.columns), len(SECTION_KEYWORDS)), dtype=np.float64)
+        for index, col_name in enumerate(self.columns):
+            for section in column_sections(col_name):
+                self.matrix[index, section] = 1.0
+        self.counts = self.matrix.sum(axis=0)
+
+    def section_means(self, ratings, present=None):
+        """Average rating per section for a (n_rows, n_columns) rating matrix.
+
+        present marks which answers were actually given (all of them when
+        omitted); sections without any answered question score 0.
+        """
+        ratings = np.asarray(ratings, dtype=np.float64)
+        sums = ratings @ self.matrix
+        if present is None:
+            counts = np.broadcast_to(self.counts, sums.shape)
+        else:
+            counts = np.asarray(present, dtype=np.float64) @ self.matrix
+        return section_means_from_totals(sums, counts)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_section_masks(columns):
+    return SectionMasks(columns)
+
+
+def section_masks(columns):
+    """Compiled SectionMasks for a column list, cached per distinct column set"""
+    return _compile_section_masks(tuple(columns))
+
+
+def section_totals(data):
+    """Summed rule ratings and answered-question counts per section for one payload dict"""
+    sums = [0, 0, 0]
+    counts = [0, 0, 0]
+    for col_name, value in data.items():
+        sections = column_sections(col_name)
+        if sections:
+            rating = rule_rating(value)
+            for section in sections:
+                sums[section] += rating
+                counts[section] += 1
+    return sums, counts
+
+
+def section_means_from_totals(sums, counts):
+    """Divide section sums by counts, leaving 0 where a section had no questions"""
+    sums = np.asarray(sums, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+def score_basic_tracks(means):
+    """Basic-track rules (BSCS/BSIT/BSCPE) for a (n_rows, 3) matrix of section means.
+
+    Returns (scores, winners, specializations): scores is (n_rows, 3) in
+    BASIC_TRACKS order, winners are indexes into BASIC_TRACKS and
+    specializations is a list of strings.
+    """
+    means = np.atleast_2d(np.asarray(means, dtype=np.float64))
+    creative = means[:, CREATIVE]
+    analytical = means[:, ANALYTICAL]
+    networking = means[:, NETWORKING]
+    creative_or_analytical = np.maximum(creative, analytical)
+
+    # BSCPE: Strong networking preference
+    networking_focus = (networking >= 3.5) & (networking > creative_or_analytical)
+    # BSCS: Strong analytical preference WITH creative elements (computer science pattern)
+    analytical_creative = (analytical >= 4.5) & (creative >= 3.0) & (analytical > networking)
+    # BSCS fallback: Very high analytical even without creative
+    analytical_only = (analytical >= 4.8) & (analytical > np.maximum(creative, networking) * 1.3)
+    conditions = [networking_focus, analytical_creative, analytical_only]
+
+    scores = np.empty_like(means)
+    scores[:, 0] = np.select(conditions, [analytical * 0.7, analytical * 1.1 + (creative * 0.4), analytical * 1.05], analytical * 0.8)
+    scores[:, 1] = np.select(conditions, [creative_or_analytical * 0.8, creative_or_analytical * 0.85, creative_or_analytical * 0.9], np.maximum(creative_or_analytical, 3.0))
+    scores[:, 2] = np.select(conditions, [networking, networking * 0.7, networking * 0.7], networking * 0.8)
+
+    winners = scores.argmax(axis=1)
+    specializations = [
+        track_specialization(BASIC_TRACKS[w], c, a)
+        for w, c, a in zip(winners.tolist(), creative.tolist(), analytical.tolist())
+    ]
+    return scores, winners, specializations
+
+
+def track_specialization(track, creative, analytical):
+    """Specialization shown with a basic track, from the creative and analytical section means"""
+    if track == 'BSIT':
+        return 'Multimedia' if creative > analytical else 'Data Analytics'
+    return 'Data Analytics' if track == 'BSCS' else 'Networking'
+
+
+def recommend_tracks(means):
+    """Full-track rules (ALL_TRACKS) for a (n_rows, 3) matrix of section means; returns labels"""
+    means = np.atleast_2d(np.asarray(means, dtype=np.float64))
+    creative = means[:, CREATIVE]
+    analytical = means[:, ANALYTICAL]
+    networking = means[:, NETWORKING]
+
+    scores = np.empty((len(means), len(ALL_TRACKS)), dtype=np.float64)
+    # BSCS gets points for high analytical + moderate creative
+    scores[:, 0] = np.where((analytical >= 3.5) & (creative >= 2.5), (analytical + creative) / 2, analytical * 0.8)
+    scores[:, 1] = analytical
+    scores[:, 2] = creative
+    scores[:, 4] = networking
+    # BSIT gets points if no strong specialization
+    max_specialist_score = scores[:, [0, 1, 2, 4]].max(axis=1)
+    scores[:, 3] = np.where(max_specialist_score < 3.5, 3.0, 2.0)
+
+    return [ALL_TRACKS[w] for w in scores.argmax(axis=1).tolist()]
@@ -1,53 +1,138 @@
-import importlib
 import os
-from typing import Any, Callable, Optional
+from typing import Any, Callable, NamedTuple
 
+from feature_encoder import INVALID_PAYLOAD
 
-def _try_import(module_name: str):
+# Default model location when MODEL_PATH is not set (place your file there or set the env var)
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "rf_ict.pkl")
+
+
+class BackendError(RuntimeError):
+	"""Raised at startup when the configured backend cannot serve (unknown name, missing model or module)."""
+
+
+class Backend(NamedTuple):
+	"""Callables of one predictor backend, bound once at startup."""
+
+	name: str
+	predict: Callable[[dict], Any]
+	predict_batch: Callable[[list], list]
+	cache_stats: Callable[[], dict]
+	metrics: Callable[[], str]
+	warmup: Callable[[], Any]
+
+
+BACKENDS: dict[str, Callable[[], Backend]] = {}
+
+
+def register_backend(name: str) -> Callable:
+	"""Decorator: register a factory that returns a Backend (and raises BackendError if it cannot serve)."""
+
+	def decorator(factory: Callable[[], Backend]) -> Callable[[], Backend]:
+		BACKENDS[name] = factory
+		return factory
+
+	return decorator
+
+
+def _require_model(path: str, what: str) -> str:
+	if not os.path.exists(path):
+		raise BackendError(f"{what} not found at {path}; set MODEL_PATH, or ICT_BACKEND=rules to serve without a model")
+	return path
+
+
+def _model_backend(name: str, decision: str, model_path: str | None = None) -> Backend:
+	import bsit_runner
+
+	bsit_runner.configure(decision, model_path)
+	path = _require_model(bsit_runner.configured_model_path(), "Model")
 	try:
-		return importlib.import_module(module_name)
-	except Exception:
-		return None
+		# Load and warm the served model now: a truncated, corrupt or incompatible file stops the worker at boot
+		bsit_runner.get_predictor()
+	except Exception as exc:
+		raise BackendError(f"Model at {path} cannot be loaded ({exc}); fix MODEL_PATH, or ICT_BACKEND=rules to serve without a model") from exc
+	return Backend(
+		name, bsit_runner.predict, bsit_runner.predict_batch, bsit_runner.cache_stats, bsit_runner.metrics,
+		bsit_runner.get_predictor,
+	)
 
 
-def _find_callable(module, candidates: list[str]) -> Optional[Callable[..., Any]]:
-	if module is None:
-		return None
-	for name in candidates:
-		func = getattr(module, name, None)
-		if callable(func):
-			return func
-	return None
+@register_backend("hybrid")
+def hybrid_backend() -> Backend:
+	# Rules pick the track; the ensemble runs alongside for comparison (bsit_runner's long-standing behaviour)
+	return _model_backend("hybrid", "hybrid")
 
 
-def predict(input_payload: dict) -> Any:
-	"""Attempts to call a function from bsit_runner or bsit_recommendation.
+@register_backend("ensemble")
+def ensemble_backend() -> Backend:
+	# The ensemble's label and class probabilities are the answer
+	return _model_backend("ensemble", "model")
 
-	Order of preference per module: predict -> run -> main
-	Passes the full JSON payload through as a single argument.
-	If no function is found, returns a 501-like dict.
-	"""
 
-	# Make MODEL_PATH available to user code if they rely on it
-	# Default to ./models/rf_ict.pkl (place your file there or set env var)
-	model_path = os.environ.get("MODEL_PATH")
-	if not model_path:
-		default_path = os.path.join(os.path.dirname(__file__), "models", "rf_ict.pkl")
-		os.environ["MODEL_PATH"] = default_path
+@register_backend("distilled")
+def distilled_backend() -> Backend:
+	# Like ensemble, served from the student artifact written by `bsit_recommendation.py --distill DIR`
+	path = os.environ.get("ICT_DISTILLED_PATH")
+	if not path:
+		raise BackendError("ICT_BACKEND=distilled needs ICT_DISTILLED_PATH (the --distill output directory)")
+	from model_store import is_artifact
+
+	if not is_artifact(_require_model(path, "Distilled model")):
+		raise BackendError(f"{path} is not a model artifact directory")
+	return _model_backend("distilled", "model", path)
+
+
+@register_backend("rules")
+def rules_backend() -> Backend:
+	# Keyword rules only: no model file, no sklearn, nothing to load
+	import bsit_runner
+
+	return Backend("rules", bsit_runner.rule_predict, bsit_runner.rule_predict_batch, dict, bsit_runner.metrics, bsit_runner.rule_encoder)
+
+
+def load_backend(name: str | None = None) -> Backend:
+	"""The backend named by name or ICT_BACKEND (default hybrid); raises BackendError if it cannot serve."""
+
+	name = name or os.environ.get("ICT_BACKEND", "hybrid")
+	factory = BACKENDS.get(name)
+	if factory is None:
+		raise BackendError(f"Unknown ICT_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+	os.environ.setdefault("MODEL_PATH", DEFAULT_MODEL_PATH)
+	try:
+		return factory()
+	except ImportError as exc:
+		raise BackendError(f"Backend {name!r} cannot import its modules: {exc}") from exc
+
+
+# Resolved once when the app imports this module, so a misconfigured worker or unloadable model fails at boot.
+# predict/predict_batch are the backend's own functions: a request costs one call to them.
+BACKEND = load_backend()
+predict = BACKEND.predict
+predict_batch = BACKEND.predict_batch
+metrics = BACKEND.metrics
+
 
-	bsit_runner = _try_import("bsit_runner")
-	bsit_reco = _try_import("bsit_recommendation")
+def result_status(result: Any) -> int:
+	"""HTTP status for a predict() result: 400 for an unreadable payload, 501 for any other error dict, else 200."""
 
-	call_order = ["predict", "run", "main"]
+	if not isinstance(result, dict) or "error" not in result:
+		return 200
+	return 400 if result["error"] == INVALID_PAYLOAD else 501
 
-	func = _find_callable(bsit_runner, call_order) or _find_callable(bsit_reco, call_order)
-	if func is None:
-		return {
-			"error": "No callable entrypoint found.",
-			"details": "Expected one of predict/run/main in bsit_runner or bsit_recommendation.",
-			"hint": "Ensure your files are in the same folder as app.py and exported functions accept a single dict arg.",
-		}
 
-	return func(input_payload)
+def cache_stats() -> dict:
+	"""The backend's cache/model counters, plus which backend is serving."""
 
+	return {**BACKEND.cache_stats(), "backend": BACKEND.name}
+
+
+def warmup() -> bool:
+	"""Makes sure the backend's model is loaded in this process.
+
+	The backend already loads it when this module is imported (so
+	`gunicorn --preload` loads it once in the master); inference worker
+	processes call this before taking requests.
+	"""
 
+	BACKEND.warmup()
+	return True
@@ -0,0 +1,153 @@
+# stage_metrics.py - In-process latency histograms and request counters, rendered in Prometheus text format
+#
+# Each observation is one bisect and two additions under a per-series lock:
+# no strings are built and nothing is logged on the request path. Text is
+# only produced when /metrics is scraped. Values are per process, so with
+# several gunicorn workers each scrape sees the worker that answered it.
+import bisect
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds, from 50 µs (one compiled row) to 10 s (a large batch or a model load)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum; one labelled series of a HistogramFamily"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class HistogramFamily:
+    """Histograms sharing a name, one per combination of label values"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, Histogram(self.buckets))
+        return series
+
+    def observe(self, seconds, *values):
+        self.labels(*values).observe(seconds)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for values, series in sorted(self._series.items()):
+            counts, total = series.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, values)} {total!r}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, values)} {cumulative}')
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters sharing a name, one per combination of label values"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount=1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter'] + [
+            f'{self.name}{_labels(self.label_names, values)} {value}' for values, value in items
+        ]
+
+
+class Registry:
+    """The families of one process, plus collectors that report values owned elsewhere (cache, model)"""
+
+    def __init__(self):
+        self.families = []
+        self.collectors = []
+
+    def histogram(self, name, help_text, label_names=(), buckets=BUCKETS):
+        family = HistogramFamily(name, help_text, label_names, buckets)
+        self.families.append(family)
+        return family
+
+    def counter(self, name, help_text, label_names=()):
+        family = CounterFamily(name, help_text, label_names)
+        self.families.append(family)
+        return family
+
+    def add_collector(self, collect):
+        """collect() returns (name, type, help, [(labels dict, value), ...]) tuples; called at scrape time only"""
+        if collect not in self.collectors:
+            self.collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for family in self.families:
+            lines.extend(family.render())
+        for collect in self.collectors:
+            for name, kind, help_text, samples in collect():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels.keys(), labels.values())} {float(value)!r}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# stage: json_parse, rule_scoring, feature_assembly, model_inference, serialization,
+# compression (only for compressed responses);
+# mode: single (one questionnaire) or batch (one observation per batch)
+STAGE_SECONDS = REGISTRY.histogram(
+    'ict_stage_seconds', 'Time spent in each stage of a recommendation request', ('stage', 'mode')
+)
+REQUEST_SECONDS = REGISTRY.histogram('ict_request_seconds', 'Time to handle a request, per endpoint', ('endpoint',))
+REQUESTS_TOTAL = REGISTRY.counter('ict_requests_total', 'Requests answered, per endpoint and status code', ('endpoint', 'status'))
+MODEL_LOAD_SECONDS = REGISTRY.histogram('ict_model_load_seconds', 'Time to load a model version, before warming')
+
+
+def render():
+    return REGISTRY.render()
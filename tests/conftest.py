@@ -0,0 +1,40 @@
+# conftest.py - Makes the top-level modules importable when pytest runs from the repo root
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def base_model():
+    """model_data of a small full training (2 folds, serial) on the synthetic cohorts"""
+    pytest.importorskip('pandas')
+    pytest.importorskip('sklearn')
+    import bsit_recommendation
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = bsit_recommendation.label_training_responses(bsit_recommendation.generate_synthetic_responses())
+        X, y, le_target = bsit_recommendation.prepare_training_data(df)
+        _, ensemble = bsit_recommendation.cross_validate_and_fit(bsit_recommendation.build_ensemble(), X, y, cv=2, n_jobs=1)
+    return {
+        'model': ensemble,
+        'target_encoder': le_target,
+        'feature_names': list(X.columns),
+        'incorporated_responses': bsit_recommendation.response_keys(df),
+        'trained_rows': len(X),
+        'training_round': 0
+    }
+
+
+@pytest.fixture(scope='session')
+def model_file(base_model, tmp_path_factory):
+    """base_model pickled the way training writes it"""
+    import bsit_recommendation
+
+    path = tmp_path_factory.mktemp('model') / 'rf_ict.pkl'
+    bsit_recommendation.save_model_data(base_model, str(path))
+    return str(path)
@@ -0,0 +1,45 @@
+# test_feature_encoder.py - The three payload formats read the same answers the same way
+import pytest
+
+import bsit_runner
+from feature_encoder import FeatureEncoder
+from questionnaire import questionnaire_schema
+
+SCHEMA = questionnaire_schema()
+
+
+def encoder():
+    return FeatureEncoder([question['text'] for question in SCHEMA['questions']])
+
+
+def payloads(ratings):
+    """The same ratings as a legacy, a short-ID and an ordered-array payload"""
+    questions = SCHEMA['questions']
+    return {
+        'legacy': {question['text']: rating for question, rating in zip(questions, ratings)},
+        'ids': {question['id']: rating for question, rating in zip(questions, ratings)},
+        'array': {'schema': SCHEMA['version'], 'ratings': list(ratings)}
+    }
+
+
+@pytest.mark.parametrize('oversized', [10 ** 20, 2 ** 64 - 1, 10 ** 400])
+def test_oversized_int_reads_the_same_in_every_format(oversized):
+    ratings = [4] * len(SCHEMA['questions'])
+    ratings[0] = oversized
+    reads = {fmt: encoder().read(payload) for fmt, payload in payloads(ratings).items()}
+    row, sums, counts = reads['legacy']
+    for fmt, (other_row, other_sums, other_counts) in reads.items():
+        assert other_row.tobytes() == row.tobytes(), fmt
+        assert (list(other_sums), list(other_counts)) == (list(sums), list(counts)), fmt
+    assert sums[0] >= oversized
+
+
+@pytest.mark.parametrize('oversized', [10 ** 20, 2 ** 64 - 1])
+def test_oversized_int_is_scored_not_rejected(oversized):
+    ratings = [4] * len(SCHEMA['questions'])
+    ratings[0] = oversized
+    items = list(payloads(ratings).values())
+    singles = [bsit_runner.rule_predict(payload) for payload in items]
+    assert all('error' not in result for result in singles)
+    assert singles[1:] == singles[:-1]
+    assert bsit_runner.rule_predict_batch(items) == singles
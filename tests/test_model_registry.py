@@ -0,0 +1,113 @@
+# test_model_registry.py - Cache versioning at swap time, and reloads that never block requests or forks
+import os
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+from result_cache import ResultCache
+
+
+class Predictor:
+    def __init__(self, version, cache):
+        self.model_version = version
+        self.cache = cache
+
+    def activate(self):
+        self.cache.set_version(self.model_version)
+
+
+def test_cache_version_changes_only_when_the_new_model_goes_live(tmp_path):
+    model = tmp_path / 'model.pkl'
+    model.write_text('v1')
+    cache = ResultCache(maxsize=16)
+    seen_during_load = []
+
+    def load(path):
+        version = open(path).read()
+        # The old model is still serving while the new one loads: the cache must be untouched
+        seen_during_load.append((cache.version, cache.get('old-result')))
+        return Predictor(version, cache)
+
+    registry = ModelRegistry(load, lambda: str(model), interval=0, activate=Predictor.activate)
+    assert registry.current().model_version == 'v1'
+    assert cache.version == 'v1'
+
+    cache.put('old-result', {'recommended_track': 'BSIT'})
+    model.write_text('v2-longer')
+    assert registry.check()
+    assert seen_during_load[-1] == ('v1', {'recommended_track': 'BSIT'})
+    assert registry.current().model_version == 'v2-longer'
+    assert cache.version == 'v2-longer'
+    assert cache.get('old-result') is None
+
+
+def test_failed_load_leaves_the_cache_alone(tmp_path):
+    model = tmp_path / 'model.pkl'
+    model.write_text('v1')
+    cache = ResultCache(maxsize=16)
+
+    def load(path):
+        version = open(path).read()
+        if version == 'broken':
+            raise ValueError('corrupt model')
+        return Predictor(version, cache)
+
+    registry = ModelRegistry(load, lambda: str(model), interval=0, activate=Predictor.activate)
+    registry.current()
+    cache.put('result', {'recommended_track': 'BSCS'})
+    model.write_text('broken')
+    assert not registry.check()
+    assert cache.version == 'v1'
+    assert cache.get('result') == {'recommended_track': 'BSCS'}
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_fork_during_a_slow_reload_does_not_hang_the_child(tmp_path):
+    model = tmp_path / 'model.pkl'
+    model.write_text('v1')
+    parent = os.getpid()
+    loading = threading.Event()
+    release = threading.Event()
+
+    def load(path):
+        version = open(path).read()
+        if version == 'v2' and os.getpid() == parent:
+            # The parent's reload is still loading when the worker is forked
+            loading.set()
+            release.wait(10)
+        return Predictor(version, ResultCache(maxsize=0))
+
+    # A long interval: the watcher thread exists (as in a preloaded master) but never checks on its own
+    registry = ModelRegistry(load, lambda: str(model), interval=3600)
+    registry.current()
+    model.write_text('v2')
+    reload = threading.Thread(target=registry.check)
+    reload.start()
+    assert loading.wait(10)
+
+    pid = os.fork()
+    if pid == 0:
+        # Worker: serving and reloading must not wait on the parent's reload
+        ok = False
+        try:
+            ok = registry.current() is not None and registry.check() and registry.current().model_version == 'v2'
+        finally:
+            os._exit(0 if ok else 1)
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, 9)
+                os.waitpid(pid, 0)
+                pytest.fail('forked worker hung on the registry lock')
+            time.sleep(0.05)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    finally:
+        release.set()
+        reload.join()
+    assert registry.current().model_version == 'v2'
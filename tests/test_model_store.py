@@ -0,0 +1,49 @@
+# test_model_store.py - Artifact export replaces the previous version without a gap
+import os
+import threading
+
+import numpy as np
+
+from model_store import is_artifact, load_artifact, write_artifact
+from tree_engine import CompiledEnsemble, CompiledLinear
+
+FEATURES = ['q1', 'q2']
+CLASSES = ['BSCPE', 'BSCS', 'BSIT']
+
+
+def ensemble(bias):
+    return CompiledEnsemble([CompiledLinear(np.eye(3, 2), np.full(3, float(bias)))])
+
+
+def test_export_replaces_a_plain_directory_and_later_versions(tmp_path):
+    out_dir = tmp_path / 'model.artifact'
+    out_dir.mkdir()
+    (out_dir / 'stale.npy').write_bytes(b'')
+    for version in ('v1', 'v2', 'v3'):
+        write_artifact(ensemble(0), CLASSES, FEATURES, version, str(out_dir))
+        assert load_artifact(str(out_dir)).model_version == version
+    # The link and the live version only; earlier versions and the old directory are gone
+    assert sorted(os.listdir(tmp_path)) == sorted(['model.artifact', os.path.basename(os.path.realpath(out_dir))])
+
+
+def test_artifact_is_always_complete_while_exporting(tmp_path):
+    out_dir = str(tmp_path / 'model.artifact')
+    write_artifact(ensemble(0), CLASSES, FEATURES, 'v0', out_dir)
+    missing = []
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            if not is_artifact(out_dir):
+                missing.append(True)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        for version in range(20):
+            write_artifact(ensemble(version), CLASSES, FEATURES, f'v{version + 1}', out_dir)
+    finally:
+        done.set()
+        watcher.join()
+    assert not missing
+    assert load_artifact(out_dir).model_version == 'v20'
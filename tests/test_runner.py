@@ -0,0 +1,49 @@
+# test_runner.py - ICTPredictor.infer answers exactly what the sklearn ensemble answers
+import numpy as np
+import pytest
+
+import bsit_runner
+
+
+def rows_and_payloads(feature_names):
+    """Fixed Likert rows plus the rows FeatureEncoder reads from malformed (but accepted) payloads"""
+    n = len(feature_names)
+    first, second = feature_names[0], feature_names[1]
+    payloads = [
+        {},
+        {'Timestamp': '2024-01-01', 'Email Address': 'x@example.com'},
+        {first: 0, second: 9},
+        {first: -3, second: 6.7},
+        {first: '5', second: 'four'},
+        {first: None, second: [], 'not a question': 5},
+        {first: True, second: 10 ** 20},
+        {name: 3.5 for name in feature_names},
+    ]
+    fixed = np.array([[1] * n, [5] * n, [3] * n, [(i % 5) + 1 for i in range(n)]], dtype=np.float32)
+    return fixed, payloads
+
+
+@pytest.fixture(params=['1', '0'], ids=['tree-engine', 'sklearn'])
+def predictor(request, model_file, monkeypatch):
+    monkeypatch.setenv('ICT_TREE_ENGINE', request.param)
+    return bsit_runner.ICTPredictor(model_file)
+
+
+def test_infer_matches_the_ensemble(predictor):
+    fixed, payloads = rows_and_payloads(predictor.feature_names)
+    X = np.vstack([fixed, predictor.encoder.encode_batch(payloads)])
+    model, le_target = predictor.model, predictor.le_target
+    for rows in (X[:1], X):
+        labels, proba, class_names = predictor.infer(rows)
+        assert labels == list(le_target.inverse_transform(model.predict(rows)))
+        assert class_names == list(le_target.inverse_transform(model.classes_))
+        if predictor.compiled_proba is None:
+            assert np.array_equal(proba, model.predict_proba(rows))
+        else:
+            assert np.allclose(proba, model.predict_proba(rows), rtol=0, atol=bsit_runner.COMPILED_TOLERANCE)
+
+
+def test_self_check_finds_no_mismatch(predictor):
+    report = bsit_runner.self_check(predictor, n_rows=64)
+    assert report['label_mismatches'] == 0
+    assert report['max_proba_diff'] <= bsit_runner.COMPILED_TOLERANCE
@@ -0,0 +1,41 @@
+# test_runner_adapter.py - Backend selection fails at boot, not on the first request
+import os
+import pickle
+
+import pytest
+
+import bsit_runner
+from model_registry import ModelRegistry
+
+# Importing runner_adapter builds the ICT_BACKEND backend; rules needs no model file
+os.environ.setdefault('ICT_BACKEND', 'rules')
+import runner_adapter  # noqa: E402
+
+
+@pytest.fixture
+def fresh_runner(monkeypatch):
+    """bsit_runner with its startup globals restored afterwards and no model loaded yet"""
+    monkeypatch.setattr(bsit_runner, 'DECISION', bsit_runner.DECISION)
+    monkeypatch.setattr(bsit_runner, '_model_path', bsit_runner._model_path)
+    monkeypatch.setattr(bsit_runner, 'MODEL_REGISTRY', ModelRegistry(bsit_runner.load_predictor, bsit_runner.configured_model_path, interval=0))
+    return bsit_runner
+
+
+@pytest.mark.parametrize('content', [
+    b'not a pickle at all',
+    pickle.dumps({'model': None, 'target_encoder': None, 'feature_names': []})[:-5],
+    pickle.dumps({'model': None, 'target_encoder': None, 'feature_names': []}),
+], ids=['garbage', 'truncated', 'incompatible'])
+@pytest.mark.parametrize('backend', ['hybrid', 'ensemble'])
+def test_unloadable_model_file_stops_the_backend_at_boot(fresh_runner, monkeypatch, tmp_path, content, backend):
+    model_path = tmp_path / 'rf_ict.pkl'
+    model_path.write_bytes(content)
+    monkeypatch.setenv('MODEL_PATH', str(model_path))
+    with pytest.raises(runner_adapter.BackendError, match='cannot be loaded'):
+        runner_adapter.load_backend(backend)
+
+
+def test_missing_model_file_stops_the_backend_at_boot(fresh_runner, monkeypatch, tmp_path):
+    monkeypatch.setenv('MODEL_PATH', str(tmp_path / 'missing.pkl'))
+    with pytest.raises(runner_adapter.BackendError, match='not found'):
+        runner_adapter.load_backend('hybrid')
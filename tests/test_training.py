@@ -0,0 +1,64 @@
+# test_training.py - Training paths of bsit_recommendation on the synthetic cohorts
+import contextlib
+import copy
+import io
+import pickle
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sklearn')
+
+import bsit_recommendation  # noqa: E402
+
+
+def quiet(function, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def form_responses(rows=40):
+    """Responses as the Google form exports them: new respondents, no Recommended_Track column"""
+    df = bsit_recommendation.generate_synthetic_responses(seed=7).sample(rows, random_state=0).reset_index(drop=True)
+    df['Email Address'] = 'form_' + df['Email Address']
+    return df.drop(columns='Recommended_Track')
+
+
+def test_unlabeled_rows_get_the_labels_full_training_gives_them():
+    responses = form_responses()
+    full = quiet(bsit_recommendation.label_training_responses,
+                 quiet(bsit_recommendation.add_synthetic_responses, responses.copy()))
+    alone = quiet(bsit_recommendation.label_training_responses, responses.copy())
+    assert list(alone['Recommended_Track']) == list(full['Recommended_Track'][:len(responses)])
+
+
+def test_incremental_update_on_unlabeled_responses(base_model):
+    responses = form_responses()
+    updated = quiet(bsit_recommendation.incremental_update, copy.deepcopy(base_model), responses, n_jobs=1)
+    assert updated is not None
+    assert updated['training_round'] == 1
+    assert updated['trained_rows'] == base_model['trained_rows'] + len(responses)
+    assert set(bsit_recommendation.response_keys(responses)) <= set(updated['incorporated_responses'])
+
+
+def test_fitted_members_do_not_keep_training_threads(base_model):
+    # Trained with threads=1 per job; the pickled members must be back at the default
+    ensemble = base_model['model']
+    for name, member in ensemble.named_estimators_.items():
+        if 'n_jobs' in member.get_params(deep=False):
+            assert member.n_jobs is None, name
+    assert ensemble.named_estimators_['rf'].n_jobs is None
+
+
+def test_full_training_without_response_keys_records_none(tmp_path):
+    # Neither Timestamp nor Email Address: full training still runs; only --incremental needs the keys
+    csv_path = tmp_path / 'responses.csv'
+    form_responses().drop(columns=['Timestamp', 'Email Address']).to_csv(csv_path, index=False)
+    output = tmp_path / 'model.pkl'
+    argv = [str(output), '--responses', str(csv_path), '--snapshot-dir', str(tmp_path / 'snapshots'), '--jobs', '1']
+    assert quiet(bsit_recommendation.main, argv) == 0
+    with open(output, 'rb') as f:
+        model_data = pickle.load(f)
+    assert 'incorporated_responses' not in model_data
+    with pytest.raises(ValueError, match='run a full training first'):
+        quiet(bsit_recommendation.incremental_update, model_data, form_responses(), n_jobs=1)
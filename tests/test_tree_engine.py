@@ -0,0 +1,46 @@
+# test_tree_engine.py - Compiled members reproduce sklearn's (and LightGBM's) predict_proba
+import numpy as np
+import pytest
+
+from tree_engine import CompiledBooster, compile_ensemble
+
+
+def likert_rows(n_rows, n_features, seed=0):
+    return np.random.default_rng(seed).integers(1, 6, size=(n_rows, n_features)).astype(np.float32)
+
+
+@pytest.fixture(scope='module')
+def compiled(base_model):
+    return compile_ensemble(base_model['model'])
+
+
+def test_every_fixture_member_is_compiled(base_model, compiled):
+    assert compiled.fully_compiled
+    assert len(compiled.members) == len(base_model['model'].estimators_)
+
+
+@pytest.mark.parametrize('n_rows', [1, 300])
+def test_each_member_matches_its_estimator(base_model, compiled, n_rows):
+    ensemble = base_model['model']
+    X = likert_rows(n_rows, len(base_model['feature_names']))
+    for (name, _), estimator, member in zip(ensemble.estimators, ensemble.estimators_, compiled.members):
+        assert np.allclose(member.predict_proba(X), estimator.predict_proba(X), rtol=0, atol=1e-9), name
+
+
+@pytest.mark.parametrize('n_rows', [1, 300])
+def test_ensemble_matches_voting_classifier(base_model, compiled, n_rows):
+    X = likert_rows(n_rows, len(base_model['feature_names']), seed=1)
+    assert np.allclose(compiled.predict_proba(X), base_model['model'].predict_proba(X), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_lightgbm_booster_matches_lightgbm(n_classes):
+    # bsit_recommendation uses LightGBM for the boosted member when it is installed;
+    # without it the member is HistGradientBoosting, covered above
+    lightgbm = pytest.importorskip('lightgbm', reason='lightgbm not installed: the from_lightgbm path is untested here')
+    X = likert_rows(400, 12, seed=2)
+    y = (X[:, 0] + X[:, 1] - X[:, 2]).astype(int) % n_classes
+    model = lightgbm.LGBMClassifier(n_estimators=30, num_leaves=15, verbose=-1).fit(X, y)
+    member = CompiledBooster.from_lightgbm(model)
+    for rows in (X[:1], X):
+        assert np.allclose(member.predict_proba(rows), model.predict_proba(rows), rtol=0, atol=1e-9)
@@ -0,0 +1,447 @@
+# tree_engine.py - Flattened, numpy-vectorized inference for the saved soft-voting ensemble
+import numpy as np
+
+# Rows walked together; bounds the (rows x trees) index arrays for large batches
+ROW_CHUNK = 512
+
+# LightGBM missing-value modes, per node
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+
+
+class UnsupportedModelError(ValueError):
+    """Raised when an estimator cannot be flattened into node arrays"""
+
+
+def _softmax(raw):
+    raw = raw - raw.max(axis=1, keepdims=True)
+    np.exp(raw, out=raw)
+    raw /= raw.sum(axis=1, keepdims=True)
+    return raw
+
+
+def _expit(raw):
+    return 1.0 / (1.0 + np.exp(-raw))
+
+
+class TreeArrays:
+    """Many decision trees flattened into one set of contiguous node arrays.
+
+    Node i tests X[:, feature[i]] <= threshold[i] and moves to left[i] or
+    right[i]; leaves point to themselves, so walking depth steps from the
+    roots always ends on a leaf. values[i] is the leaf output (one row per
+    node, n_outputs columns).
+    """
+
+    # Arrays written by to_arrays(); everything else is derived or a scalar
+    ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'children', 'values', 'roots', 'missing_left', 'missing_mode')
+
+    def __init__(self, feature, threshold, left, right, values, roots, depth,
+                 missing_left=None, missing_mode=None, children=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.depth = int(depth)
+        self.missing_left = None if missing_left is None else np.ascontiguousarray(missing_left, dtype=bool)
+        self.missing_mode = None if missing_mode is None else np.ascontiguousarray(missing_mode, dtype=np.int8)
+        if children is None:
+            children = np.column_stack([self.right, self.left]).reshape(-1)
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def to_arrays(self, prefix=''):
+        """(params, arrays) for saving; arrays keep the exact dtypes __init__ uses, so they can be memory-mapped back"""
+        arrays = {prefix + name: getattr(self, name) for name in self.ARRAY_NAMES if getattr(self, name) is not None}
+        return {'depth': self.depth}, arrays
+
+    @classmethod
+    def from_arrays(cls, params, arrays, prefix=''):
+        found = {name: arrays[prefix + name] for name in cls.ARRAY_NAMES if prefix + name in arrays}
+        return cls(depth=params['depth'], **found)
+
+    def leaf_values(self, X):
+        """Leaf output of every tree for every row: (n_rows, n_trees, n_outputs)"""
+        X = np.ascontiguousarray(X)
+        out = np.empty((len(X), self.n_trees, self.values.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), ROW_CHUNK):
+            chunk = X[start:start + ROW_CHUNK]
+            out[start:start + len(chunk)] = self.values[self._leaves(chunk)]
+        return out
+
+    def _leaves(self, X):
+        n_rows, n_features = X.shape
+        flat_X = X.reshape(-1)
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        handle_missing = self.missing_left is not None and (
+            bool(np.isnan(X).any()) or (self.missing_mode is not None and bool((self.missing_mode == MISSING_ZERO).any()))
+        )
+        for _ in range(self.depth):
+            x = flat_X.take(row_offsets + self.feature.take(node))
+            threshold = self.threshold.take(node)
+            go_left = x <= threshold
+            if handle_missing:
+                nan = np.isnan(x)
+                if self.missing_mode is None:
+                    missing = nan
+                else:
+                    mode = self.missing_mode.take(node)
+                    missing = (nan & (mode != MISSING_NONE)) | ((mode == MISSING_ZERO) & (x == 0))
+                    # LightGBM reads NaN as 0.0 when the split has no missing handling
+                    go_left |= nan & (mode == MISSING_NONE) & (0.0 <= threshold)
+                go_left = np.where(missing, self.missing_left.take(node), go_left)
+            # children holds (right, left) per node, so 2 * node + go_left picks the branch
+            node = self.children.take(2 * node + go_left)
+        return node
+
+
+def _concatenate(trees, n_outputs):
+    """Merge per-tree node lists [(feature, threshold, left, right, values, missing_left, missing_mode, depth)]"""
+    offsets = np.cumsum([0] + [len(t[0]) for t in trees[:-1]])
+    parts = list(zip(*trees))
+
+    def cat(index, shift=False):
+        arrays = [np.asarray(a) for a in parts[index]]
+        if shift:
+            arrays = [a + offset for a, offset in zip(arrays, offsets)]
+        return np.concatenate(arrays)
+
+    missing_modes = parts[6]
+    return TreeArrays(
+        feature=cat(0),
+        threshold=cat(1),
+        left=cat(2, shift=True),
+        right=cat(3, shift=True),
+        values=np.concatenate([np.asarray(v, dtype=np.float64).reshape(-1, n_outputs) for v in parts[4]]),
+        roots=offsets,
+        depth=max(parts[7]),
+        missing_left=cat(5),
+        missing_mode=None if missing_modes[0] is None else cat(6)
+    )
+
+
+def _self_loop_leaves(left, right, is_leaf):
+    node_ids = np.arange(len(left))
+    left = np.where(is_leaf, node_ids, left)
+    right = np.where(is_leaf, node_ids, right)
+    return left, right
+
+
+def _sklearn_tree(estimator, regression=False):
+    tree = estimator.tree_
+    is_leaf = tree.children_left == -1
+    left, right = _self_loop_leaves(tree.children_left, tree.children_right, is_leaf)
+    if regression:
+        # Regression leaves hold the mean target per output: (n_nodes, n_outputs, 1)
+        values = tree.value[:, :, 0]
+    else:
+        values = tree.value[:, 0, :]
+        # predict_proba normalizes the (possibly class-weighted) leaf counts per tree
+        normalizer = values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values = values / normalizer
+    missing_left = getattr(tree, 'missing_go_to_left', np.zeros(len(left), dtype=bool))
+    return (
+        np.where(is_leaf, 0, tree.feature), np.where(is_leaf, np.inf, tree.threshold),
+        left, right, values, np.asarray(missing_left, dtype=bool), None, tree.max_depth
+    )
+
+
+def _hist_tree(predictor):
+    nodes = predictor.nodes
+    if nodes['is_categorical'].any():
+        raise UnsupportedModelError('Categorical splits are not supported')
+    is_leaf = nodes['is_leaf'].astype(bool)
+    left, right = _self_loop_leaves(nodes['left'].astype(np.intp), nodes['right'].astype(np.intp), is_leaf)
+    return (
+        np.where(is_leaf, 0, nodes['feature_idx']), np.where(is_leaf, np.inf, nodes['num_threshold']),
+        left, right, nodes['value'], nodes['missing_go_to_left'].astype(bool), None, int(nodes['depth'].max())
+    )
+
+
+def _lightgbm_tree(structure):
+    """Flatten one tree from LightGBM's dump_model() JSON"""
+    feature, threshold, left, right, values, missing_left, missing_mode, depths = [], [], [], [], [], [], [], []
+    modes = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+    def add(node, depth):
+        index = len(feature)
+        for column in (feature, threshold, left, right, values, missing_left, missing_mode, depths):
+            column.append(None)
+        depths[index] = depth
+        if 'leaf_value' in node:
+            feature[index], threshold[index] = 0, np.inf
+            left[index] = right[index] = index
+            values[index] = node['leaf_value']
+            missing_left[index], missing_mode[index] = False, MISSING_NONE
+            return index
+        if node.get('decision_type', '<=') != '<=':
+            raise UnsupportedModelError('Categorical splits are not supported')
+        feature[index], threshold[index] = node['split_feature'], node['threshold']
+        values[index] = 0.0
+        missing_left[index] = bool(node.get('default_left', True))
+        missing_mode[index] = modes[node.get('missing_type', 'None')]
+        left[index] = add(node['left_child'], depth + 1)
+        right[index] = add(node['right_child'], depth + 1)
+        return index
+
+    add(structure, 0)
+    return feature, threshold, left, right, values, missing_left, missing_mode, max(depths)
+
+
+class CompiledForest:
+    """RandomForestClassifier.predict_proba: mean of per-tree leaf class distributions"""
+
+    KIND = 'forest'
+
+    def __init__(self, trees):
+        self.trees = trees
+
+    def to_arrays(self):
+        return self.trees.to_arrays('trees.')
+
+    @classmethod
+    def from_arrays(cls, params, arrays):
+        return cls(TreeArrays.from_arrays(params, arrays, 'trees.'))
+
+    @classmethod
+    def from_estimator(cls, forest):
+        n_classes = len(forest.classes_)
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise UnsupportedModelError('Multi-output forests are not supported')
+        return cls(_concatenate([_sklearn_tree(tree) for tree in forest.estimators_], n_classes))
+
+    def predict_proba(self, X):
+        return self.trees.leaf_values(X).mean(axis=1)
+
+
+class CompiledBooster:
+    """Gradient boosting predict_proba: baseline + summed tree outputs per class, then the link"""
+
+    KIND = 'booster'
+
+    def __init__(self, trees, tree_class, baseline, n_classes):
+        self.trees = trees
+        self.tree_class = np.asarray(tree_class, dtype=np.intp)
+        self.baseline = np.asarray(baseline, dtype=np.float64).reshape(-1)
+        self.n_classes = int(n_classes)
+        # (n_trees, n_raw_outputs) 0/1 matrix that sums each tree into its class column
+        self.class_matrix = np.zeros((len(self.tree_class), len(self.baseline)), dtype=np.float64)
+        self.class_matrix[np.arange(len(self.tree_class)), self.tree_class] = 1.0
+
+    def to_arrays(self):
+        params, arrays = self.trees.to_arrays('trees.')
+        params['n_classes'] = self.n_classes
+        arrays.update({'tree_class': self.tree_class, 'baseline': self.baseline})
+        return params, arrays
+
+    @classmethod
+    def from_arrays(cls, params, arrays):
+        trees = TreeArrays.from_arrays(params, arrays, 'trees.')
+        return cls(trees, arrays['tree_class'], arrays['baseline'], params['n_classes'])
+
+    @classmethod
+    def from_hist_gradient_boosting(cls, model):
+        if getattr(model, '_preprocessor', None) is not None:
+            raise UnsupportedModelError('Categorical preprocessing is not supported')
+        per_iteration = model.n_trees_per_iteration_
+        trees = [_hist_tree(p) for iteration in model._predictors for p in iteration]
+        tree_class = [k for _ in model._predictors for k in range(per_iteration)]
+        return cls(_concatenate(trees, 1), tree_class, model._baseline_prediction, len(model.classes_))
+
+    @classmethod
+    def from_lightgbm(cls, model):
+        dump = model.booster_.dump_model()
+        if 'multiclass' not in dump.get('objective', '') and 'binary' not in dump.get('objective', ''):
+            raise UnsupportedModelError(f"Unsupported LightGBM objective: {dump.get('objective')}")
+        per_iteration = max(1, dump['num_tree_per_iteration'])
+        tree_info = dump['tree_info']
+        trees = [_lightgbm_tree(info['tree_structure']) for info in tree_info]
+        tree_class = [info['tree_index'] % per_iteration for info in tree_info]
+        return cls(_concatenate(trees, 1), tree_class, np.zeros(per_iteration), len(model.classes_))
+
+    def raw_predict(self, X):
+        return self.baseline + self.trees.leaf_values(X)[:, :, 0] @ self.class_matrix
+
+    def predict_proba(self, X):
+        raw = self.raw_predict(X)
+        if self.n_classes <= 2 and raw.shape[1] == 1:
+            positive = _expit(raw[:, 0])
+            return np.column_stack([1.0 - positive, positive])
+        return _softmax(raw)
+
+
+class CompiledLinear:
+    """StandardScaler (optional) + LogisticRegression predict_proba with plain numpy"""
+
+    KIND = 'linear'
+
+    def __init__(self, coef, intercept, mean=None, scale=None, one_vs_rest=False):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.one_vs_rest = bool(one_vs_rest)
+
+    def to_arrays(self):
+        arrays = {'coef': self.coef, 'intercept': self.intercept}
+        if self.mean is not None:
+            arrays['mean'] = self.mean
+        if self.scale is not None:
+            arrays['scale'] = self.scale
+        return {'one_vs_rest': self.one_vs_rest}, arrays
+
+    @classmethod
+    def from_arrays(cls, params, arrays):
+        return cls(arrays['coef'], arrays['intercept'], mean=arrays.get('mean'), scale=arrays.get('scale'),
+                   one_vs_rest=params['one_vs_rest'])
+
+    @classmethod
+    def from_estimator(cls, model):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = None
+        if isinstance(model, Pipeline):
+            steps = [step for _, step in model.steps if step not in (None, 'passthrough')]
+            if len(steps) == 2 and isinstance(steps[0], StandardScaler):
+                scaler, model = steps
+            elif len(steps) == 1:
+                model = steps[0]
+            else:
+                raise UnsupportedModelError('Only StandardScaler + LogisticRegression pipelines are supported')
+        if not isinstance(model, LogisticRegression):
+            raise UnsupportedModelError(f'Unsupported linear model: {type(model).__name__}')
+
+        multi_class = getattr(model, 'multi_class', 'auto')
+        one_vs_rest = len(model.classes_) <= 2 or multi_class == 'ovr' or (
+            multi_class in ('auto', 'deprecated', 'warn') and model.solver == 'liblinear')
+        return cls(
+            model.coef_, model.intercept_,
+            mean=getattr(scaler, 'mean_', None) if scaler is not None else None,
+            scale=getattr(scaler, 'scale_', None) if scaler is not None else None,
+            one_vs_rest=one_vs_rest
+        )
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        # StandardScaler works in the input dtype (float32 rows stay float32)
+        if self.mean is not None:
+            X = X - self.mean.astype(X.dtype)
+        if self.scale is not None:
+            X = X / self.scale.astype(X.dtype)
+        decision = X @ self.coef.T + self.intercept
+        if self.one_vs_rest:
+            proba = _expit(decision)
+            if proba.shape[1] == 1:
+                return np.column_stack([1.0 - proba[:, 0], proba[:, 0]])
+            return proba / proba.sum(axis=1, keepdims=True)
+        return _softmax(decision)
+
+
+class CompiledStudent:
+    """Distilled model: a linear projection of the feature row (section means, chosen questions)
+    followed by one multi-output regression tree whose leaves hold class probabilities"""
+
+    KIND = 'student'
+
+    def __init__(self, projection, trees):
+        self.projection = np.asarray(projection, dtype=np.float64)
+        self.trees = trees
+
+    def to_arrays(self):
+        params, arrays = self.trees.to_arrays('trees.')
+        arrays['projection'] = self.projection
+        return params, arrays
+
+    @classmethod
+    def from_arrays(cls, params, arrays):
+        return cls(arrays['projection'], TreeArrays.from_arrays(params, arrays, 'trees.'))
+
+    @classmethod
+    def from_estimator(cls, projection, tree):
+        """projection: (n_features, n_derived) matrix; tree: DecisionTreeRegressor fitted on X @ projection"""
+        return cls(projection, _concatenate([_sklearn_tree(tree, regression=True)], tree.n_outputs_))
+
+    def derive(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.projection
+
+    def predict_proba(self, X):
+        proba = np.clip(self.trees.leaf_values(self.derive(X))[:, 0, :], 0.0, None)
+        total = proba.sum(axis=1, keepdims=True)
+        return np.divide(proba, total, out=np.full_like(proba, 1.0 / proba.shape[1]), where=total > 0)
+
+
+class EstimatorMember:
+    """Ensemble member we could not flatten; its own predict_proba is used as is"""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+    def predict_proba(self, X):
+        return self.estimator.predict_proba(X)
+
+
+# Member classes by KIND, for rebuilding a saved ensemble
+MEMBER_KINDS = {member.KIND: member for member in (CompiledForest, CompiledBooster, CompiledLinear, CompiledStudent)}
+
+
+def compile_member(estimator):
+    """Flatten one fitted classifier; raises UnsupportedModelError when it is not a known type"""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+
+    if isinstance(estimator, RandomForestClassifier):
+        return CompiledForest.from_estimator(estimator)
+    if isinstance(estimator, HistGradientBoostingClassifier):
+        return CompiledBooster.from_hist_gradient_boosting(estimator)
+    if type(estimator).__name__ == 'LGBMClassifier':
+        return CompiledBooster.from_lightgbm(estimator)
+    return CompiledLinear.from_estimator(estimator)
+
+
+class CompiledEnsemble:
+    """Soft-voting VotingClassifier.predict_proba over compiled members.
+
+    Members that cannot be flattened keep using their sklearn predict_proba;
+    fully_compiled tells whether the whole ensemble runs on node arrays.
+    """
+
+    def __init__(self, members, weights=None):
+        self.members = list(members)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+
+    @property
+    def fully_compiled(self):
+        return not any(isinstance(member, EstimatorMember) for member in self.members)
+
+    def predict_proba(self, X):
+        probas = np.asarray([member.predict_proba(X) for member in self.members])
+        return np.average(probas, axis=0, weights=self.weights)
+
+
+def compile_ensemble(model):
+    """Flatten a fitted soft-voting VotingClassifier (or a single supported classifier)"""
+    from sklearn.ensemble import VotingClassifier
+
+    if not isinstance(model, VotingClassifier):
+        return CompiledEnsemble([compile_member(model)])
+    if model.voting != 'soft':
+        raise UnsupportedModelError('Only soft voting can be compiled')
+
+    members = []
+    for estimator in model.estimators_:
+        try:
+            members.append(compile_member(estimator))
+        except UnsupportedModelError:
+            members.append(EstimatorMember(estimator))
+
+    weights = None
+    if model.weights is not None:
+        weights = [w for (_, est), w in zip(model.estimators, model.weights) if est != 'drop']
+    return CompiledEnsemble(members, weights)
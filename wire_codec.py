@@ -0,0 +1,173 @@
+# wire_codec.py - Request decoding and response encoding for the API: JSON codec, MessagePack, gzip/br
+#
+# JSON goes through orjson when it is installed (ICT_JSON_CODEC=json forces the
+# standard library). Callers that send Content-Type: application/msgpack, or
+# ask for it with Accept, get MessagePack when the msgpack package is
+# installed. Responses of at least ICT_COMPRESS_MIN_BYTES bytes are compressed
+# with br or gzip, whichever the client accepts (br preferred, only with the
+# brotli package); ICT_COMPRESSION lists the encodings allowed, empty for none.
+import gzip
+import json
+import os
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+COMPRESS_MIN_BYTES = int(os.environ.get('ICT_COMPRESS_MIN_BYTES', '1024'))
+COMPRESSION = tuple(name.strip() for name in os.environ.get('ICT_COMPRESSION', 'br,gzip').split(',') if name.strip())
+GZIP_LEVEL = int(os.environ.get('ICT_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('ICT_BROTLI_QUALITY', '4'))
+
+
+class UnsupportedMediaType(ValueError):
+    """Raised for a request body in a format this process cannot decode (answered with 415)"""
+
+
+def _import(name):
+    try:
+        return __import__(name)
+    except ImportError:
+        return None
+
+
+class JsonCodec:
+    """dumps(obj) -> bytes and loads(bytes) -> obj, by orjson or the standard library.
+
+    Both sort keys and write compact UTF-8, so responses read the same
+    whichever is used. loads raises ValueError for invalid JSON.
+    """
+
+    def __init__(self, name=None):
+        name = name or os.environ.get('ICT_JSON_CODEC', 'auto')
+        orjson = _import('orjson') if name in ('auto', 'orjson') else None
+        if name == 'orjson' and orjson is None:
+            raise ValueError('ICT_JSON_CODEC=orjson but orjson is not installed')
+        self.name = 'orjson' if orjson is not None else 'json'
+        if orjson is not None:
+            options = orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            self.dumps = lambda obj: orjson.dumps(obj, option=options)
+            self.loads = orjson.loads
+        else:
+            self.dumps = lambda obj: json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            self.loads = json.loads
+
+
+class MsgPackCodec:
+    """dumps/loads with the msgpack package, strings as str and bytes as bin"""
+
+    def __init__(self, module):
+        self.name = 'msgpack'
+        self.dumps = lambda obj: module.packb(obj, use_bin_type=True)
+        self.loads = lambda raw: module.unpackb(raw, raw=False)
+
+
+JSON = JsonCodec()
+msgpack = _import('msgpack')
+MSGPACK = MsgPackCodec(msgpack) if msgpack is not None else None
+brotli = _import('brotli')
+
+
+def media_type(content_type):
+    """Lowercased media type of a Content-Type / Accept entry, without parameters"""
+    return (content_type or '').split(';', 1)[0].strip().lower()
+
+
+def decode_request(raw, content_type):
+    """Body bytes -> object for a JSON or MessagePack request, None when it is empty, invalid or of another type.
+
+    Raises UnsupportedMediaType for MessagePack when msgpack is not installed.
+    """
+    kind = media_type(content_type)
+    if not raw:
+        return None
+    if kind in MSGPACK_TYPES:
+        if MSGPACK is None:
+            raise UnsupportedMediaType('MessagePack requests need the msgpack package on the server')
+        try:
+            return MSGPACK.loads(raw)
+        except Exception:
+            return None
+    if kind != JSON_TYPE and not kind.endswith('+json'):
+        return None
+    try:
+        return JSON.loads(raw)
+    except ValueError:
+        return None
+
+
+def wants_msgpack(accept):
+    return MSGPACK is not None and bool(accept) and any(media_type(entry) in MSGPACK_TYPES for entry in accept.split(','))
+
+
+def accepted_encoding(accept_encoding):
+    """'br', 'gzip' or None: the first of COMPRESSION the Accept-Encoding header allows (q=0 excludes)"""
+    if not accept_encoding or not COMPRESSION:
+        return None
+    offered = {}
+    for entry in accept_encoding.lower().split(','):
+        name, _, params = entry.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    for name in supported_encodings():
+        if offered.get(name, offered.get('*', 0.0)) > 0:
+            return name
+    return None
+
+
+def supported_encodings():
+    """Encodings of COMPRESSION this process can produce, in order of preference"""
+    return [name for name in COMPRESSION if name == 'gzip' or (name == 'br' and brotli is not None)]
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encode_body(body, accept=None):
+    """(bytes, content type) of a response body, MessagePack when accept asks for it, JSON otherwise"""
+    if wants_msgpack(accept):
+        return MSGPACK.dumps(body), MSGPACK_TYPES[0]
+    return JSON.dumps(body), JSON_TYPE
+
+
+def compress_body(data, accept_encoding=None, min_bytes=None):
+    """(bytes, Content-Encoding or None): data compressed as the client accepts, if it is at least min_bytes long.
+
+    Smaller bodies (COMPRESS_MIN_BYTES by default) are sent as they are:
+    compressing a 100-byte recommendation costs more than it saves.
+    """
+    if len(data) < (COMPRESS_MIN_BYTES if min_bytes is None else min_bytes):
+        return data, None
+    encoding = accepted_encoding(accept_encoding)
+    return (data, None) if encoding is None else (compress(data, encoding), encoding)
+
+
+def response_headers(content_type, encoding):
+    headers = {'Content-Type': content_type, 'Vary': 'Accept, Accept-Encoding'}
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return headers
+
+
+def encode_response(body, accept=None, accept_encoding=None, min_bytes=None):
+    """(bytes, headers dict) for a response body, negotiated from the request's Accept and Accept-Encoding"""
+    data, content_type = encode_body(body, accept)
+    data, encoding = compress_body(data, accept_encoding, min_bytes)
+    return data, response_headers(content_type, encoding)
+
+
+def available():
+    """Which codecs this process can use (reported by the benchmark suite)"""
+    return {
+        'json': JSON.name,
+        'msgpack': MSGPACK is not None,
+        'compression': supported_encodings(),
+        'compress_min_bytes': COMPRESS_MIN_BYTES
+    }